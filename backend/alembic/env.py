@@ -9,7 +9,7 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.database import Base
+from app.database import SQLALCHEMY_DATABASE_URL, Base
 import app.auth.models
 
 
@@ -24,6 +24,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# DATABASE_URL, when set, overrides sqlalchemy.url (as it does for the app)
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
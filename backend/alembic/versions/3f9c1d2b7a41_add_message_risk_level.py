@@ -0,0 +1,34 @@
+"""add risk_level to messages
+
+Revision ID: 3f9c1d2b7a41
+Revises: ae2e84abdf48
+Create Date: 2026-10-18 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1d2b7a41'
+down_revision: Union[str, Sequence[str], None] = 'ae2e84abdf48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.add_column(
+            sa.Column('risk_level', sa.String(), server_default='Low', nullable=False)
+        )
+    # Existing rows only know risky / not risky
+    op.execute("UPDATE messages SET risk_level = 'Medium' WHERE risk = 1")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.drop_column('risk_level')
@@ -0,0 +1,49 @@
+"""add sentiment_daily rollup
+
+Revision ID: 5d0b8e3a1c72
+Revises: c41a7e9b2f60
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0b8e3a1c72'
+down_revision: Union[str, Sequence[str], None] = 'c41a7e9b2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sentiment_daily',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('analyses', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('positive', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('negative', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('confidence_sum', sa.Float(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Backfill (same rows as `python -m app.rollups rebuild`)
+    op.execute("""
+        INSERT INTO sentiment_daily (user_id, day, analyses, positive, negative, confidence_sum)
+        SELECT user_id, date(created_at), COUNT(*),
+               SUM(CASE WHEN sentiment = 'POSITIVE' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN sentiment = 'POSITIVE' THEN 0 ELSE 1 END),
+               SUM(confidence)
+        FROM sentiment_history
+        WHERE created_at IS NOT NULL
+        GROUP BY user_id, date(created_at)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sentiment_daily')
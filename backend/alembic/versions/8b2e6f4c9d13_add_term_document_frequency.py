@@ -0,0 +1,35 @@
+"""add term_document_frequency
+
+Revision ID: 8b2e6f4c9d13
+Revises: 3f9c1d2b7a41
+Create Date: 2026-10-18 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e6f4c9d13'
+down_revision: Union[str, Sequence[str], None] = '3f9c1d2b7a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Starts empty: document frequencies build up as new texts are analyzed
+    op.create_table('term_document_frequency',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(), nullable=False),
+    sa.Column('documents', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'term')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('term_document_frequency')
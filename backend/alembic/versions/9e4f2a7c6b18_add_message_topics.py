@@ -0,0 +1,90 @@
+"""add message_topics index
+
+Revision ID: 9e4f2a7c6b18
+Revises: 5d0b8e3a1c72
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4f2a7c6b18'
+down_revision: Union[str, Sequence[str], None] = '5d0b8e3a1c72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+MAX_TOPIC_LENGTH = 100
+
+
+def _topics(content: str) -> list[str]:
+    # Same normalization as app.rollups.message_topics at the time of writing
+    try:
+        content = json.loads(content)
+    except (TypeError, ValueError):
+        return []
+    topics = content.get("topics") if isinstance(content, dict) else None
+    if not isinstance(topics, list):
+        return []
+    normalized = []
+    for topic in topics:
+        topic = " ".join(str(topic).lower().split())[:MAX_TOPIC_LENGTH]
+        if topic and topic not in normalized:
+            normalized.append(topic)
+    return normalized
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('message_topics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('message_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['message_id'], ['messages.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Backfill from the AI messages' JSON content, a keyset batch at a time
+    # so large message tables are never loaded at once
+    bind = op.get_bind()
+    # Untyped columns: created_at is copied through exactly as stored
+    message_topics = sa.table(
+        'message_topics',
+        sa.column('message_id'), sa.column('user_id'), sa.column('topic'), sa.column('created_at'),
+    )
+    select_batch = sa.text(
+        "SELECT id, user_id, content, created_at FROM messages "
+        "WHERE role = 'ai' AND id > :last_id ORDER BY id LIMIT :batch"
+    )
+    last_id = 0
+    while True:
+        messages = bind.execute(select_batch, {"last_id": last_id, "batch": BACKFILL_BATCH}).all()
+        if not messages:
+            break
+        rows = [
+            {"message_id": m.id, "user_id": m.user_id, "topic": topic, "created_at": m.created_at}
+            for m in messages
+            for topic in _topics(m.content)
+        ]
+        if rows:
+            bind.execute(message_topics.insert(), rows)
+        last_id = messages[-1].id
+
+    # Indexes after the bulk load
+    op.create_index('ix_message_topics_user_topic', 'message_topics', ['user_id', 'topic'], unique=False)
+    op.create_index('ix_message_topics_user_created', 'message_topics', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_message_topics_user_created', table_name='message_topics')
+    op.drop_index('ix_message_topics_user_topic', table_name='message_topics')
+    op.drop_table('message_topics')
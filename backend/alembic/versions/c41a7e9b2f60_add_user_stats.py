@@ -0,0 +1,64 @@
+"""add user_stats rollup
+
+Revision ID: c41a7e9b2f60
+Revises: 8b2e6f4c9d13
+Create Date: 2026-10-18 13:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e9b2f60'
+down_revision: Union[str, Sequence[str], None] = '8b2e6f4c9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_analyses', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('confidence_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('risk_alerts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('topic_messages', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('risk_low', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('risk_medium', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('risk_high', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill (same totals as `python -m app.rollups rebuild`)
+    op.execute("""
+        INSERT INTO user_stats (user_id, total_analyses, confidence_sum, risk_alerts,
+                                topic_messages, risk_low, risk_medium, risk_high)
+        SELECT u.id,
+               COALESCE(h.total_analyses, 0), COALESCE(h.confidence_sum, 0),
+               COALESCE(m.risk_alerts, 0), COALESCE(m.topic_messages, 0),
+               COALESCE(m.risk_low, 0), COALESCE(m.risk_medium, 0), COALESCE(m.risk_high, 0)
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS total_analyses, SUM(confidence) AS confidence_sum
+            FROM sentiment_history GROUP BY user_id
+        ) h ON h.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id,
+                   SUM(CASE WHEN risk = 1 THEN 1 ELSE 0 END) AS risk_alerts,
+                   SUM(CASE WHEN role = 'ai' AND lower(content) LIKE '%topics%' THEN 1 ELSE 0 END) AS topic_messages,
+                   SUM(CASE WHEN COALESCE(risk_level, 'Low') = 'Low' THEN 1 ELSE 0 END) AS risk_low,
+                   SUM(CASE WHEN risk_level = 'Medium' THEN 1 ELSE 0 END) AS risk_medium,
+                   SUM(CASE WHEN risk_level = 'High' THEN 1 ELSE 0 END) AS risk_high
+            FROM messages GROUP BY user_id
+        ) m ON m.user_id = u.id
+        WHERE h.user_id IS NOT NULL OR m.user_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_stats')
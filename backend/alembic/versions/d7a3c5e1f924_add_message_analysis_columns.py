@@ -0,0 +1,174 @@
+"""add typed analysis columns to messages
+
+Revision ID: d7a3c5e1f924
+Revises: 9e4f2a7c6b18
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3c5e1f924'
+down_revision: Union[str, Sequence[str], None] = '9e4f2a7c6b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH = 1000
+JSON_COLUMNS = ('topics', 'risk_matches', 'details')
+
+
+# Frozen copies of app.message_content's unpack_analysis / pack_analysis
+# at the time of writing, so this revision keeps doing the same thing when
+# the application's helpers change
+_MISSING = object()
+
+
+def _typed(value, *types):
+    if isinstance(value, bool) and bool not in types:
+        return None
+    return value if isinstance(value, types) else None
+
+
+def unpack_analysis(message) -> dict:
+    content = {
+        "text": message["content"],
+        "summary": message["summary"],
+        "sentiment": (
+            {"sentiment": message["sentiment"], "confidence": message["confidence"]}
+            if message["sentiment"] is not None else {}
+        ),
+        "topics": message["topics"] if message["topics"] is not None else [],
+        "feedback": message["content"],
+        "risk": bool(message["risk"]),
+        "risk_level": message["risk_level"],
+        "risk_score": message["risk_score"],
+        "risk_matches": message["risk_matches"] if message["risk_matches"] is not None else [],
+    }
+    for key, value in (message["details"] or {}).items():
+        if key == "sentiment" and isinstance(value, dict) and isinstance(content["sentiment"], dict):
+            content["sentiment"] = {**content["sentiment"], **value}
+        else:
+            content[key] = value
+    return content
+
+
+def pack_analysis(content: dict, risk: int, risk_level: str) -> dict:
+    sentiment = content.get("sentiment")
+    sentiment = sentiment if isinstance(sentiment, dict) else {}
+    topics = _typed(content.get("topics"), list)
+    risk_matches = _typed(content.get("risk_matches"), list)
+    text = _typed(content.get("text"), str) or _typed(content.get("feedback"), str) or ""
+
+    columns = {
+        "content": text,
+        "sentiment": _typed(sentiment.get("sentiment"), str),
+        "confidence": _typed(sentiment.get("confidence"), float, int),
+        "summary": _typed(content.get("summary"), str),
+        "topics": topics if topics is not None and all(isinstance(t, str) for t in topics) else None,
+        "risk_score": _typed(content.get("risk_score"), float, int),
+        "risk_matches": risk_matches if risk_matches is not None and all(isinstance(m, str) for m in risk_matches) else None,
+    }
+    if columns["sentiment"] is None:
+        columns["confidence"] = None
+
+    typed = unpack_analysis({**columns, "risk": risk, "risk_level": risk_level, "details": None})
+    details = {}
+    for key, value in content.items():
+        if key == "sentiment" and isinstance(value, dict):
+            rest = {k: v for k, v in value.items() if typed["sentiment"].get(k, _MISSING) != v}
+            if rest:
+                details["sentiment"] = rest
+        elif typed.get(key, _MISSING) != value:
+            details[key] = value
+    columns["details"] = details
+    return columns
+
+
+def _batches(bind, where: str):
+    """AI messages matching where, a keyset batch at a time."""
+    select_batch = sa.text(
+        "SELECT * FROM messages "
+        f"WHERE role = 'ai' AND ({where}) AND id > :last_id ORDER BY id LIMIT :batch"
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(select_batch, {"last_id": last_id, "batch": BATCH}).mappings().all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]["id"]
+
+
+def _recount_topic_messages(rule: str):
+    op.execute(f"""
+        UPDATE user_stats SET topic_messages = (
+            SELECT COUNT(*) FROM messages m
+            WHERE m.user_id = user_stats.user_id AND m.role = 'ai' AND {rule}
+        )
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.add_column(sa.Column('sentiment', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('confidence', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('summary', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('topics', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('risk_score', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('risk_matches', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('details', sa.JSON(), nullable=True))
+
+    # Move JSON-string analyses into the columns, streaming so large message
+    # tables are never loaded at once. pack_analysis matches the
+    # application's at this revision, so migrated and new rows are
+    # indistinguishable.
+    bind = op.get_bind()
+    update = sa.text(
+        "UPDATE messages SET content = :content, sentiment = :sentiment, confidence = :confidence, "
+        "summary = :summary, topics = :topics, risk_score = :risk_score, "
+        "risk_matches = :risk_matches, details = :details WHERE id = :id"
+    )
+    for rows in _batches(bind, "content LIKE '{%'"):
+        updates = []
+        for row in rows:
+            try:
+                content = json.loads(row["content"])
+            except ValueError:
+                continue
+            if not isinstance(content, dict):
+                continue
+            columns = pack_analysis(content, row["risk"], row["risk_level"])
+            for name in JSON_COLUMNS:
+                columns[name] = None if columns[name] is None else json.dumps(columns[name])
+            updates.append({"id": row["id"], **columns})
+        if updates:
+            bind.execute(update, updates)
+
+    # Topic messages are now AI analyses with a topics list
+    _recount_topic_messages("m.topics IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    update = sa.text("UPDATE messages SET content = :content WHERE id = :id")
+    for rows in _batches(bind, "details IS NOT NULL"):
+        updates = []
+        for row in rows:
+            values = dict(row)
+            for name in JSON_COLUMNS:
+                values[name] = None if values[name] is None else json.loads(values[name])
+            updates.append({"id": row["id"], "content": json.dumps(unpack_analysis(values))})
+        bind.execute(update, updates)
+
+    with op.batch_alter_table('messages') as batch_op:
+        for name in ('details', 'risk_matches', 'risk_score', 'topics', 'summary', 'confidence', 'sentiment'):
+            batch_op.drop_column(name)
+
+    _recount_topic_messages("lower(m.content) LIKE '%topics%'")
@@ -0,0 +1,44 @@
+"""add composite indexes for the hot queries
+
+Revision ID: e58b1f6a3d07
+Revises: d7a3c5e1f924
+Create Date: 2026-10-18 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e58b1f6a3d07'
+down_revision: Union[str, Sequence[str], None] = 'd7a3c5e1f924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_sentiment_history_user_created', 'sentiment_history', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_chats_user_created', 'chats', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_messages_chat_created', 'messages', ['chat_id', 'created_at', 'id'])
+    op.create_index('ix_messages_user_risk', 'messages', ['user_id', 'risk', 'risk_level'])
+    op.create_index('ix_message_topics_message', 'message_topics', ['message_id'])
+    # Widened to cover date-range topic counts
+    op.drop_index('ix_message_topics_user_created', table_name='message_topics')
+    op.create_index('ix_message_topics_user_created', 'message_topics', ['user_id', 'created_at', 'topic'])
+
+    # Give the SQLite planner row counts for the new indexes
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ANALYZE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_message_topics_user_created', table_name='message_topics')
+    op.create_index('ix_message_topics_user_created', 'message_topics', ['user_id', 'created_at'])
+    op.drop_index('ix_message_topics_message', table_name='message_topics')
+    op.drop_index('ix_messages_user_risk', table_name='messages')
+    op.drop_index('ix_messages_chat_created', table_name='messages')
+    op.drop_index('ix_chats_user_created', table_name='chats')
+    op.drop_index('ix_sentiment_history_user_created', table_name='sentiment_history')
@@ -0,0 +1,177 @@
+# app/ai/batching.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Iterable
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-item calls into batches for one batched call.
+
+    Callers submit items from any thread and get a Future back. A background
+    thread waits for the first item, keeps collecting until either
+    `max_batch_size` items are queued or `max_wait_ms` has passed, groups the
+    items into length buckets (so padding stays small) and calls `infer_fn`
+    once per bucket. Results are fanned back out to each caller's Future.
+    With `concurrency` > 1 several such threads run, so that many batches
+    can be in flight (e.g. one per inference worker process).
+
+    Args:
+        infer_fn (callable): Takes a list of items, returns a list of results
+            in the same order
+        max_batch_size (int): Maximum number of items per collection window
+        max_wait_ms (float): How long to wait for more items after the first
+        length_fn (callable): Size of an item, used for bucketing
+        concurrency (int): Batches allowed in flight at once
+    """
+
+    def __init__(
+        self,
+        infer_fn: Callable[[list], list],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        length_fn: Callable[[object], int] = len,
+        concurrency: int = 1,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.infer_fn = infer_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0) / 1000
+        self.length_fn = length_fn
+        self.concurrency = concurrency
+
+        self._queue: queue.Queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+        # Counters for /health style reporting
+        self.batches_run = 0
+        self.items_processed = 0
+
+    # -------------------
+    # Public API
+    # -------------------
+    def submit(self, item) -> Future:
+        """Queue one item and return a Future with its result."""
+        future = Future()
+        self._ensure_started()
+        self._queue.put((item, future))
+        return future
+
+    def submit_many(self, items: Iterable) -> list[Future]:
+        """Queue several items at once; they may share a batch with other callers."""
+        self._ensure_started()
+        futures = []
+        for item in items:
+            future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+        return futures
+
+    def __call__(self, item, timeout: float = None):
+        """Submit one item and block until its result is ready."""
+        return self.submit(item).result(timeout=timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the worker threads after they drain what is already queued.
+        A later submit starts fresh workers.
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "concurrency": self.concurrency,
+            "queued": self._queue.qsize(),
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "avg_batch_size": round(self.items_processed / self.batches_run, 2) if self.batches_run else 0.0,
+        }
+
+    # -------------------
+    # Worker
+    # -------------------
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if not self._threads:
+                for i in range(self.concurrency):
+                    thread = threading.Thread(
+                        target=self._run, name=f"micro-batcher-{i}", daemon=True
+                    )
+                    thread.start()
+                    self._threads.append(thread)
+
+    def _collect(self):
+        """Block for the first item, then gather more until full or timed out."""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Put the sentinel back so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _buckets(self, batch):
+        """Group entries by power-of-two length so each call pads to a similar size."""
+        buckets = {}
+        for entry in batch:
+            size = max(self.length_fn(entry[0]), 1)
+            buckets.setdefault(size.bit_length(), []).append(entry)
+        return [buckets[key] for key in sorted(buckets)]
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            for bucket in self._buckets(batch):
+                # Skip callers that gave up (e.g. cancelled on timeout)
+                bucket = [entry for entry in bucket if entry[1].set_running_or_notify_cancel()]
+                if not bucket:
+                    continue
+
+                items = [item for item, _ in bucket]
+                try:
+                    results = self.infer_fn(items)
+                    if len(results) != len(items):
+                        raise RuntimeError(
+                            f"infer_fn returned {len(results)} results for {len(items)} items"
+                        )
+                except BaseException as exc:
+                    for _, future in bucket:
+                        future.set_exception(exc)
+                    continue
+
+                for (_, future), result in zip(bucket, results):
+                    future.set_result(result)
+
+                with self._lock:
+                    self.batches_run += 1
+                    self.items_processed += len(items)
@@ -0,0 +1,171 @@
+# app/ai/cache.py
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from app.cache import TTLCache
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFKC, trimmed, single spaces."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class SQLiteCacheTier:
+    """
+    Persistent cache tier in a standalone SQLite file, so warm entries
+    survive restarts. Rows written under another version are purged on open.
+
+    Args:
+        path (str): SQLite file path
+        version (str): Current analysis version
+        ttl (float): Seconds a row stays valid, None for no expiry
+        max_rows (int): Oldest rows are pruned once the table grows past this
+    """
+
+    def __init__(self, path: str, version: str, ttl: float = None, max_rows: int = 100_000):
+        self.path = path
+        self.version = version
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            " key TEXT PRIMARY KEY,"
+            " version TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_analysis_cache_created_at ON analysis_cache (created_at)"
+        )
+        self._conn.execute("DELETE FROM analysis_cache WHERE version != ?", (version,))
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM analysis_cache WHERE key = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl is not None and created_at + self.ttl <= time.time():
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, version, value, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, self.version, json.dumps(value), time.time()),
+            )
+            self._writes += 1
+            # Prune occasionally rather than on every write
+            if self._writes % 1000 == 0:
+                self._prune()
+
+    def _prune(self):
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM analysis_cache WHERE created_at <= ?", (time.time() - self.ttl,)
+            )
+        self._conn.execute(
+            "DELETE FROM analysis_cache WHERE key IN ("
+            " SELECT key FROM analysis_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache for analysis results.
+
+    Keys are sha256(normalized text + version). The version string covers the
+    model, backend and lexicons, so changing any of them misses every old
+    entry automatically. Lookups go memory tier first, then the optional
+    SQLite tier, which promotes hits back into memory.
+
+    Args:
+        version (str): Current analysis version
+        maxsize (int): Memory tier size, 0 disables caching
+        ttl (float): Memory tier TTL in seconds
+        sqlite_path (str): Persistent tier file, empty to disable
+        sqlite_ttl (float): Persistent tier TTL in seconds
+    """
+
+    def __init__(
+        self,
+        version: str,
+        maxsize: int = 10_000,
+        ttl: float = 3600,
+        sqlite_path: str = "",
+        sqlite_ttl: float = 7 * 24 * 3600,
+    ):
+        self.version = version
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.persistent = None
+        if maxsize > 0 and sqlite_path:
+            self.persistent = SQLiteCacheTier(sqlite_path, version, ttl=sqlite_ttl)
+
+        self.persistent_hits = 0
+        self.persistent_misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory.maxsize > 0
+
+    def key(self, text: str) -> str:
+        payload = f"{self.version}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, text: str):
+        """Cached analysis for this text, or None."""
+        if not self.enabled:
+            return None
+        key = self.key(text)
+        value = self.memory.get(key)
+        if value is not None or self.persistent is None:
+            return value
+
+        value = self.persistent.get(key)
+        if value is None:
+            self.persistent_misses += 1
+            return None
+        self.persistent_hits += 1
+        self.memory.set(key, value)
+        return value
+
+    def set(self, text: str, value: dict):
+        if not self.enabled:
+            return
+        key = self.key(text)
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            self.persistent.set(key, value)
+
+    def stats(self) -> dict:
+        stats = {"version": self.version, "memory": self.memory.stats()}
+        if self.persistent is not None:
+            stats["sqlite"] = {
+                "path": self.persistent.path,
+                "hits": self.persistent_hits,
+                "misses": self.persistent_misses,
+            }
+        return stats
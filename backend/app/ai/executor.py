@@ -0,0 +1,207 @@
+# app/ai/executor.py
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue is full; carries a Retry-After hint."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a task could not finish before its deadline."""
+
+
+class InferenceExecutor:
+    """
+    Dedicated, sized thread pool for CPU-bound model work.
+
+    Keeps inference off Starlette's shared threadpool so auth and cheap DB
+    endpoints keep their threads. Admission is bounded: at most
+    `max_workers` tasks run and `max_queue` wait; anything beyond that is
+    rejected immediately with QueueFullError instead of queueing forever.
+    Tasks carry a deadline and are skipped if it passes while they wait.
+
+    Args:
+        max_workers (int): Threads running model work
+        max_queue (int): Tasks allowed to wait for a free thread
+        timeout (float): Default per-task deadline in seconds
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, timeout: float = 30.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._pool = None
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.completed = 0
+        self._admitted = 0
+        self._running = 0
+        self._waits = deque(maxlen=1000)
+        self._service = deque(maxlen=1000)
+
+    # -------------------
+    # Submission
+    # -------------------
+    def submit(self, fn, *args, timeout: float = None, block: bool = False, **kwargs) -> Future:
+        """
+        Queue fn(*args, **kwargs) and return its Future.
+
+        Args:
+            timeout (float): Seconds until the task's deadline (default self.timeout)
+            block (bool): Wait for a queue slot (until the deadline) instead of
+                raising QueueFullError straight away
+
+        Raises:
+            QueueFullError: No queue slot was available
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        acquired = self._slots.acquire(timeout=timeout) if block else self._slots.acquire(blocking=False)
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError(self.retry_after())
+
+        enqueued = time.monotonic()
+        with self._lock:
+            self.submitted += 1
+            self._admitted += 1
+
+        def task():
+            started = time.monotonic()
+            with self._lock:
+                self._running += 1
+                self._waits.append(started - enqueued)
+            try:
+                if started > deadline:
+                    raise DeadlineExceededError("Deadline passed while queued")
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._service.append(time.monotonic() - started)
+
+        try:
+            future = self._get_pool().submit(task)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args, timeout: float = None, **kwargs):
+        """
+        Await fn(*args, **kwargs) on the pool without blocking the event loop.
+
+        Raises:
+            QueueFullError: The queue is full
+            DeadlineExceededError: The task didn't finish within timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit(fn, *args, timeout=timeout, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # Cancelled if still queued; _release counts it either way
+            future.cancel()
+            raise DeadlineExceededError(f"Inference did not finish within {timeout}s")
+
+    def has_capacity(self) -> bool:
+        """True if a submit right now would be admitted."""
+        return self._admitted < self.max_workers + self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained (at least 1)."""
+        service = sum(self._service) / len(self._service) if self._service else 1.0
+        backlog = max(self._admitted - self.max_workers, 0) + 1
+        return max(1, round(backlog * service / self.max_workers))
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads; a later submit creates a fresh pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    # -------------------
+    # Internals
+    # -------------------
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            return self._pool
+
+    def _release(self, future):
+        try:
+            with self._lock:
+                self._admitted -= 1
+                if future is None:
+                    return
+                # Cancelled after a run() timeout or on shutdown; exception()
+                # would raise CancelledError here
+                if future.cancelled():
+                    self.timed_out += 1
+                elif future.exception() is None:
+                    self.completed += 1
+                elif isinstance(future.exception(), DeadlineExceededError):
+                    self.timed_out += 1
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            service = list(self._service)
+            running = self._running
+            admitted = self._admitted
+
+        def pct(values, p):
+            return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 2) if values else 0.0
+
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": running,
+            "queue_depth": max(admitted - running, 0),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_ms_p50": pct(waits, 0.50),
+            "wait_ms_p95": pct(waits, 0.95),
+            "service_ms_avg": round(sum(service) / len(service) * 1000, 2) if service else 0.0,
+        }
+
+
+# Request-path threads mostly wait inside the sentiment batcher while it
+# collects a batch, so a batch can only be as big as the callers admitted
+# at once. By default admit a full batch for every batcher thread
+# (SENTIMENT_MAX_BATCH_SIZE x SENTIMENT_WORKERS, read with the same
+# defaults as app/ai/sentiment.py, which imports this module), and at least
+# one thread per core for the CPU-bound text stages
+_BATCH_CALLERS = int(os.getenv("SENTIMENT_MAX_BATCH_SIZE", "16")) * max(int(os.getenv("SENTIMENT_WORKERS", "0")), 1)
+
+# Shared executor for request-path inference
+inference_executor = InferenceExecutor(
+    max_workers=int(os.getenv("INFERENCE_WORKERS", str(max(min(8, os.cpu_count() or 1), _BATCH_CALLERS)))),
+    max_queue=int(os.getenv("INFERENCE_MAX_QUEUE", "64")),
+    timeout=float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30")),
+)
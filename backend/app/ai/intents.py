@@ -0,0 +1,153 @@
+# app/ai/intents.py
+import json
+from bisect import bisect_left, bisect_right
+
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+def _sorted_form(text: str) -> str:
+    """Lowercase, strip punctuation and sort tokens (what token_sort_ratio compares)."""
+    return " ".join(sorted(default_process(text).split()))
+
+
+class IntentIndex:
+    """
+    Precompiled matcher from free text to canned intent responses.
+
+    Scores are rapidfuzz token_sort_ratio, computed as a plain ratio on
+    token-sorted strings that are prepared once at load time. A query goes
+    through two cheap stages before any fuzzy scoring:
+
+    - exact hash lookup of the query's sorted form;
+    - length window: a ratio of at least `threshold` is impossible when
+      the lengths differ too much, so only phrases whose length falls in a
+      bisected range of the length-sorted phrase list are scored (this
+      rules out long feedback texts immediately).
+
+    Both stages are lossless, so match() and match_batch() find the same
+    best phrase as scoring every phrase would, typos included. (Token or
+    character n-gram filters were tried: a lossless one barely prunes at a
+    75% cutoff, a lossy one drops typo'd matches.)
+
+    Args:
+        intents (list[dict]): {"id", "language", "phrases": [...], "response"}
+        threshold (float): Minimum score (0-100) to count as a match
+    """
+
+    def __init__(self, intents: list[dict], threshold: float = 75):
+        self.threshold = threshold
+        self.intents = intents
+
+        entries = []
+        for intent_id, intent in enumerate(intents):
+            for phrase in intent["phrases"]:
+                form = _sorted_form(phrase)
+                if form:
+                    entries.append((len(form), form, intent_id))
+        entries.sort()
+
+        self._lengths = [length for length, _, _ in entries]
+        self._forms = [form for _, form, _ in entries]
+        self._intent_ids = [intent_id for _, _, intent_id in entries]
+        self._exact = {}
+        for position, form in enumerate(self._forms):
+            self._exact.setdefault(form, position)
+
+        # Bounds from ratio = 2 * matches / (len_a + len_b) * 100
+        t = threshold / 100
+        self._min_factor = t / (2 - t) if t < 2 else 1.0
+        self._max_factor = (2 - t) / t if t > 0 else float("inf")
+
+    @classmethod
+    def from_file(cls, path: str, threshold: float = 75) -> "IntentIndex":
+        """Load intents from a JSON file shaped like app/ai/data/intents.json."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["intents"], threshold=threshold)
+
+    def __len__(self):
+        return len(self._forms)
+
+    # -------------------
+    # Matching
+    # -------------------
+    def _length_range(self, length: int) -> tuple[int, int]:
+        low = bisect_left(self._lengths, length * self._min_factor)
+        high = bisect_right(self._lengths, length * self._max_factor)
+        return low, high
+
+    def _result(self, position: int, score: float) -> dict:
+        return {"intent": self.intents[self._intent_ids[position]], "score": score}
+
+    def match(self, text: str):
+        """
+        Best intent for one text.
+        Returns:
+            dict | None: {"intent": dict, "score": float} or None below threshold
+        """
+        form = _sorted_form(text)
+        if not form:
+            return None
+
+        position = self._exact.get(form)
+        if position is not None:
+            return self._result(position, 100.0)
+
+        low, high = self._length_range(len(form))
+        if low >= high:
+            return None
+
+        best = process.extractOne(
+            form,
+            self._forms[low:high],
+            scorer=fuzz.ratio,
+            score_cutoff=self.threshold,
+        )
+        if best is None:
+            return None
+        _, score, offset = best
+        return self._result(low + offset, score)
+
+    def match_batch(self, texts: list[str]) -> list:
+        """
+        match() for many texts: one vectorized rapidfuzz cdist call over the
+        phrases in the union of the queries' length windows (phrases outside
+        a query's own window score below the threshold, so the result is
+        the same).
+        Returns:
+            list[dict | None]: One match() result per text
+        """
+        import numpy as np
+
+        results = [None] * len(texts)
+        pending = []
+        low, high = len(self._forms), 0
+        for i, text in enumerate(texts):
+            form = _sorted_form(text)
+            if not form:
+                continue
+            position = self._exact.get(form)
+            if position is not None:
+                results[i] = self._result(position, 100.0)
+                continue
+            q_low, q_high = self._length_range(len(form))
+            if q_low < q_high:
+                pending.append((i, form))
+                low, high = min(low, q_low), max(high, q_high)
+
+        if not pending:
+            return results
+
+        scores = process.cdist(
+            [form for _, form in pending],
+            self._forms[low:high],
+            scorer=fuzz.ratio,
+            score_cutoff=self.threshold,
+            dtype=np.float32,
+        )
+        best = scores.argmax(axis=1)
+        for row, (i, _) in enumerate(pending):
+            score = float(scores[row, best[row]])
+            if score >= self.threshold:
+                results[i] = self._result(low + int(best[row]), score)
+        return results
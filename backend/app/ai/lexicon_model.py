@@ -0,0 +1,127 @@
+# app/ai/lexicon_model.py
+import hashlib
+import math
+import os
+import re
+import sys
+
+from app.ai.model import SentimentModel
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), "data", "sentiment_lexicon.tsv")
+
+# Rule constants (after VADER, Hutto & Gilbert 2014)
+NEGATION_SCALAR = -0.74
+CONTRAST_BEFORE = 0.5
+CONTRAST_AFTER = 1.5
+EXCLAMATION_BOOST = 0.292
+CAPS_BOOST = 0.733
+NORMALIZATION_ALPHA = 15
+
+_CONTRAST_WORDS = frozenset({"but", "however", "although", "though", "yet"})
+_TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+class LexiconSentimentModel(SentimentModel):
+    """
+    Pure-Python rule-based scorer: word valences plus negation, booster,
+    contrast ("but"), capitals and exclamation rules.
+
+    Microseconds per text and nothing to load but one small file, so it
+    works as the fast tier in front of the transformer (see
+    app.ai.sentiment) or as the whole backend when no model is installed.
+    `polarity()` gives the underlying compound score in [-1, 1];
+    predict() maps it to the usual {"label", "score"} shape.
+
+    Args:
+        path (str): Lexicon file (see app/ai/data/sentiment_lexicon.tsv)
+    """
+
+    backend = "lexicon"
+
+    def __init__(self, path: str = DEFAULT_LEXICON_PATH):
+        super().__init__(path)
+        # No token window: long texts are scored in one go
+        self.max_length = sys.maxsize
+        self.valences = {}
+        self.negations = frozenset()
+        self.boosters = {}
+        self.version = None
+
+    def _build(self):
+        valences, negations, boosters = {}, set(), {}
+        with open(self.model_name, encoding="utf-8") as f:
+            content = f.read()
+        for line in content.splitlines():
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if fields[0] == "@negation":
+                negations.add(fields[1])
+            elif fields[0] == "@booster":
+                boosters[fields[1]] = float(fields[2])
+            else:
+                valences[fields[0]] = float(fields[1])
+
+        self.valences = valences
+        self.negations = frozenset(negations)
+        self.boosters = boosters
+        self.version = hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+    def polarity(self, text: str) -> float:
+        """
+        Compound sentiment score of text.
+        Returns:
+            float: -1 (most negative) to 1 (most positive), 0 if no sentiment words
+        """
+        self.load()
+        words = _TOKEN_RE.findall(text)
+        tokens = [word.lower() for word in words]
+        # Capitals only emphasise a word when the whole text isn't in capitals
+        caps_emphasis = not text.isupper()
+
+        contrast = -1
+        for i, token in enumerate(tokens):
+            if token in _CONTRAST_WORDS:
+                contrast = i
+
+        total = 0.0
+        for i, token in enumerate(tokens):
+            valence = self.valences.get(token)
+            if valence is None:
+                continue
+            if caps_emphasis and len(words[i]) > 1 and words[i].isupper():
+                valence += math.copysign(CAPS_BOOST, valence)
+
+            # Boosters and negations in the three preceding words
+            for distance, previous in enumerate(tokens[max(0, i - 3):i][::-1]):
+                boost = self.boosters.get(previous)
+                if boost is not None:
+                    valence += math.copysign(boost, valence) * (1 - 0.05 * distance)
+                if previous in self.negations or previous.endswith("n't"):
+                    valence *= NEGATION_SCALAR
+
+            if contrast >= 0:
+                valence *= CONTRAST_BEFORE if i < contrast else CONTRAST_AFTER
+            total += valence
+
+        if total:
+            total += math.copysign(min(text.count("!"), 4) * EXCLAMATION_BOOST, total)
+        return total / math.sqrt(total * total + NORMALIZATION_ALPHA)
+
+    def _predict(self, texts: list[str]) -> list[dict]:
+        results = []
+        for text in texts:
+            polarity = self.polarity(text)
+            results.append({
+                "label": "POSITIVE" if polarity >= 0 else "NEGATIVE",
+                "score": (1 + abs(polarity)) / 2,
+            })
+        return results
+
+    def token_spans(self, text: str) -> list[tuple[int, int]]:
+        return [match.span() for match in _TOKEN_RE.finditer(text)]
+
+    def info(self) -> dict:
+        info = super().info()
+        info["lexicon_version"] = self.version
+        return info
@@ -0,0 +1,71 @@
+# app/ai/long_text.py
+import re
+from collections import deque
+from typing import Callable, Iterator
+
+_LAST_WHITESPACE = re.compile(r"\s(?=\S*\Z)")
+
+
+def iter_token_spans(
+    text: str,
+    token_spans: Callable[[str], list[tuple[int, int]]],
+    block_chars: int = 8192,
+) -> Iterator[tuple[int, int]]:
+    """
+    Yield (start, end) character offsets of every token in text.
+
+    The text is tokenized one block at a time, each block cut at whitespace
+    so no word is split, which keeps memory flat for very long inputs.
+
+    Args:
+        text (str): Input text
+        token_spans (callable): Tokenizes a string into character offsets
+        block_chars (int): Approximate characters tokenized per call
+    """
+    pos, size = 0, len(text)
+    while pos < size:
+        end = min(pos + block_chars, size)
+        if end < size:
+            match = _LAST_WHITESPACE.search(text, pos, end)
+            if match and match.start() > pos:
+                end = match.start()
+        for start, stop in token_spans(text[pos:end]):
+            yield pos + start, pos + stop
+        pos = end
+
+
+def iter_token_windows(
+    spans: Iterator[tuple[int, int]],
+    window: int,
+    overlap: int,
+) -> Iterator[tuple[int, int, int]]:
+    """
+    Group token spans into overlapping windows of at most `window` tokens.
+
+    Consecutive windows share `overlap` tokens. Each window is yielded as
+    (start_char, end_char, new_tokens), where new_tokens counts the tokens
+    not already covered by the previous window, so summing it over all
+    windows gives the document's token count (used as the window weight).
+
+    Only one window of spans is held in memory at a time.
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if not 0 <= overlap < window:
+        raise ValueError("overlap must be between 0 and window - 1")
+
+    step = window - overlap
+    buffer = deque()
+    fresh = 0
+    for span in spans:
+        buffer.append(span)
+        fresh += 1
+        if len(buffer) == window:
+            yield buffer[0][0], buffer[-1][1], fresh
+            for _ in range(step):
+                buffer.popleft()
+            fresh = 0
+
+    # Tail: tokens after the last full window (or a document shorter than one)
+    if fresh:
+        yield buffer[0][0], buffer[-1][1], fresh
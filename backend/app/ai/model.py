@@ -0,0 +1,159 @@
+# app/ai/model.py
+import threading
+import time
+
+WARMUP_TEXT = "PulseAI warm-up: this product works great."
+
+
+class SentimentModel:
+    """
+    Handle around a sentiment classifier.
+
+    Nothing heavy happens on construction: the inference library is only
+    imported when `load()` runs, which the FastAPI lifespan hook does at
+    startup. Calling `predict()` before that loads the model on demand, so
+    scripts like test_ai.py keep working without a server.
+
+    Subclasses implement `_build()` and `_predict()`; `predict()` returns the
+    same shape as the transformers pipeline: {"label": str, "score": float}.
+    `_build()` also sets `_span_tokenizer`, a `tokenizers.Tokenizer` with
+    truncation and padding off, and `max_length`, the model's token window.
+
+    Args:
+        model_name (str): Hugging Face model id
+    """
+
+    backend = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._span_tokenizer = None
+        self.max_length = 512
+        self.load_seconds = None
+        self.warmed_up = False
+        self.error = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        """Import the backend and build the model (once)."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            started = time.perf_counter()
+            try:
+                self._build()
+            except Exception as exc:
+                self.error = f"{type(exc).__name__}: {exc}"
+                raise
+            self.error = None
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            self._loaded = True
+
+    def warmup(self):
+        """Run one inference so the first real request doesn't pay for lazy init."""
+        self.predict([WARMUP_TEXT])
+        self.warmed_up = True
+
+    def predict(self, texts: list[str]) -> list[dict]:
+        """
+        Run one batched forward pass.
+        Returns:
+            list[dict]: {"label": str, "score": float} per text
+        """
+        self.load()
+        return self._predict(texts)
+
+    def token_spans(self, text: str) -> list[tuple[int, int]]:
+        """
+        Character offsets of each token in text, without special tokens and
+        without truncation. Used to cut long documents into token windows.
+        """
+        self.load()
+        return self._span_tokenizer.encode(text, add_special_tokens=False).offsets
+
+    def set_threads(self, threads: int):
+        """
+        Limit inference to `threads` intra-op threads. Also called in each
+        inference worker right after it is forked from the loaded parent, so
+        implementations rebuild anything that doesn't survive fork.
+        """
+
+    def close(self):
+        """Release resources; the next predict() loads the model again."""
+        self._loaded = False
+        self.warmed_up = False
+
+    def info(self) -> dict:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "loaded": self.is_loaded,
+            "warmed_up": self.warmed_up,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+    def _build(self):
+        raise NotImplementedError
+
+    def _predict(self, texts: list[str]) -> list[dict]:
+        raise NotImplementedError
+
+
+class TorchSentimentModel(SentimentModel):
+    """PyTorch model served through the transformers pipeline."""
+
+    backend = "torch"
+
+    def _build(self):
+        from tokenizers import Tokenizer
+        from transformers import pipeline
+
+        self._pipeline = pipeline("sentiment-analysis", model=self.model_name)
+
+        # Private copy: the pipeline toggles truncation on its own tokenizer
+        # per call, which is not safe to share across threads
+        tokenizer = self._pipeline.tokenizer
+        self._span_tokenizer = Tokenizer.from_str(tokenizer.backend_tokenizer.to_str())
+        self._span_tokenizer.no_truncation()
+        self._span_tokenizer.no_padding()
+        self.max_length = min(tokenizer.model_max_length, 512)
+
+    def _predict(self, texts: list[str]) -> list[dict]:
+        return self._pipeline(texts, batch_size=len(texts), truncation=True)
+
+    def set_threads(self, threads: int):
+        # After fork the weights are shared copy-on-write with the parent;
+        # only the intra-op pool needs sizing (it isn't started before fork)
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+def create_model(backend: str, model_name: str, **options) -> SentimentModel:
+    """
+    Build the model handle for a backend name.
+
+    Args:
+        backend (str): "torch", "onnx" or "lexicon"
+        model_name (str): Hugging Face model id
+        **options: Backend specific options (see the backend class)
+    """
+    if backend == "torch":
+        return TorchSentimentModel(model_name)
+    if backend == "onnx":
+        from app.ai.onnx_model import OnnxSentimentModel
+
+        return OnnxSentimentModel(model_name, **options)
+    if backend == "lexicon":
+        from app.ai.lexicon_model import LexiconSentimentModel
+
+        return LexiconSentimentModel(**options)
+    raise ValueError(f"Unknown sentiment backend: {backend!r}")
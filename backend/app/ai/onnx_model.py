@@ -0,0 +1,219 @@
+# app/ai/onnx_model.py
+import json
+import os
+import re
+import shutil
+import tempfile
+
+from app.ai.model import SentimentModel
+
+DEFAULT_ONNX_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pulseai", "onnx")
+
+# Bump when the export recipe changes so cached artifacts are rebuilt
+EXPORT_VERSION = 1
+ONNX_OPSET = 17
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+META_FILE = "meta.json"
+
+
+def artifact_dir(model_name: str, cache_dir: str = DEFAULT_ONNX_DIR) -> str:
+    """Folder holding the exported artifacts for one model id."""
+    slug = re.sub(r"[^\w.-]+", "--", model_name)
+    return os.path.join(cache_dir, slug)
+
+
+def _read_meta(path: str):
+    try:
+        with open(os.path.join(path, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def export_onnx(model_name: str, cache_dir: str = DEFAULT_ONNX_DIR, quantize: bool = True) -> str:
+    """
+    Export a Hugging Face sequence classifier to ONNX (once) and cache it on disk.
+
+    The export needs torch + transformers; serving the cached artifact only
+    needs onnxruntime + tokenizers. A dynamic int8 copy is added when
+    `quantize` is set. Re-running is a no-op when the cache is current.
+
+    Args:
+        model_name (str): Hugging Face model id
+        cache_dir (str): Root folder for exported models
+        quantize (bool): Also write the int8 dynamically quantized model
+
+    Returns:
+        str: Folder with model.onnx, model.int8.onnx, tokenizer.json, meta.json
+    """
+    target = artifact_dir(model_name, cache_dir)
+    meta = _read_meta(target)
+    if meta and meta.get("export_version") == EXPORT_VERSION:
+        if not quantize or os.path.exists(os.path.join(target, INT8_FILE)):
+            return target
+        _quantize(target)
+        return target
+
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Build in a scratch folder and swap it in, so a crash never leaves a
+    # half-written artifact that later loads would trust
+    scratch = tempfile.mkdtemp(prefix=".export-", dir=cache_dir)
+    try:
+        sample = tokenizer(["PulseAI export sample"], return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                os.path.join(scratch, FP32_FILE),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"},
+                },
+                opset_version=ONNX_OPSET,
+                dynamo=False,
+            )
+
+        tokenizer.save_pretrained(scratch)
+        with open(os.path.join(scratch, META_FILE), "w") as f:
+            json.dump({
+                "model_name": model_name,
+                "export_version": EXPORT_VERSION,
+                "opset": ONNX_OPSET,
+                "id2label": {str(k): v for k, v in model.config.id2label.items()},
+                "max_length": min(tokenizer.model_max_length, 512),
+                "pad_token": tokenizer.pad_token,
+                "pad_token_id": tokenizer.pad_token_id,
+            }, f, indent=2)
+
+        if quantize:
+            _quantize(scratch)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(scratch, target)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return target
+
+
+def _quantize(path: str):
+    """Write the dynamic int8 copy of model.onnx next to it."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        os.path.join(path, FP32_FILE),
+        os.path.join(path, INT8_FILE),
+        weight_type=QuantType.QInt8,
+    )
+
+
+class OnnxSentimentModel(SentimentModel):
+    """
+    Sentiment classifier served by onnxruntime on CPU.
+
+    Exports the model on first load (see `export_onnx`), then serves it with
+    the `tokenizers` library and an onnxruntime session, so torch is not
+    needed once the artifact is cached.
+
+    Args:
+        model_name (str): Hugging Face model id
+        quantize (bool): Serve the int8 dynamically quantized model
+        cache_dir (str): Root folder for exported models
+        intra_op_threads (int): onnxruntime intra-op threads, 0 = library default
+    """
+
+    backend = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = True,
+        cache_dir: str = DEFAULT_ONNX_DIR,
+        intra_op_threads: int = 0,
+    ):
+        super().__init__(model_name)
+        self.quantize = quantize
+        self.cache_dir = cache_dir
+        self.intra_op_threads = intra_op_threads
+
+    def _build(self):
+        import numpy as np
+        from tokenizers import Tokenizer
+
+        path = export_onnx(self.model_name, self.cache_dir, quantize=self.quantize)
+        meta = _read_meta(path)
+
+        tokenizer_file = os.path.join(path, "tokenizer.json")
+        self._span_tokenizer = Tokenizer.from_file(tokenizer_file)
+        self._span_tokenizer.no_truncation()
+        self._span_tokenizer.no_padding()
+        self.max_length = meta["max_length"]
+
+        tokenizer = Tokenizer.from_file(tokenizer_file)
+        tokenizer.enable_truncation(max_length=meta["max_length"])
+        tokenizer.enable_padding(pad_id=meta["pad_token_id"], pad_token=meta["pad_token"])
+
+        self._np = np
+        self._path = path
+        self._tokenizer = tokenizer
+        self._labels = [meta["id2label"][str(i)] for i in range(len(meta["id2label"]))]
+        self._session = self._new_session()
+
+    def _new_session(self):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+
+        model_file = INT8_FILE if self.quantize else FP32_FILE
+        return ort.InferenceSession(
+            os.path.join(self._path, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def set_threads(self, threads: int):
+        # onnxruntime thread pools don't survive fork, so each worker opens
+        # its own session on the cached artifact
+        self.intra_op_threads = threads
+        self._session = self._new_session()
+
+    def _predict(self, texts: list[str]) -> list[dict]:
+        np = self._np
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        (logits,) = self._session.run(
+            ["logits"], {"input_ids": input_ids, "attention_mask": attention_mask}
+        )
+
+        # Softmax in float64 so scores match the torch pipeline closely
+        logits = logits.astype(np.float64)
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        best = probs.argmax(axis=1)
+        return [
+            {"label": self._labels[i], "score": float(probs[row, i])}
+            for row, i in enumerate(best)
+        ]
+
+    def info(self) -> dict:
+        info = super().info()
+        info["quantized"] = self.quantize
+        return info
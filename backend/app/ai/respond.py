@@ -1,81 +1,178 @@
 # app/ai/respond.py
-from rapidfuzz import fuzz, process
-from app.ai.sentiment import analyze_sentiment
-from app.ai.topics import extract_topics
-from app.ai.risk import detect_risk
+import os
+from app.ai.sentiment import analyze_sentiment, analyze_sentiment_batch, model_version
+from app.ai.topics import extract_topics, extract_topics_batch
+from app.ai.risk import assess_risk, RISK_LEXICON_VERSION
 from app.ai.summary import summarize_text
 from app.ai.feedback import generate_feedback
+from app.ai.cache import AnalysisCache
+from app.ai.intents import IntentIndex
 
 
-# General PulseAI questions with human-like responses
-GENERAL_QUESTIONS = {
-    "who built pulseai": "Hello {user_name}! PulseAI is your personal AI assistant for analyzing text. "
-                         "It can summarize text, detect sentiment, identify key topics, and highlight any risks. "
-                         "PulseAI was created to help users understand their feedback and messages more easily. "
-                         "It was built by Khutso Makunyane, your friendly Software Engineer!",
-    "who created pulseai": "Hello {user_name}! PulseAI was created by Khutso Makunyane. "
-                           "It helps users analyze text, summarize it, detect sentiment, and highlight topics and risks.",
-    "what is pulseai": "Hello {user_name}! PulseAI is your personal AI assistant that can summarize text, "
-                       "analyze sentiment, detect key topics, and identify risks. It was built by Khutso Makunyane.",
-    "tell me about pulseai": "Hello {user_name}! PulseAI is your AI assistant for understanding messages and feedback. "
-                             "It was built by Khutso Makunyane to make text analysis easy and smart!",  # ✅ comma added
-    "who's the creator of pulseai": "Hello {user_name}! PulseAI was created by Khutso Makunyane. "
-                                   "It can summarize text, detect sentiment, and highlight key topics and risks.",
-    "who is the creator of pulseai": "Hello {user_name}! PulseAI was created by Khutso Makunyane. "
-                                     "It helps users analyze and understand text easily.",
-    "what does pulseai do": "Hello {user_name}! PulseAI helps users analyze text: it summarizes, detects sentiment, "
-                            "highlights topics, and identifies potential risks. Built by Khutso Makunyane.",
-    "what can pulseai do": "Hello {user_name}! PulseAI can summarize text, detect sentiment, identify key topics, "
-                            "and highlight risks. Developed by Khutso Makunyane.",
-    "who developed pulseai": "Hello {user_name}! PulseAI was developed by Khutso Makunyane. "
-                             "It’s your smart AI assistant for text analysis.",
-}
-
+# General PulseAI questions with human-like responses, loaded from a data
+# file and compiled once into an index
+INTENTS_PATH = os.getenv(
+    "INTENTS_PATH", os.path.join(os.path.dirname(__file__), "data", "intents.json")
+)
 
 # Minimum similarity percentage to consider it a match
 FUZZY_THRESHOLD = 75
 
-def get_response(user_name: str, text: str):
+intent_index = IntentIndex.from_file(INTENTS_PATH, threshold=FUZZY_THRESHOLD)
+
+# Bump when topics/summary/risk logic changes in a way that alters results
+ANALYSIS_VERSION = 4
+
+
+def cache_version() -> str:
+    """Everything that changes an analysis result; part of every cache key."""
+    return f"v{ANALYSIS_VERSION}|{model_version()}|risk:{RISK_LEXICON_VERSION}"
+
+
+# Cache of analysis results keyed by normalized text + model/lexicon version
+analysis_cache = AnalysisCache(
+    version=cache_version(),
+    maxsize=int(os.getenv("ANALYSIS_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ANALYSIS_CACHE_TTL", "3600")),
+    sqlite_path=os.getenv("ANALYSIS_CACHE_DB", ""),
+    sqlite_ttl=float(os.getenv("ANALYSIS_CACHE_DB_TTL", str(7 * 24 * 3600))),
+)
+
+
+def _copy(cached: dict, topics: list[str]):
+    # Hand out copies so callers can't mutate the cached entry
+    return {
+        "sentiment": dict(cached["sentiment"]),
+        "topics": topics,
+        "risk": cached["risk"],
+        "risk_level": cached["risk_level"],
+        "risk_score": cached["risk_score"],
+        "risk_matches": list(cached["risk_matches"]),
+        "summary": cached["summary"],
+    }
+
+
+def _analyze_uncached(text: str, sentiment_result: dict):
+    risk = assess_risk(text, sentiment_result["sentiment"])
+    return {
+        "sentiment": sentiment_result,
+        "risk": risk["risk"],
+        "risk_level": risk["level"],
+        "risk_score": risk["score"],
+        "risk_matches": risk["matches"],
+        "summary": summarize_text(text),
+    }
+
+
+def analyze_text(text: str, corpus=None):
     """
-    Generate AI response for user text.
-    - If text is a general question (even with typos), respond like a human.
-    - Otherwise, do full AI analysis and generate friendly feedback.
+    Run the full analysis pipeline, reusing a cached result when this text
+    (after normalization) was already analyzed by the same model version.
+    Topics depend on the user's corpus, so they are never cached: they are
+    scored against (and added to) `corpus` on every call.
+
+    Returns:
+        dict: {"sentiment": dict, "topics": list[str], "risk": bool,
+               "risk_level": str, "risk_score": float, "risk_matches": list[str],
+               "summary": str}
     """
-    text_lower = text.lower().strip()
+    cached = analysis_cache.get(text)
+    if cached is None:
+        cached = _analyze_uncached(text, analyze_sentiment(text))
+        analysis_cache.set(text, cached)
+    return _copy(cached, extract_topics(text, corpus=corpus))
 
-    # Fuzzy match user input to general questions
-    best_match, score, _ = process.extractOne(
-        text_lower,
-        GENERAL_QUESTIONS.keys(),
-        scorer=fuzz.token_sort_ratio
-    )
 
+def analyze_texts(texts: list[str], corpus=None):
+    """
+    Batch version of analyze_text: cache misses are scored together through
+    analyze_sentiment_batch, and repeated texts are only analyzed once.
 
-    if score >= FUZZY_THRESHOLD:
-        return {
-            "type": "human_response",
-            "response": GENERAL_QUESTIONS[best_match].format(user_name=user_name)
-        }
+    Returns:
+        list[dict]: One analyze_text result per input, in order
+    """
+    results = [None] * len(texts)
+    misses = {}
+    for i, text in enumerate(texts):
+        cached = analysis_cache.get(text)
+        if cached is not None:
+            results[i] = cached
+        else:
+            misses.setdefault(analysis_cache.key(text), []).append(i)
 
-    # Full AI analysis
-    sentiment_result = analyze_sentiment(text)
-    topics = extract_topics(text)
-    risk_flag = detect_risk(text, sentiment_result["sentiment"])
-    summary = summarize_text(text)
+    if misses:
+        first = [indexes[0] for indexes in misses.values()]
+        sentiments = analyze_sentiment_batch([texts[i] for i in first])
+        for indexes, sentiment_result in zip(misses.values(), sentiments):
+            text = texts[indexes[0]]
+            cached = _analyze_uncached(text, sentiment_result)
+            analysis_cache.set(text, cached)
+            for i in indexes:
+                results[i] = cached
 
+    topics = extract_topics_batch(texts, corpus=corpus)
+    return [_copy(cached, text_topics) for cached, text_topics in zip(results, topics)]
+
+
+def _human_response(user_name: str, match):
+    """Human-style answer for an intent match, None if there was no match."""
+    if match is None:
+        return None
+    return {
+        "type": "human_response",
+        "response": match["intent"]["response"].format(user_name=user_name)
+    }
+
+
+def _match_general_question(user_name: str, text: str):
+    """Human-style answer if text is a general PulseAI question, else None."""
+    # Fuzzy match user input to general questions (even with typos)
+    return _human_response(user_name, intent_index.match(text))
+
+
+def _analysis_response(user_name: str, analysis: dict):
     feedback_message = generate_feedback(
         user_name=user_name,
-        sentiment=sentiment_result,
-        summary=summary,
-        topics=topics,
-        risk=risk_flag
+        sentiment=analysis["sentiment"],
+        summary=analysis["summary"],
+        topics=analysis["topics"],
+        risk=analysis["risk"]
     )
 
     return {
         "type": "analysis_response",
-        "sentiment": sentiment_result,
-        "topics": topics,
-        "risk": risk_flag,
-        "summary": summary,
+        **analysis,
         "feedback": feedback_message
     }
+
+
+def get_response(user_name: str, text: str, corpus=None):
+    """
+    Generate AI response for user text.
+    - If text is a general question (even with typos), respond like a human.
+    - Otherwise, do full AI analysis and generate friendly feedback, with
+      topics scored against the user's corpus (a TopicCorpus) if given.
+    """
+    human_response = _match_general_question(user_name, text)
+    if human_response:
+        return human_response
+
+    # Full AI analysis (cached per text)
+    return _analysis_response(user_name, analyze_text(text, corpus=corpus))
+
+
+def get_responses(user_name: str, texts: list[str], corpus=None):
+    """
+    get_response for many texts at once. General questions are answered
+    individually; everything else goes through the batched analysis path.
+
+    Returns:
+        list[dict]: One get_response result per input, in order
+    """
+    results = [_human_response(user_name, match) for match in intent_index.match_batch(texts)]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    analyses = analyze_texts([texts[i] for i in pending], corpus=corpus)
+    for i, analysis in zip(pending, analyses):
+        results[i] = _analysis_response(user_name, analysis)
+    return results
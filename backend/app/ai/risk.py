@@ -1,6 +1,165 @@
 # app/ai/risk.py
+import hashlib
+import os
+import re
+from collections import deque
+
+RISK_LEXICON_PATH = os.getenv(
+    "RISK_LEXICON_PATH", os.path.join(os.path.dirname(__file__), "data", "risk_lexicon.tsv")
+)
+
+# Score thresholds for the severity levels (score below MEDIUM is Low)
+RISK_MEDIUM_SCORE = 1.0
+RISK_HIGH_SCORE = 3.0
+RISK_LEVELS = ["Low", "Medium", "High"]
+
+# Added to the lexicon score when the sentiment model says NEGATIVE
+NEGATIVE_SENTIMENT_WEIGHT = 1.0
+
+_WORD_RE = re.compile(r"\w+(?:'\w+)*")
+
+
+def _tokens(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+class RiskLexicon:
+    """
+    Weighted terms and phrases compiled into one Aho-Corasick automaton over
+    words rather than characters.
+
+    Matching whole tokens gives word boundaries for free ("bad" does not
+    fire on "badge") and lets multi-word phrases share prefixes. A scan is
+    a single pass over the text's tokens with one dict lookup per step, so
+    its cost depends on the text, not on how many terms are loaded.
+
+    Args:
+        terms (dict[str, float]): Term or phrase -> weight
+    """
+
+    def __init__(self, terms: dict[str, float]):
+        self.terms = {}
+        # Node 0 is the root; per node: outgoing edges, failure link, outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for term, weight in terms.items():
+            tokens = _tokens(term)
+            if not tokens:
+                continue
+            phrase = " ".join(tokens)
+            self.terms[phrase] = float(weight)
+            node = 0
+            for token in tokens:
+                nxt = self._goto[node].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][token] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = (phrase,)
+
+        # Breadth-first failure links; outputs inherit their failure node's
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+        self.version = hashlib.sha1(
+            "\n".join(f"{term}\t{weight}" for term, weight in sorted(self.terms.items())).encode("utf-8")
+        ).hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path: str) -> "RiskLexicon":
+        """Load a tab-separated "term<TAB>weight" file; # starts a comment."""
+        terms = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                term, _, weight = line.rpartition("\t")
+                terms[term.strip()] = float(weight)
+        return cls(terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def scan(self, text: str) -> dict[str, int]:
+        """
+        Find every lexicon term in text.
+
+        Returns:
+            dict[str, int]: Matched term -> number of occurrences
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        found = {}
+        node = 0
+        for token in _tokens(text):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for term in out[node]:
+                found[term] = found.get(term, 0) + 1
+        return found
+
+
+risk_lexicon = RiskLexicon.from_file(RISK_LEXICON_PATH)
+
+# Changes whenever the lexicon or scoring does, so cached analyses are invalidated
+RISK_LEXICON_VERSION = hashlib.sha1(
+    f"{risk_lexicon.version}|{RISK_MEDIUM_SCORE}|{RISK_HIGH_SCORE}|{NEGATIVE_SENTIMENT_WEIGHT}".encode("utf-8")
+).hexdigest()[:12]
+
+
+def risk_level(score: float) -> str:
+    """Severity bucket for a risk score."""
+    if score >= RISK_HIGH_SCORE:
+        return "High"
+    if score >= RISK_MEDIUM_SCORE:
+        return "Medium"
+    return "Low"
+
+
+def assess_risk(text: str, sentiment: str = None):
+    """
+    Score how risky feedback is.
+
+    Each distinct lexicon term found adds its weight once (repeating a word
+    doesn't escalate), and negative sentiment adds NEGATIVE_SENTIMENT_WEIGHT.
+
+    Args:
+        text (str): Feedback text
+        sentiment (str, optional): Sentiment result (POSITIVE/NEGATIVE)
+
+    Returns:
+        dict: {"risk": bool, "level": "Low"/"Medium"/"High", "score": float,
+               "matches": list[str]}
+    """
+    matches = risk_lexicon.scan(text)
+    score = sum((risk_lexicon.terms[term] for term in matches), 0.0)
+
+    # Optional: consider negative sentiment as risky
+    if sentiment == "NEGATIVE":
+        score += NEGATIVE_SENTIMENT_WEIGHT
+
+    level = risk_level(score)
+    return {
+        "risk": level != "Low",
+        "level": level,
+        "score": round(score, 2),
+        "matches": sorted(matches),
+    }
 
-RISKY_WORDS = ["refund", "scam", "lawsuit", "angry", "broken", "bad", "delay", "hate"]
 
 def detect_risk(text: str, sentiment: str = None):
     """
@@ -13,14 +172,4 @@ def detect_risk(text: str, sentiment: str = None):
     Returns:
         bool: True if risky, False otherwise
     """
-    text_lower = text.lower()
-    
-    # Risk based on keywords
-    if any(word in text_lower for word in RISKY_WORDS):
-        return True
-    
-    # Optional: consider negative sentiment as risky
-    if sentiment == "NEGATIVE":
-        return True
-    
-    return False
+    return assess_risk(text, sentiment)["risk"]
@@ -1,20 +1,267 @@
 # app/ai/sentiment.py
-from transformers import pipeline
+import os
+import threading
+from itertools import islice
+from app.ai.batching import MicroBatcher
+from app.ai.lexicon_model import DEFAULT_LEXICON_PATH
+from app.ai.long_text import iter_token_spans, iter_token_windows
+from app.ai.model import create_model
+from app.ai.onnx_model import DEFAULT_ONNX_DIR
+from app.ai.worker_pool import ProcessPoolSentimentModel
 
-# Load sentiment analysis model once (do not reload per request)
-sentiment_pipeline = pipeline(
-    "sentiment-analysis",
-    model="distilbert-base-uncased-finetuned-sst-2-english"
+SENTIMENT_MODEL_NAME = os.getenv(
+    "SENTIMENT_MODEL_NAME", "distilbert-base-uncased-finetuned-sst-2-english"
 )
 
+# Inference backend: "torch" (transformers pipeline), "onnx" (onnxruntime)
+# or "lexicon" (rules only, no model)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+SENTIMENT_ONNX_QUANTIZE = os.getenv("SENTIMENT_ONNX_QUANTIZE", "1") == "1"
+SENTIMENT_ONNX_DIR = os.getenv("SENTIMENT_ONNX_DIR", DEFAULT_ONNX_DIR)
+SENTIMENT_ONNX_THREADS = int(os.getenv("SENTIMENT_ONNX_THREADS", "0"))
+
+# Worker processes for inference (0 = run in this process). Workers are
+# forked after the model loads, so they share its weights copy-on-write;
+# a batch with no answer after SENTIMENT_WORKER_TIMEOUT seconds fails
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))
+SENTIMENT_WORKER_THREADS = int(os.getenv("SENTIMENT_WORKER_THREADS", "1"))
+SENTIMENT_WORKER_TIMEOUT = float(os.getenv("SENTIMENT_WORKER_TIMEOUT", "30"))
+
+# Micro-batching: concurrent requests share one forward pass. Batches fill
+# only as far as INFERENCE_WORKERS lets callers in, which by default is
+# sized from these two settings (see app/ai/executor.py)
+SENTIMENT_MAX_BATCH_SIZE = int(os.getenv("SENTIMENT_MAX_BATCH_SIZE", "16"))
+SENTIMENT_MAX_WAIT_MS = float(os.getenv("SENTIMENT_MAX_WAIT_MS", "5"))
+
+# Long documents: overlapping token windows, scored a few at a time so other
+# requests' items interleave with them in the batcher queue
+SENTIMENT_WINDOW_OVERLAP = int(os.getenv("SENTIMENT_WINDOW_OVERLAP", "64"))
+SENTIMENT_LONG_BATCH = int(os.getenv("SENTIMENT_LONG_BATCH", "8"))
+
+# Tiered cascade: the lexicon answers short texts whose compound score is at
+# least SENTIMENT_LEXICON_THRESHOLD away from neutral; only texts inside that
+# uncertainty band go to the model. Off by default: the threshold has only
+# been tuned on the small labelled corpus, and the lexicon's confidence is
+# not calibrated against the model's probabilities. Turn it on once
+# benchmarks/sentiment_cascade.py agrees with the model on held-out data
+SENTIMENT_LEXICON_PATH = os.getenv("SENTIMENT_LEXICON_PATH", DEFAULT_LEXICON_PATH)
+SENTIMENT_CASCADE = os.getenv("SENTIMENT_CASCADE", "0") == "1" and SENTIMENT_BACKEND != "lexicon"
+SENTIMENT_LEXICON_THRESHOLD = float(os.getenv("SENTIMENT_LEXICON_THRESHOLD", "0.45"))
+
+# Model handle: loaded by start() from the app lifespan, not at import time
+if SENTIMENT_BACKEND == "onnx":
+    sentiment_model = create_model(
+        "onnx",
+        SENTIMENT_MODEL_NAME,
+        quantize=SENTIMENT_ONNX_QUANTIZE,
+        cache_dir=SENTIMENT_ONNX_DIR,
+        intra_op_threads=SENTIMENT_ONNX_THREADS,
+    )
+elif SENTIMENT_BACKEND == "lexicon":
+    sentiment_model = create_model("lexicon", SENTIMENT_MODEL_NAME, path=SENTIMENT_LEXICON_PATH)
+else:
+    sentiment_model = create_model(SENTIMENT_BACKEND, SENTIMENT_MODEL_NAME)
+
+# The lexicon is one small file, so it is loaded right away
+lexicon_model = create_model("lexicon", SENTIMENT_MODEL_NAME, path=SENTIMENT_LEXICON_PATH)
+if SENTIMENT_CASCADE:
+    lexicon_model.load()
+
+# Which tier answered, for /health/stats
+_tier_lock = threading.Lock()
+_tier_counts = {"lexicon": 0, "model": 0}
+
+if SENTIMENT_WORKERS > 0:
+    sentiment_model = ProcessPoolSentimentModel(
+        sentiment_model,
+        workers=SENTIMENT_WORKERS,
+        threads_per_worker=SENTIMENT_WORKER_THREADS,
+        timeout=SENTIMENT_WORKER_TIMEOUT,
+    )
+
+sentiment_batcher = MicroBatcher(
+    sentiment_model.predict,
+    max_batch_size=SENTIMENT_MAX_BATCH_SIZE,
+    max_wait_ms=SENTIMENT_MAX_WAIT_MS,
+    # One batch in flight per worker process
+    concurrency=max(SENTIMENT_WORKERS, 1),
+)
+
+
+def start():
+    """Load the model and run a warm-up inference. Safe to call more than once."""
+    sentiment_model.load()
+    if not sentiment_model.warmed_up:
+        sentiment_model.warmup()
+
+
+def shutdown():
+    """Stop the batching threads and any inference worker processes."""
+    sentiment_batcher.stop()
+    if SENTIMENT_WORKERS > 0:
+        sentiment_model.close()
+
+
+def model_version() -> str:
+    """Identifies what produces the scores; part of the analysis cache key."""
+    if SENTIMENT_BACKEND == "lexicon":
+        # Same file as sentiment_model, which may be a worker pool that
+        # must not be forked from here
+        lexicon_model.load()
+        return f"lexicon:{lexicon_model.version}"
+    parts = [SENTIMENT_BACKEND, SENTIMENT_MODEL_NAME]
+    if SENTIMENT_BACKEND == "onnx":
+        parts.append("int8" if SENTIMENT_ONNX_QUANTIZE else "fp32")
+    if SENTIMENT_CASCADE:
+        parts.append(f"cascade-{lexicon_model.version}-{SENTIMENT_LEXICON_THRESHOLD}")
+    return ":".join(parts)
+
+
+def is_ready() -> bool:
+    return sentiment_model.is_loaded and sentiment_model.warmed_up
+
+
+def cascade_stats() -> dict:
+    """How many texts each tier answered."""
+    with _tier_lock:
+        counts = dict(_tier_counts)
+    total = counts["lexicon"] + counts["model"]
+    return {
+        "enabled": SENTIMENT_CASCADE,
+        "threshold": SENTIMENT_LEXICON_THRESHOLD,
+        **counts,
+        "model_calls_avoided": round(counts["lexicon"] / total, 4) if total else 0.0,
+    }
+
+
+def _count_tier(tier: str, count: int = 1):
+    with _tier_lock:
+        _tier_counts[tier] += count
+
+
+def _format(result: dict):
+    return {
+        "sentiment": result["label"],
+        "confidence": float(result["score"]),
+        "tier": "lexicon" if SENTIMENT_BACKEND == "lexicon" else "model"
+    }
+
+
+def _lexicon_tier(text: str):
+    """The lexicon's answer for text, or None if it is unsure (or disabled)."""
+    if not SENTIMENT_CASCADE or not _is_short(text):
+        return None
+    polarity = lexicon_model.polarity(text)
+    if abs(polarity) < SENTIMENT_LEXICON_THRESHOLD:
+        return None
+    return {
+        "sentiment": "POSITIVE" if polarity > 0 else "NEGATIVE",
+        "confidence": (1 + abs(polarity)) / 2,
+        "tier": "lexicon"
+    }
+
+
+def _window_tokens() -> int:
+    # Leave room for the [CLS] and [SEP] special tokens
+    return sentiment_model.max_length - 2
+
+
+def _is_short(text: str) -> bool:
+    # Every token covers at least one character, so this can't overflow
+    return len(text) <= _window_tokens()
+
+
 def analyze_sentiment(text: str):
     """
     Analyze sentiment of the given text.
+    Clear-cut short texts are answered by the lexicon tier; the rest go to
+    the model. Texts longer than the model window are scored with
+    analyze_sentiment_long.
+    Returns:
+        dict: {"sentiment": "POSITIVE"/"NEGATIVE", "confidence": float,
+               "tier": "lexicon"/"model"}
+        (plus "segments" when the text spanned several windows)
+    """
+    result = _lexicon_tier(text)
+    if result is not None:
+        _count_tier("lexicon")
+        return result
+    _count_tier("model")
+    if not _is_short(text):
+        return analyze_sentiment_long(text)
+    result = sentiment_batcher(text)
+    return _format(result)
+
+
+def analyze_sentiment_long(text: str):
+    """
+    Score a long document window by window.
+
+    The text is cut into overlapping token windows that fit the model, the
+    windows are scored SENTIMENT_LONG_BATCH at a time through the batcher,
+    and the positive probabilities are averaged weighted by each window's
+    new tokens. Only one group of windows is in memory at a time.
+
     Returns:
-        dict: {"sentiment": "POSITIVE"/"NEGATIVE", "confidence": float}
+        dict: {"sentiment": str, "confidence": float, "segments": list[dict]}
+        where each segment is {"start", "end", "tokens", "sentiment", "confidence"}
+        with character offsets into text. Single-window texts have no segments.
     """
-    result = sentiment_pipeline(text)[0]
+    window = _window_tokens()
+    windows = iter_token_windows(
+        iter_token_spans(text, sentiment_model.token_spans),
+        window=window,
+        overlap=min(SENTIMENT_WINDOW_OVERLAP, window - 1),
+    )
+
+    segments = []
+    weighted_positive = 0.0
+    total_tokens = 0
+    while True:
+        group = list(islice(windows, SENTIMENT_LONG_BATCH))
+        if not group:
+            break
+        futures = sentiment_batcher.submit_many(text[start:end] for start, end, _ in group)
+        for (start, end, tokens), future in zip(group, futures):
+            result = _format(future.result())
+            positive = result["confidence"] if result["sentiment"] == "POSITIVE" else 1 - result["confidence"]
+            weighted_positive += tokens * positive
+            total_tokens += tokens
+            segments.append({"start": start, "end": end, "tokens": tokens, **result})
+
+    if not segments:
+        # No tokens at all (e.g. only whitespace): score it like a short text
+        return _format(sentiment_batcher(text))
+    if len(segments) == 1:
+        return {key: segments[0][key] for key in ("sentiment", "confidence", "tier")}
+
+    positive = weighted_positive / total_tokens
     return {
-        "sentiment": result["label"],
-        "confidence": float(result["score"])
+        "sentiment": "POSITIVE" if positive >= 0.5 else "NEGATIVE",
+        "confidence": max(positive, 1 - positive),
+        "tier": segments[0]["tier"],
+        "segments": segments,
     }
+
+
+def analyze_sentiment_batch(texts: list[str]):
+    """
+    Analyze sentiment for many texts, sharing batches with concurrent callers.
+    Returns:
+        list[dict]: One analyze_sentiment result per input, in order
+    """
+    texts = list(texts)
+    results = [_lexicon_tier(text) for text in texts]
+    pending = [i for i, result in enumerate(results) if result is None]
+    _count_tier("lexicon", len(texts) - len(pending))
+    _count_tier("model", len(pending))
+
+    short = [i for i in pending if _is_short(texts[i])]
+    futures = sentiment_batcher.submit_many(texts[i] for i in short)
+
+    for i in pending:
+        if not _is_short(texts[i]):
+            results[i] = analyze_sentiment_long(texts[i])
+    for i, future in zip(short, futures):
+        results[i] = _format(future.result())
+    return results
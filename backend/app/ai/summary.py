@@ -1,17 +1,220 @@
 # app/ai/summary.py
+import re
+from collections import Counter
 
-def summarize_text(text: str, max_length: int = 50):
+from app.ai.topics import STOPWORDS
+
+# TextRank damping factor and power-iteration limits
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+# Above this many sentences the n x n graph is skipped and sentences are
+# ranked by similarity to the document centroid instead (O(n) not O(n^2))
+MAX_GRAPH_SENTENCES = 200
+
+# Only the first this many sentences of a text are scored
+MAX_SCORED_SENTENCES = 2000
+
+_ABBREVIATIONS = ("mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "approx", "no")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])|\n\s*\n|\n(?=\s*[-*•])")
+_ABBREVIATION_RE = re.compile(r"(?:^|\s)(?:%s)\.$" % "|".join(re.escape(a) for a in _ABBREVIATIONS), re.IGNORECASE)
+_WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences, keeping common abbreviations intact."""
+    sentences = []
+    pending = ""
+    for part in _SENTENCE_RE.split(text.strip()):
+        pending = f"{pending} {part}" if pending else part
+        if _ABBREVIATION_RE.search(pending):
+            continue
+        if pending.strip():
+            sentences.append(" ".join(pending.split()))
+        pending = ""
+    if pending.strip():
+        sentences.append(" ".join(pending.split()))
+    return sentences
+
+
+def _truncate(text: str, max_length: int) -> str:
+    if len(text) <= max_length:
+        return text
+    return text[:max_length].rstrip() + "..."
+
+
+# -------------------
+# Scoring
+# -------------------
+def _sentence_vectors(sentences: list[str]):
+    """
+    L2-normalized TF-IDF sentence vectors, IDF over the sentences, as sparse
+    (rows, columns, weights) entries: memory grows with the words in the
+    text, not with sentences x vocabulary.
+
+    Returns:
+        tuple[ndarray, ndarray, ndarray]: Sentence index, word index and
+        weight of every non-zero entry
+    """
+    import numpy as np
+
+    vocabulary = {}
+    rows, columns, values = [], [], []
+    for row, sentence in enumerate(sentences):
+        words = [w for w in _WORD_RE.findall(sentence.lower()) if w not in STOPWORDS]
+        for word, count in Counter(words).items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(word, len(vocabulary)))
+            values.append(count)
+
+    rows, columns = np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)
+    # Each (sentence, word) pair appears once, so a word's entries = its sentences
+    frequencies = np.bincount(columns, minlength=len(vocabulary))
+    idf = np.log((1 + len(sentences)) / (1 + frequencies)) + 1
+    weights = np.array(values, dtype=np.float64) * idf[columns]
+    norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=len(sentences)))
+    weights /= np.where(norms == 0, 1, norms)[rows]
+    return rows, columns, weights
+
+
+def _similarity(vectors, n: int):
+    """n x n cosine similarities of _sentence_vectors entries (diagonal zero)."""
+    import numpy as np
+
+    rows, columns, weights = vectors
+    similarity = np.zeros((n, n))
+    # Only words in two or more sentences link sentences; densify just those
+    shared = np.bincount(columns)[columns] > 1
+    if shared.any():
+        _, compact = np.unique(columns[shared], return_inverse=True)
+        matrix = np.zeros((n, compact.max() + 1))
+        matrix[rows[shared], compact] = weights[shared]
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0)
+    return similarity
+
+
+def _textrank(similarity, mask):
     """
-    Return a short summary of the text.
-    
+    TextRank scores for a stack of padded similarity graphs.
+
+    Args:
+        similarity (ndarray): (documents, n, n) cosine similarities, zero padded
+        mask (ndarray): (documents, n) True for real sentences
+
+    Returns:
+        ndarray: (documents, n) scores, zero on padding
+    """
+    import numpy as np
+
+    similarity = similarity.copy()
+    diagonal = np.arange(similarity.shape[1])
+    similarity[:, diagonal, diagonal] = 0
+
+    # Row-stochastic transitions; sentences with no neighbours jump uniformly
+    counts = mask.sum(axis=1, keepdims=True)
+    row_sums = similarity.sum(axis=2, keepdims=True)
+    uniform = mask[:, None, :] / counts[:, :, None]
+    transitions = np.where(row_sums > 0, similarity / np.where(row_sums == 0, 1, row_sums), uniform)
+
+    base = (1 - DAMPING) * mask / counts
+    scores = mask / counts
+    for _ in range(MAX_ITERATIONS):
+        updated = base + DAMPING * np.einsum("bij,bi->bj", transitions, scores) * mask
+        converged = np.abs(updated - scores).max() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def _centroid_scores(vectors, n: int):
+    import numpy as np
+
+    rows, columns, weights = vectors
+    if not len(weights):
+        return np.zeros(n)
+    centroid = np.bincount(columns, weights)
+    norm = np.linalg.norm(centroid)
+    return np.bincount(rows, weights * centroid[columns], minlength=n) / norm if norm else np.zeros(n)
+
+
+def _select(sentences: list[str], scores, max_length: int, max_sentences: int) -> str:
+    """Best-scoring sentences that fit both budgets, in document order."""
+    ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+    chosen, used = [], 0
+    for i in ranked:
+        if len(chosen) == max_sentences:
+            break
+        length = len(sentences[i]) + (1 if chosen else 0)
+        if used + length <= max_length:
+            chosen.append(i)
+            used += length
+    if not chosen:
+        # Nothing fits whole: cut the best sentence down to the budget
+        return _truncate(sentences[ranked[0]], max_length)
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+# -------------------
+# Public API
+# -------------------
+def summarize_text(text: str, max_length: int = 200, max_sentences: int = 2):
+    """
+    Return a short extractive summary of the text.
+
+    Sentences are ranked by TextRank over their TF-IDF cosine-similarity
+    graph (centroid similarity for very long texts, and only the first
+    MAX_SCORED_SENTENCES are scored), and the best ones that fit both
+    budgets are returned in their original order.
+
     Args:
         text (str): Input feedback
         max_length (int): Max number of characters in summary
-    
+        max_sentences (int): Max number of sentences in summary
+
     Returns:
         str: Summary
     """
-    # Placeholder: first max_length characters
-    if len(text) <= max_length:
-        return text
-    return text[:max_length].rstrip() + "..."
+    return summarize_batch([text], max_length=max_length, max_sentences=max_sentences)[0]
+
+
+def summarize_batch(texts: list[str], max_length: int = 200, max_sentences: int = 2):
+    """
+    summarize_text for many texts. Documents that need ranking have their
+    similarity graphs padded into one stack, so TextRank runs as a single
+    batched power iteration.
+
+    Returns:
+        list[str]: One summary per text, in order
+    """
+    import numpy as np
+
+    summaries = [None] * len(texts)
+    graphs = []
+    for i, text in enumerate(texts):
+        sentences = split_sentences(text)[:MAX_SCORED_SENTENCES]
+        if not sentences:
+            summaries[i] = ""
+        elif len(sentences) == 1 or len(text.strip()) <= max_length and len(sentences) <= max_sentences:
+            summaries[i] = _truncate(" ".join(sentences), max_length)
+        elif len(sentences) > MAX_GRAPH_SENTENCES:
+            scores = _centroid_scores(_sentence_vectors(sentences), len(sentences))
+            summaries[i] = _select(sentences, scores, max_length, max_sentences)
+        else:
+            graphs.append((i, sentences, _sentence_vectors(sentences)))
+
+    if graphs:
+        size = max(len(sentences) for _, sentences, _ in graphs)
+        similarity = np.zeros((len(graphs), size, size))
+        mask = np.zeros((len(graphs), size), dtype=bool)
+        for row, (_, sentences, vectors) in enumerate(graphs):
+            n = len(sentences)
+            similarity[row, :n, :n] = _similarity(vectors, n)
+            mask[row, :n] = True
+        scores = _textrank(similarity, mask)
+        for row, (i, sentences, _) in enumerate(graphs):
+            summaries[i] = _select(sentences, scores[row], max_length, max_sentences)
+
+    return summaries
@@ -15,7 +15,7 @@ def generate_chat_title(text: str, use_ai: bool = False) -> str:
     """
     if use_ai:
         # Use AI to generate a concise title
-        summary = summarize_text(text, max_sentences=1)
+        summary = summarize_text(text, max_length=50, max_sentences=1)
         # Clean up the summary to make it title-like
         summary = summary.strip('"').strip("'")
         if len(summary) > 50:
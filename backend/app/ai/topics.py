@@ -1,26 +1,186 @@
 # app/ai/topics.py
-from collections import Counter
+import math
+import os
 import re
+from collections import Counter
+
+STOPWORDS_PATH = os.path.join(os.path.dirname(__file__), "data", "stopwords.txt")
+
+# Longest phrase considered as a topic, in words
+MAX_NGRAM = 3
+
+# Row in the document-frequency table holding the corpus size
+CORPUS_SIZE_TERM = ""
+
+
+def _load_stopwords(path: str) -> frozenset:
+    with open(path, encoding="utf-8") as f:
+        return frozenset(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+
+STOPWORDS = _load_stopwords(STOPWORDS_PATH)
+
+# Phrases never span sentence punctuation
+_CLAUSE_RE = re.compile(r"[.!?,;:()\[\]\"\n]+")
+_TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
 
-def extract_topics(text: str, max_topics: int = 5):
+def candidate_terms(text: str, max_ngram: int = MAX_NGRAM) -> Counter:
+    """
+    Topic candidates in text with their counts: 1..max_ngram word phrases
+    inside runs of content words (no stopwords, numbers or 1-2 letter words).
+    """
+    counts = Counter()
+    for clause in _CLAUSE_RE.split(text.lower()):
+        run = []
+        for token in _TOKEN_RE.findall(clause) + [""]:
+            if len(token) > 2 and token not in STOPWORDS and not token.isdigit():
+                run.append(token)
+                continue
+            for n in range(1, min(max_ngram, len(run)) + 1):
+                for i in range(len(run) - n + 1):
+                    counts[" ".join(run[i:i + n])] += 1
+            run = []
+    return counts
+
+
+# -------------------
+# Document frequencies
+# -------------------
+class TopicCorpus:
+    """
+    In-memory document frequencies, for scripts and benchmarks.
+
+    A corpus only needs observe(); app.rollups.SQLTopicCorpus is the
+    persistent one.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.frequencies = Counter()
+
+    def observe(self, documents: list[set[str]]) -> tuple[int, dict]:
+        """
+        Add documents (each a set of terms) to the corpus.
+
+        Returns:
+            tuple[int, dict]: Corpus size and {term: document frequency} for
+            the observed terms, both counting the new documents
+        """
+        self.documents += len(documents)
+        terms = set()
+        for document in documents:
+            self.frequencies.update(document)
+            terms.update(document)
+        return self.documents, {term: self.frequencies[term] for term in terms}
+
+
+# -------------------
+# Scoring
+# -------------------
+def _idf(documents: int, frequency: int) -> float:
+    # Smoothed; 1.0 for every term when there is no corpus yet
+    return math.log((1 + documents) / (1 + frequency)) + 1
+
+
+def _length_boost(term: str) -> float:
+    # Longer phrases are rarer but more specific ("refund policy" > "refund")
+    return term.count(" ") + 1
+
+
+def _is_phrase_candidate(term: str, count: int, frequency: int) -> bool:
+    # A multi-word phrase is only a topic once it repeats, in this text or
+    # across the corpus; one-off word runs ("fixed export bug") are noise
+    return " " not in term or count > 1 or frequency > 1
+
+
+def _pick(ranked: list[str], max_topics: int) -> list[str]:
+    """Best terms, skipping ones that share a word with a term already picked."""
+    topics, used = [], set()
+    for term in ranked:
+        words = term.split()
+        if used.intersection(words):
+            continue
+        topics.append(term)
+        used.update(words)
+        if len(topics) == max_topics:
+            break
+    return topics
+
+
+def extract_topics(text: str, max_topics: int = 5, corpus: TopicCorpus = None):
     """
     Extract key topics/keywords from a text.
-    
+
+    Candidates are scored by TF-IDF against the corpus' document
+    frequencies, counting this text in; what observing it stores is up to
+    the corpus. Without a corpus the IDF is flat and topics are simply the
+    most frequent content phrases.
+
     Args:
         text (str): Input text
         max_topics (int): Maximum number of topics to return
+        corpus (TopicCorpus, optional): Document frequencies to score against
 
     Returns:
         list[str]: Top topics/keywords
     """
-    # Basic cleaning: lowercase + remove punctuation
-    text_clean = re.sub(r"[^\w\s]", "", text.lower())
-    
-    # Split words and remove short words (like 'a', 'the')
-    words = [w for w in text_clean.split() if len(w) > 2]
-    
-    # Count word frequency
-    word_counts = Counter(words)
-    
-    # Return most common words
-    return [word for word, count in word_counts.most_common(max_topics)]
+    counts = candidate_terms(text)
+    if not counts:
+        return []
+
+    documents, frequencies = corpus.observe([set(counts)]) if corpus is not None else (0, {})
+    scores = {
+        term: count * _idf(documents, frequencies.get(term, 0)) * _length_boost(term)
+        for term, count in counts.items()
+        if _is_phrase_candidate(term, count, frequencies.get(term, 0))
+    }
+    ranked = sorted(scores, key=lambda term: (-scores[term], term))
+    return _pick(ranked, max_topics)
+
+
+def extract_topics_batch(texts: list[str], max_topics: int = 5, corpus: TopicCorpus = None):
+    """
+    extract_topics for many texts: one corpus update for the whole batch
+    and one vectorized TF-IDF pass over the (text, term) entries, so memory
+    grows with the candidates found, not with texts x vocabulary.
+
+    Returns:
+        list[list[str]]: One extract_topics result per text, in order
+    """
+    import numpy as np
+
+    candidates = [candidate_terms(text) for text in texts]
+    vocabulary = {}
+    columns, values = [], []
+    for counts in candidates:
+        for term, count in counts.items():
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(count)
+    if not vocabulary:
+        return [[] for _ in texts]
+
+    documents, frequencies = (
+        corpus.observe([set(counts) for counts in candidates]) if corpus is not None else (0, {})
+    )
+    terms = list(vocabulary)
+    df = np.array([frequencies.get(term, 0) for term in terms], dtype=np.float64)
+    weights = (np.log((1 + documents) / (1 + df)) + 1) * np.array(
+        [term.count(" ") + 1 for term in terms], dtype=np.float64
+    )
+    # One score per entry; each text's entries are contiguous, in counts order
+    scores = (np.array(values, dtype=np.float64) * weights[np.array(columns, dtype=np.intp)]).tolist()
+
+    results = []
+    start = 0
+    for counts in candidates:
+        text_scores = dict(zip(counts, scores[start:start + len(counts)]))
+        start += len(counts)
+        eligible = [
+            term for term, count in counts.items()
+            if _is_phrase_candidate(term, count, frequencies.get(term, 0))
+        ]
+        # Same order as extract_topics: score desc, then alphabetical
+        ranked = sorted(eligible, key=lambda term: (-text_scores[term], term))
+        results.append(_pick(ranked, max_topics))
+    return results
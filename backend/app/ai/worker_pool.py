@@ -0,0 +1,106 @@
+# app/ai/worker_pool.py
+import gc
+import multiprocessing
+import threading
+
+from app.ai.executor import DeadlineExceededError
+from app.ai.model import SentimentModel
+
+# Set in the parent right before forking; workers inherit the loaded model
+_worker_model = None
+
+
+def _init_worker(threads: int):
+    _worker_model.set_threads(threads)
+    _worker_model.warmup()
+
+
+def _worker_predict(texts: list[str]) -> list[dict]:
+    return _worker_model.predict(texts)
+
+
+class ProcessPoolSentimentModel(SentimentModel):
+    """
+    Runs another model handle's predictions in a pool of forked processes.
+
+    The wrapped model is loaded once in the parent, then the workers are
+    forked from it so the weights are shared copy-on-write instead of being
+    loaded N times. gc.freeze() before forking keeps the garbage collector
+    from touching (and so copying) the inherited objects. No inference runs
+    in the parent before the fork, so the workers start with clean intra-op
+    thread pools sized by `threads_per_worker`.
+
+    A child forked while another thread holds a lock (logging, an allocator,
+    a queue) inherits that lock held and can deadlock on it, so load() must
+    run before the process starts any other thread; it raises RuntimeError
+    otherwise. The app does this first thing in its lifespan.
+
+    predict() blocks the calling thread until a worker returns, so callers
+    need as many threads as workers to keep the pool busy (the sentiment
+    batcher runs with concurrency = workers). It gives up after `timeout`
+    seconds with DeadlineExceededError: multiprocessing.Pool replaces a
+    worker that dies (e.g. OOM-killed) but never finishes the task it had.
+
+    Args:
+        inner (SentimentModel): The model to load and share
+        workers (int): Number of worker processes
+        threads_per_worker (int): Intra-op threads in each worker
+        timeout (float): Seconds to wait for a worker's result
+    """
+
+    def __init__(self, inner: SentimentModel, workers: int, threads_per_worker: int = 1, timeout: float = 30.0):
+        super().__init__(inner.model_name)
+        self.inner = inner
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.timeout = timeout
+        self.backend = inner.backend
+        self._pool = None
+
+    def _build(self):
+        global _worker_model
+
+        others = [t.name for t in threading.enumerate() if t is not threading.current_thread()]
+        if others:
+            raise RuntimeError(f"Inference workers must be forked before other threads start (running: {others})")
+
+        self.inner.load()
+        # Long documents are tokenized in the parent
+        self._span_tokenizer = self.inner._span_tokenizer
+        self.max_length = self.inner.max_length
+
+        _worker_model = self.inner
+        gc.collect()
+        gc.freeze()
+        context = multiprocessing.get_context("fork")
+        self._pool = context.Pool(
+            processes=self.workers,
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,),
+        )
+
+    def _predict(self, texts: list[str]) -> list[dict]:
+        try:
+            return self._pool.apply_async(_worker_predict, (texts,)).get(self.timeout)
+        except multiprocessing.TimeoutError:
+            raise DeadlineExceededError(f"No inference worker answered within {self.timeout}s") from None
+
+    def close(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        gc.unfreeze()
+        super().close()
+
+    def info(self) -> dict:
+        info = self.inner.info()
+        info.update({
+            "loaded": self.is_loaded,
+            "warmed_up": self.warmed_up,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+        })
+        return info
@@ -1,9 +1,13 @@
-from passlib.context import CryptContext
+import os
+from typing import NamedTuple
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect, select
 from sqlalchemy.orm import Session
+from app.auth.passwords import password_context
+from app.cache import TTLCache
 from app.database import get_db
 from app.auth import models  # your User model
 
@@ -14,13 +18,17 @@ SECRET_KEY = "KHUTSO1684!"  # replace with a secure random string
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Authenticated-user cache: token subject (email) -> Principal. The TTL
+# bounds how long another process can serve a user changed elsewhere.
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
 
+# In-process hashing; request handlers use passwords.password_hasher
 def hash_password(password: str):
-    return pwd_context.hash(password)
+    return password_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
 
 # -------------------
 # JWT Token
@@ -37,30 +45,79 @@ def create_access_token(data: dict):
 # -------------------
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    """
-    Decode JWT token and return the current user from database.
-    Raises 401 if token is invalid or user not found.
-    """
-    credentials_exception = HTTPException(
+
+class Principal(NamedTuple):
+    """The authenticated user's identity, without loading the User row."""
+    id: int
+    username: str
+    email: str
+
+
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Decode JWT token and return the current user's id, username and email,
+    from principal_cache when possible (no database query).
+    Raises 401 if token is invalid or user not found.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
-        raise credentials_exception
+    principal = principal_cache.get(email)
+    if principal is None:
+        row = db.execute(
+            select(models.User.id, models.User.username, models.User.email)
+            .where(models.User.email == email)
+        ).first()
+        if row is None:
+            raise _credentials_exception()
+        principal = Principal(*row)
+        principal_cache.set(email, principal)
+    return principal
 
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    The current user as a full ORM User, for routes that need more than
+    get_current_principal gives. Raises 401 if token is invalid or user not found.
+    """
+    user = db.get(models.User, principal.id)
+    if user is None:
+        invalidate_principal(principal.email)
+        raise _credentials_exception()
     return user
+
+
+def invalidate_principal(email: str):
+    """Drop a cached principal (done automatically on ORM updates and deletes)."""
+    principal_cache.pop(email)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    # Both the current and, if it changed, the previous email (token subject)
+    invalidate_principal(target.email)
+    for email in inspect(target).attrs.email.history.deleted:
+        invalidate_principal(email)
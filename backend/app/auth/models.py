@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base   # ✅ FIXED IMPORT
@@ -35,6 +35,13 @@ class User(Base):
 
 class SentimentHistory(Base):
     __tablename__ = "sentiment_history"
+    __table_args__ = (
+        # History pages: one user's rows newest first (keyset on created_at, id)
+        Index("ix_sentiment_history_user_created", "user_id", "created_at", "id"),
+    )
+    # Fetch the generated id / created_at in the INSERT (RETURNING), so the
+    # write path needs no refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -45,8 +52,54 @@ class SentimentHistory(Base):
 
     user = relationship("User", back_populates="sentiment_history")
 
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    # Running dashboard totals, kept up to date on every write (see app/rollups.py)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_analyses = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    risk_alerts = Column(Integer, nullable=False, default=0)
+    # messages with risk=1
+    topic_messages = Column(Integer, nullable=False, default=0)
+    # AI messages whose content mentions topics
+    risk_low = Column(Integer, nullable=False, default=0)
+    risk_medium = Column(Integer, nullable=False, default=0)
+    risk_high = Column(Integer, nullable=False, default=0)
+    # messages per risk_level
+
+
+class SentimentDaily(Base):
+    __tablename__ = "sentiment_daily"
+
+    # Per-user, per-day (UTC) sentiment_history totals, kept up to date on
+    # every write (see app/rollups.py)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    analyses = Column(Integer, nullable=False, default=0)
+    positive = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+
+
+class TermDocumentFrequency(Base):
+    __tablename__ = "term_document_frequency"
+
+    # Per-user count of analyzed texts containing each topic term; the row
+    # with term "" holds the user's total number of analyzed texts
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    term = Column(String, primary_key=True)
+    documents = Column(Integer, nullable=False, default=0)
+
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Chat pages, oldest first (keyset on created_at, id)
+        Index("ix_messages_chat_created", "chat_id", "created_at", "id"),
+        # Per-user risk counts and rollup rebuilds
+        Index("ix_messages_user_risk", "user_id", "risk", "risk_level"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -61,6 +114,20 @@ class Message(Base):
     risk = Column(Integer, default=0)
     # 0 = no risk, 1 = risk detected
 
+    risk_level = Column(String, default="Low", server_default="Low", nullable=False)
+    # "Low" | "Medium" | "High"
+
+    # AI analysis fields (see app/message_content.py); content then holds
+    # the feedback text. NULL on user messages and plain-text AI messages.
+    sentiment = Column(String, nullable=True)
+    confidence = Column(Float, nullable=True)
+    summary = Column(String, nullable=True)
+    topics = Column(JSON(none_as_null=True), nullable=True)
+    risk_score = Column(Float, nullable=True)
+    risk_matches = Column(JSON(none_as_null=True), nullable=True)
+    details = Column(JSON(none_as_null=True), nullable=True)
+    # other analysis fields; non-NULL marks a structured analysis message
+
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now()
@@ -68,11 +135,41 @@ class Message(Base):
 
     user = relationship("User", back_populates="messages")
     chat = relationship("Chat", back_populates="messages")
+    topic_rows = relationship(
+        "MessageTopic",
+        back_populates="message",
+        cascade="all, delete-orphan"
+    )
+
+
+class MessageTopic(Base):
+    __tablename__ = "message_topics"
+    __table_args__ = (
+        Index("ix_message_topics_user_topic", "user_id", "topic"),
+        # Covers date-range topic counts (no table lookups)
+        Index("ix_message_topics_user_created", "user_id", "created_at", "topic"),
+        # Loading / deleting a message's topics
+        Index("ix_message_topics_message", "message_id"),
+    )
+
+    # One row per topic of an AI analysis message, written with the message
+    # (see app/rollups.py) so topic counts never need to parse Message.content
+    id = Column(Integer, primary_key=True)
+    message_id = Column(Integer, ForeignKey("messages.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    topic = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    message = relationship("Message", back_populates="topic_rows")
 
 
 
 class Chat(Base):
     __tablename__ = "chats"
+    __table_args__ = (
+        # Chat list: one user's chats newest first (keyset on created_at, id)
+        Index("ix_chats_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -0,0 +1,158 @@
+# app/auth/passwords.py
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.ai.executor import InferenceExecutor
+
+# bcrypt cost; stored hashes with any other cost are rehashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Hashing runs in its own processes so a login storm can't take the
+# request threadpool or more than PASSWORD_WORKERS cores. At cost 12 each
+# worker verifies about 4 passwords/s, so size this for the login bursts
+# expected (e.g. after a deploy); by default one per core, at most 4
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_MAX_QUEUE = int(os.getenv("PASSWORD_MAX_QUEUE", "32"))
+PASSWORD_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_TIMEOUT_SECONDS", "10"))
+# Scheduling priority of the workers (os.nice increment): request handling
+# wins the CPU while a burst of logins is hashed, logins wait a bit longer
+PASSWORD_WORKER_NICE = int(os.getenv("PASSWORD_WORKER_NICE", "10"))
+
+
+@functools.lru_cache(maxsize=None)
+def password_context():
+    """
+    The bcrypt CryptContext, built on first use: passlib is slow to import
+    and the server process only hashes in the pool workers and in scripts.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+        bcrypt__max_rounds=BCRYPT_ROUNDS,
+    )
+
+
+# -------------------
+# Worker functions (run in the pool processes)
+# -------------------
+def _init_worker(nice: int):
+    if nice:
+        os.nice(nice)
+
+
+def _hash(password: str) -> str:
+    return password_context().hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    return password_context().verify_and_update(password, hashed)
+
+
+# -------------------
+# Pool
+# -------------------
+class PasswordHasher:
+    """
+    Size-limited process pool for bcrypt hashing and verification.
+
+    Admission goes through an InferenceExecutor of `workers` threads, so
+    the pool has the same bounded queue, deadlines, QueueFullError (503 +
+    Retry-After) and stats as inference; each of those threads hands its
+    call to one of `workers` processes and waits. Workers are spawned, not
+    forked, so they never inherit the server's threads or locks.
+
+    Args:
+        workers (int): Worker processes (and admission threads)
+        max_queue (int): Calls allowed to wait for a free worker
+        timeout (float): Per-call deadline in seconds
+        nice (int): Scheduling priority increment for the workers
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float, nice: int = 0):
+        self.workers = workers
+        self.nice = nice
+        self.executor = InferenceExecutor(max_workers=workers, max_queue=max_queue, timeout=timeout)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Spawn the worker processes now rather than on the first login."""
+        for _ in range(self.workers):
+            self._get_pool().submit(os.getpid)
+
+    async def hash(self, password: str) -> str:
+        """
+        bcrypt hash of password at the configured cost.
+
+        Raises:
+            QueueFullError: The queue is full
+            DeadlineExceededError: Hashing didn't finish within the timeout
+        """
+        return await self.executor.run(self._call, _hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        """
+        Check password against hashed.
+
+        Returns:
+            tuple: (matches, new_hash); new_hash is set when the password
+                   matched but hashed was made with a different cost and
+                   should be replaced
+
+        Raises:
+            QueueFullError: The queue is full
+            DeadlineExceededError: Verification didn't finish within the timeout
+        """
+        return await self.executor.run(self._call, _verify_and_update, password, hashed)
+
+    def shutdown(self):
+        self.executor.shutdown()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "bcrypt_rounds": BCRYPT_ROUNDS, **self.executor.stats()}
+
+    # -------------------
+    # Internals
+    # -------------------
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.nice,),
+                )
+            return self._pool
+
+    def _call(self, fn, *args):
+        pool = self._get_pool()
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed): start a fresh pool and retry once
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            return self._get_pool().submit(fn, *args).result()
+
+
+password_hasher = PasswordHasher(
+    workers=PASSWORD_WORKERS,
+    max_queue=PASSWORD_MAX_QUEUE,
+    timeout=PASSWORD_TIMEOUT_SECONDS,
+    nice=PASSWORD_WORKER_NICE,
+)
@@ -21,3 +21,10 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+
+# -------------------
+# Schema for the current user response
+# -------------------
+class UserOut(BaseModel):
+    username: str
+    email: EmailStr
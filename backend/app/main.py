@@ -1,21 +1,81 @@
 # app/main.py
-from fastapi import FastAPI
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.auth import models
+from app.auth.passwords import password_hasher
 from app.database import engine
-from app.routes import auth_routes, analysis_routes
+from app.ai import sentiment
+from app.ai.executor import inference_executor, QueueFullError, DeadlineExceededError
+from app.pagination import NEXT_CURSOR_HEADER
+from app.write_behind import write_behind
+from app.routes import auth_routes, analysis_routes, health_routes
+
+logger = logging.getLogger(__name__)
+
+
+def _load_model():
+    try:
+        sentiment.start()
+    except Exception:
+        # Readiness reports the error; liveness stays up so it can be inspected
+        logger.exception("Sentiment model failed to load")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create all database tables
+    models.Base.metadata.create_all(bind=engine)
+
+    if sentiment.SENTIMENT_WORKERS > 0:
+        # Inference workers are forked from this process, which must not be
+        # running other threads yet: load them before anything else starts
+        _load_model()
+    else:
+        # Load + warm up the model in the background so /health/live answers
+        # immediately and /health/ready flips once inference is possible
+        loader = threading.Thread(target=_load_model, name="model-loader", daemon=True)
+        loader.start()
+    password_hasher.start()
+    yield
+    inference_executor.shutdown()
+    password_hasher.shutdown()
+    # Commit analyses still queued for the background writer
+    write_behind.stop()
+    sentiment.shutdown()
 
-# Create all database tables
-models.Base.metadata.create_all(bind=engine)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="PulseAI Sentiment Analysis",
     description="Analyze text sentiment, topics, risk, and summary using AI",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
+# Overload: fail fast with Retry-After instead of queueing without bound
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Request timed out, please retry shortly"},
+        headers={"Retry-After": str(inference_executor.retry_after())},
+    )
+
 # ✅ CORS MIDDLEWARE
 # This allows your Vite frontend to call FastAPI without CORS issues
 origins = [
@@ -30,8 +90,10 @@ app.add_middleware(
     allow_credentials=True,       # allows cookies, authorization headers
     allow_methods=["*"],          # GET, POST, PUT, DELETE, OPTIONS
     allow_headers=["*"],          # allow all headers
+    expose_headers=[NEXT_CURSOR_HEADER],  # pagination cursor for the frontend
 )
 
 # Include routers
 app.include_router(auth_routes.router)
 app.include_router(analysis_routes.router)
+app.include_router(health_routes.router)
@@ -0,0 +1,95 @@
+# app/message_content.py
+"""
+Structured storage of AI analysis messages.
+
+An analysis is stored in typed Message columns (content holds the
+feedback text) rather than as a JSON string, so reads need no parsing and
+queries can filter on sentiment, topics or risk directly. Fields the typed
+columns can't represent exactly are kept in Message.details, whose being
+non-NULL also marks the message as a structured analysis.
+"""
+_MISSING = object()
+
+
+def _typed(value, *types):
+    """value if it has one of types (bools never count as numbers), else None."""
+    if isinstance(value, bool) and bool not in types:
+        return None
+    return value if isinstance(value, types) else None
+
+
+def unpack_analysis(message) -> dict:
+    """
+    The analysis dict of a structured AI message, as the API has always
+    returned it.
+
+    Args:
+        message (Mapping): Message column values by name (e.g. a row from
+            .mappings(), which reads much faster than Row attributes)
+    """
+    content = {
+        "text": message["content"],
+        "summary": message["summary"],
+        "sentiment": (
+            {"sentiment": message["sentiment"], "confidence": message["confidence"]}
+            if message["sentiment"] is not None else {}
+        ),
+        "topics": message["topics"] if message["topics"] is not None else [],
+        "feedback": message["content"],
+        "risk": bool(message["risk"]),
+        "risk_level": message["risk_level"],
+        "risk_score": message["risk_score"],
+        "risk_matches": message["risk_matches"] if message["risk_matches"] is not None else [],
+    }
+    for key, value in (message["details"] or {}).items():
+        if key == "sentiment" and isinstance(value, dict) and isinstance(content["sentiment"], dict):
+            content["sentiment"] = {**content["sentiment"], **value}
+        else:
+            content[key] = value
+    return content
+
+
+def pack_analysis(content: dict, risk: int, risk_level: str) -> dict:
+    """
+    Message column values for an analysis dict; unpack_analysis() of a
+    message with these values (and risk / risk_level) gives the dict back.
+
+    Args:
+        content (dict): Analysis as produced by get_response / sent by clients
+        risk (int): The message's risk column
+        risk_level (str): The message's risk_level column
+
+    Returns:
+        dict: content, sentiment, confidence, summary, topics, risk_score,
+              risk_matches and details
+    """
+    sentiment = content.get("sentiment")
+    sentiment = sentiment if isinstance(sentiment, dict) else {}
+    topics = _typed(content.get("topics"), list)
+    risk_matches = _typed(content.get("risk_matches"), list)
+    text = _typed(content.get("text"), str) or _typed(content.get("feedback"), str) or ""
+
+    columns = {
+        "content": text,
+        "sentiment": _typed(sentiment.get("sentiment"), str),
+        "confidence": _typed(sentiment.get("confidence"), float, int),
+        "summary": _typed(content.get("summary"), str),
+        "topics": topics if topics is not None and all(isinstance(t, str) for t in topics) else None,
+        "risk_score": _typed(content.get("risk_score"), float, int),
+        "risk_matches": risk_matches if risk_matches is not None and all(isinstance(m, str) for m in risk_matches) else None,
+    }
+    if columns["sentiment"] is None:
+        columns["confidence"] = None
+
+    # Whatever the typed columns don't reproduce exactly goes in details
+    typed = unpack_analysis({**columns, "risk": risk, "risk_level": risk_level, "details": None})
+    details = {}
+    for key, value in content.items():
+        if key == "sentiment" and isinstance(value, dict):
+            rest = {k: v for k, v in value.items() if typed["sentiment"].get(k, _MISSING) != v}
+            if rest:
+                details["sentiment"] = rest
+        elif typed.get(key, _MISSING) != value:
+            details[key] = value
+    columns["details"] = details
+    return columns
@@ -0,0 +1,99 @@
+# app/pagination.py
+"""
+Keyset (cursor) pagination on (created_at, id).
+
+A cursor is the last row's sort key, opaque to clients. The next page is
+read with a range condition on that key, so every page costs the same
+index seek however deep into the result it is, unlike OFFSET.
+
+created_at is compared in the form the database stores it (selected with
+type_coerce, no SQL cast): SQLite keeps timestamps as text and a
+round-tripped datetime does not always compare equal to the stored text.
+"""
+import base64
+import json
+import os
+
+from fastapi import HTTPException
+from sqlalchemy import String, and_, or_, type_coerce
+
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+# Rows fetched per round trip when streaming a whole result
+STREAM_BATCH = int(os.getenv("STREAM_BATCH", "500"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_size(limit: int = None) -> int:
+    """Validated page size (PAGE_SIZE when limit is None)."""
+    if limit is None:
+        return PAGE_SIZE
+    if not 1 <= limit <= PAGE_SIZE_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {PAGE_SIZE_MAX}")
+    return limit
+
+
+def sort_key(model):
+    """Select this next to the model to get each row's cursor position."""
+    return type_coerce(model.created_at, String).label("sort_key")
+
+
+def encode_cursor(created_at, row_id: int) -> str:
+    raw = json.dumps([str(created_at), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(created_at, str) or not isinstance(row_id, int):
+            raise ValueError(cursor)
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, row_id
+
+
+def keyset(stmt, model, cursor: str = None, descending: bool = False):
+    """
+    Order stmt by (created_at, id) and, given a cursor, keep only the rows
+    after it.
+
+    Args:
+        stmt (Select): Query over model
+        model: Mapped class with created_at and id columns
+        cursor (str): encode_cursor() of the previous page's last row
+        descending (bool): Newest first
+
+    Returns:
+        Select: The ordered, filtered statement
+    """
+    created_at = type_coerce(model.created_at, String)
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor)
+        if descending:
+            stmt = stmt.where(or_(
+                created_at < last_created_at,
+                and_(created_at == last_created_at, model.id < last_id),
+            ))
+        else:
+            stmt = stmt.where(or_(
+                created_at > last_created_at,
+                and_(created_at == last_created_at, model.id > last_id),
+            ))
+    if descending:
+        return stmt.order_by(model.created_at.desc(), model.id.desc())
+    return stmt.order_by(model.created_at, model.id)
+
+
+def next_cursor(rows: list, limit: int):
+    """
+    Cursor for the page after rows (fetched with limit + 1), or None on
+    the last page. Rows are mappings with id and sort_key.
+    """
+    if len(rows) <= limit:
+        return None
+    row = rows[limit - 1]
+    return encode_cursor(row["sort_key"], row["id"])
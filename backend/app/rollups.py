@@ -0,0 +1,390 @@
+# app/rollups.py
+"""
+Materialized per-user dashboard rollups.
+
+user_stats holds one row of running totals per user, sentiment_daily
+one row per user per day and message_topics one row per topic of each AI
+analysis message. The write paths call record_analyses / record_messages /
+index_message_topics inside their own transaction, so the dashboard reads a
+primary-key row or an indexed range instead of aggregating history.
+term_document_frequency, the topic scorer's per-user document counts, is
+kept the same way through SQLTopicCorpus.save.
+
+Rebuild from the base tables (e.g. after a manual data fix):
+    python -m app.rollups rebuild [--user-id 1]
+"""
+import argparse
+import sys
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import ReadSessionLocal, SessionLocal, upsert_increment
+from app.auth.models import (
+    Message, MessageTopic, SentimentDaily, SentimentHistory, TermDocumentFrequency, UserStats
+)
+from app.ai.topics import CORPUS_SIZE_TERM, TopicCorpus
+
+USER_STATS_COUNTERS = [
+    "total_analyses",
+    "confidence_sum",
+    "risk_alerts",
+    "topic_messages",
+    "risk_low",
+    "risk_medium",
+    "risk_high",
+]
+
+SENTIMENT_DAILY_COUNTERS = ["analyses", "positive", "negative", "confidence_sum"]
+
+# Message.risk_level -> user_stats bucket column
+RISK_LEVEL_COLUMNS = {"Low": "risk_low", "Medium": "risk_medium", "High": "risk_high"}
+
+MAX_TOPIC_LENGTH = 100
+
+
+def _upsert(db: Session, user_id: int, deltas: dict):
+    row = {"user_id": user_id, **{counter: 0 for counter in USER_STATS_COUNTERS}, **deltas}
+    upsert_increment(db, UserStats.__table__, ["user_id"], USER_STATS_COUNTERS, [row])
+
+
+def _is_topic_message(role: str, topics) -> bool:
+    # AI analysis messages carrying a topics list
+    return role == "ai" and topics is not None
+
+
+def normalize_topics(topics) -> list[str]:
+    """Topics lowercased, whitespace-collapsed and de-duplicated."""
+    normalized = []
+    for topic in topics or []:
+        topic = " ".join(str(topic).lower().split())[:MAX_TOPIC_LENGTH]
+        if topic and topic not in normalized:
+            normalized.append(topic)
+    return normalized
+
+
+# -------------------
+# Write paths
+# -------------------
+def record_analyses(db: Session, user_id: int, analyses: list[dict], day: date = None):
+    """
+    Add new SentimentHistory rows to the user's totals and to the day's
+    sentiment_daily row (caller commits).
+
+    Args:
+        analyses (list[dict]): {"sentiment": str, "confidence": float} per row
+        day (date): Day the rows were created (default: today, UTC)
+    """
+    if not analyses:
+        return
+    confidence_sum = float(sum(a["confidence"] for a in analyses))
+    _upsert(db, user_id, {"total_analyses": len(analyses), "confidence_sum": confidence_sum})
+
+    positive = sum(1 for a in analyses if a["sentiment"] == "POSITIVE")
+    upsert_increment(db, SentimentDaily.__table__, ["user_id", "day"], SENTIMENT_DAILY_COUNTERS, [{
+        "user_id": user_id,
+        "day": day or datetime.now(timezone.utc).date(),
+        "analyses": len(analyses),
+        "positive": positive,
+        "negative": len(analyses) - positive,
+        "confidence_sum": confidence_sum,
+    }])
+
+
+def record_messages(db: Session, user_id: int, messages: list[Message], sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) messages from the user's totals
+    (caller commits).
+    """
+    if not messages:
+        return
+    deltas = {counter: 0 for counter in USER_STATS_COUNTERS if counter != "confidence_sum"}
+    for message in messages:
+        deltas["risk_alerts"] += 1 if message.risk == 1 else 0
+        deltas["topic_messages"] += 1 if _is_topic_message(message.role, message.topics) else 0
+        deltas[RISK_LEVEL_COLUMNS.get(message.risk_level or "Low", "risk_low")] += 1
+    _upsert(db, user_id, {counter: sign * value for counter, value in deltas.items()})
+
+
+def index_message_topics(user_id: int, messages: list[Message]):
+    """Attach message_topics rows to new messages; they flush with them."""
+    for message in messages:
+        message.topic_rows = [
+            MessageTopic(user_id=user_id, topic=topic)
+            for topic in (normalize_topics(message.topics) if message.role == "ai" else [])
+        ]
+
+
+def _message_counter_sums():
+    """SUM() expressions for the message counters, labelled by column."""
+    is_topic = (Message.role == "ai") & Message.topics.isnot(None)
+    level = func.coalesce(Message.risk_level, "Low")
+    return [
+        func.sum(case((Message.risk == 1, 1), else_=0)).label("risk_alerts"),
+        func.sum(case((is_topic, 1), else_=0)).label("topic_messages"),
+        *[
+            func.sum(case((level == name, 1), else_=0)).label(column)
+            for name, column in RISK_LEVEL_COLUMNS.items()
+        ],
+    ]
+
+
+def remove_chat_messages(db: Session, user_id: int, chat_id: int):
+    """Take a chat's messages out of the user's totals before it is deleted."""
+    row = db.execute(
+        select(func.count().label("messages"), *_message_counter_sums())
+        .where(Message.chat_id == chat_id, Message.user_id == user_id)
+    ).mappings().one()
+    if row["messages"]:
+        _upsert(db, user_id, {
+            column: -row[column] for column in USER_STATS_COUNTERS
+            if column not in ("total_analyses", "confidence_sum")
+        })
+
+
+class SQLTopicCorpus(TopicCorpus):
+    """
+    One user's document frequencies in the term_document_frequency table.
+
+    observe() only reads: one primary-key lookup of the new documents'
+    terms, with the documents counted in. They are kept in `pending` until
+    save(db) adds them to the caller's write transaction, so the counts
+    commit or roll back with the analyses they came from and the inference
+    threads never write. The cost depends on the texts being analyzed,
+    never on how many have been analyzed before.
+
+    Args:
+        user_id (int): Owner of the corpus
+        session_factory: Session factory for the lookups (default ReadSessionLocal)
+    """
+
+    def __init__(self, user_id: int, session_factory=ReadSessionLocal):
+        self.user_id = user_id
+        self.session_factory = session_factory
+        # term -> observed documents containing it, not saved yet; the
+        # CORPUS_SIZE_TERM entry counts the documents themselves
+        self.pending = Counter()
+
+    def observe(self, documents: list[set[str]]) -> tuple[int, dict]:
+        counts = Counter(term for document in documents for term in document)
+        counts[CORPUS_SIZE_TERM] = len(documents)
+        self.pending.update(counts)
+
+        with self.session_factory() as db:
+            stored = dict(db.execute(
+                select(TermDocumentFrequency.term, TermDocumentFrequency.documents).where(
+                    TermDocumentFrequency.user_id == self.user_id,
+                    TermDocumentFrequency.term.in_(list(counts)),
+                )
+            ).all())
+
+        frequencies = {term: stored.get(term, 0) + self.pending[term] for term in counts}
+        return frequencies.pop(CORPUS_SIZE_TERM), frequencies
+
+    def save(self, db: Session):
+        """Add the pending document frequencies to the user's rows (caller commits)."""
+        rows = [
+            {"user_id": self.user_id, "term": term, "documents": count}
+            for term, count in self.pending.items()
+        ]
+        upsert_increment(db, TermDocumentFrequency.__table__, ["user_id", "term"], "documents", rows)
+        self.pending = Counter()
+
+
+# -------------------
+# Reads
+# -------------------
+def get_user_stats(db: Session, user_id: int) -> UserStats:
+    """The user's rollup row (all zeros if they have no data yet)."""
+    stats = db.get(UserStats, user_id)
+    if stats is None:
+        stats = UserStats(user_id=user_id, **{counter: 0 for counter in USER_STATS_COUNTERS})
+    return stats
+
+
+def _bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return date.fromordinal(day.toordinal() - day.weekday())  # Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def sentiment_trend(db: Session, user_id: int, start: date, end: date, granularity: str = "day") -> list[dict]:
+    """
+    Sentiment totals per day, week (Monday start) or month between start
+    and end inclusive, read from at most (end - start + 1) sentiment_daily
+    rows via a primary-key range scan.
+
+    Returns:
+        list[dict]: {"start": date, "analyses", "positive", "negative",
+                     "confidence_sum"} per non-empty bucket, oldest first
+    """
+    rows = db.execute(
+        select(SentimentDaily)
+        .where(SentimentDaily.user_id == user_id, SentimentDaily.day.between(start, end))
+        .order_by(SentimentDaily.day)
+    ).scalars()
+
+    buckets = {}
+    for row in rows:
+        key = _bucket_start(row.day, granularity)
+        bucket = buckets.setdefault(key, {"start": key, **{c: 0 for c in SENTIMENT_DAILY_COUNTERS}})
+        for counter in SENTIMENT_DAILY_COUNTERS:
+            bucket[counter] += getattr(row, counter)
+    return list(buckets.values())
+
+
+def top_topics(db: Session, user_id: int, start: date = None, end: date = None,
+               limit: int = 5) -> list[tuple[str, int]]:
+    """
+    Most frequent topics of the user's AI messages, optionally only those
+    created between start and end (inclusive, UTC days). One aggregate over
+    the (user_id, topic) index, or the covering (user_id, created_at, topic)
+    index when a window is given.
+
+    Returns:
+        list[tuple[str, int]]: (topic, messages) pairs, most frequent first
+    """
+    count = func.count().label("messages")
+    query = (
+        select(MessageTopic.topic, count)
+        .where(MessageTopic.user_id == user_id)
+        .group_by(MessageTopic.topic)
+        .order_by(count.desc(), MessageTopic.topic)
+        .limit(limit)
+    )
+    if start is not None:
+        query = query.where(MessageTopic.created_at >= datetime.combine(start, time.min))
+    if end is not None:
+        query = query.where(MessageTopic.created_at < datetime.combine(end + timedelta(days=1), time.min))
+    return [(row.topic, row.messages) for row in db.execute(query)]
+
+
+# -------------------
+# Rebuild
+# -------------------
+def rebuild_user_stats(db: Session, user_id: int = None) -> int:
+    """
+    Recompute user_stats from sentiment_history and messages, for one user
+    or everyone (caller commits).
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    history = select(
+        SentimentHistory.user_id,
+        func.count().label("total_analyses"),
+        func.sum(SentimentHistory.confidence).label("confidence_sum"),
+    ).group_by(SentimentHistory.user_id)
+    messages = select(Message.user_id, *_message_counter_sums()).group_by(Message.user_id)
+    if user_id is not None:
+        history = history.where(SentimentHistory.user_id == user_id)
+        messages = messages.where(Message.user_id == user_id)
+
+    totals = {}
+    for row in db.execute(history).mappings():
+        totals.setdefault(row["user_id"], {}).update(row)
+    for row in db.execute(messages).mappings():
+        totals.setdefault(row["user_id"], {}).update(row)
+
+    stale = delete(UserStats)
+    if user_id is not None:
+        stale = stale.where(UserStats.user_id == user_id)
+    db.execute(stale)
+
+    for uid, values in totals.items():
+        db.add(UserStats(
+            user_id=uid,
+            **{counter: values.get(counter) or 0 for counter in USER_STATS_COUNTERS},
+        ))
+    db.flush()
+    return len(totals)
+
+
+def rebuild_sentiment_daily(db: Session, user_id: int = None) -> int:
+    """
+    Recompute sentiment_daily from sentiment_history, for one user or
+    everyone (caller commits).
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    day = func.date(SentimentHistory.created_at)
+    daily = select(
+        SentimentHistory.user_id,
+        day.label("day"),
+        func.count().label("analyses"),
+        func.sum(case((SentimentHistory.sentiment == "POSITIVE", 1), else_=0)).label("positive"),
+        func.sum(case((SentimentHistory.sentiment == "POSITIVE", 0), else_=1)).label("negative"),
+        func.sum(SentimentHistory.confidence).label("confidence_sum"),
+    ).where(SentimentHistory.created_at.isnot(None)).group_by(SentimentHistory.user_id, day)
+    stale = delete(SentimentDaily)
+    if user_id is not None:
+        daily = daily.where(SentimentHistory.user_id == user_id)
+        stale = stale.where(SentimentDaily.user_id == user_id)
+
+    rows = [dict(row) for row in db.execute(daily).mappings()]
+    db.execute(stale)
+    for row in rows:
+        row["day"] = date.fromisoformat(str(row["day"])[:10])
+        db.add(SentimentDaily(**row))
+    db.flush()
+    return len(rows)
+
+
+def rebuild_message_topics(db: Session, user_id: int = None, batch_size: int = 1000) -> int:
+    """
+    Recompute message_topics from the AI messages' topics, for one
+    user or everyone, reading messages in id-ordered batches (caller commits).
+
+    Returns:
+        int: Number of topic rows written
+    """
+    stale = delete(MessageTopic)
+    if user_id is not None:
+        stale = stale.where(MessageTopic.user_id == user_id)
+    db.execute(stale)
+
+    written, last_id = 0, 0
+    while True:
+        batch = select(Message.id, Message.user_id, Message.topics, Message.created_at).where(
+            Message.role == "ai", Message.topics.isnot(None), Message.id > last_id
+        ).order_by(Message.id).limit(batch_size)
+        if user_id is not None:
+            batch = batch.where(Message.user_id == user_id)
+        messages = db.execute(batch).all()
+        if not messages:
+            return written
+
+        rows = [
+            {"message_id": m.id, "user_id": m.user_id, "topic": topic, "created_at": m.created_at}
+            for m in messages
+            for topic in normalize_topics(m.topics)
+        ]
+        if rows:
+            db.execute(insert(MessageTopic), rows)
+        written += len(rows)
+        last_id = messages[-1].id
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain the dashboard rollup tables")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user-id", type=int, help="only this user (default: everyone)")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        stats = rebuild_user_stats(db, args.user_id)
+        daily = rebuild_sentiment_daily(db, args.user_id)
+        topics = rebuild_message_topics(db, args.user_id)
+        db.commit()
+    print(f"Rebuilt user_stats: {stats} row(s), sentiment_daily: {daily} row(s), "
+          f"message_topics: {topics} row(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
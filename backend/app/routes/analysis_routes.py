@@ -1,17 +1,45 @@
 # app/routes/analysis_routes.py
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import json
-from sqlalchemy import func, extract
-from datetime import datetime, timedelta
+import os
+import orjson
+from functools import partial
+from sqlalchemy import delete, insert, select
+from datetime import date, datetime, timedelta, timezone
+
+from app.database import get_db, get_read_db, ReadSessionLocal, SessionLocal
+from app.auth.auth import Principal, get_current_principal
+from app.auth.models import SentimentHistory
+from app.auth.models import Chat, Message, MessageTopic  # ✅ Import chat/message models
+from app.rollups import (
+    SQLTopicCorpus, get_user_stats, index_message_topics, record_analyses, record_messages,
+    remove_chat_messages, sentiment_trend, top_topics
+)
+from app.ai.respond import get_response, get_responses
+from app.ai.executor import inference_executor, DeadlineExceededError, QueueFullError
+from app.ai.risk import RISK_LEVELS
+from app.message_content import pack_analysis, unpack_analysis
+from app.write_behind import ANALYSIS_WRITE_BEHIND, write_behind
+from app.pagination import NEXT_CURSOR_HEADER, STREAM_BATCH, keyset, next_cursor, page_size, sort_key
+
+# Longest text accepted for analysis, in characters
+ANALYSIS_MAX_TEXT_CHARS = int(os.getenv("ANALYSIS_MAX_TEXT_CHARS", "100000"))
+
+# Bulk analysis limits
+ANALYSIS_BATCH_MAX_ITEMS = int(os.getenv("ANALYSIS_BATCH_MAX_ITEMS", "5000"))
+ANALYSIS_BATCH_CHUNK = int(os.getenv("ANALYSIS_BATCH_CHUNK", "64"))
 
-from app.database import get_db
-from app.auth.auth import get_current_user
-from app.auth.models import User, SentimentHistory
-from app.auth.models import Chat, Message  # ✅ Import chat/message models
-from app.ai.respond import get_response
+# Longest range the sentiment trend endpoint serves (= rollup rows read)
+TRENDS_MAX_DAYS = int(os.getenv("TRENDS_MAX_DAYS", "366"))
+TREND_GRANULARITIES = ("day", "week", "month")
+
+# Most topics the topic frequency endpoint returns
+TOPICS_MAX_LIMIT = int(os.getenv("TOPICS_MAX_LIMIT", "50"))
 
 router = APIRouter(
     prefix="/analysis",
@@ -21,104 +49,312 @@ router = APIRouter(
 # --- Existing AI Analysis Routes ---
 
 @router.post("/", summary="Analyze text and generate AI response")
-def analyze_feedback(
+async def analyze_feedback(
     request: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
+    """
+    Body: {"text": str, "chat_id": int (optional), "defer_write": bool
+    (optional)}. Analyses come back with the id and created_at of their
+    history row. With "defer_write": true, and only when the server runs
+    with ANALYSIS_WRITE_BEHIND=1, the response is sent before the write is
+    committed: "id" is null, created_at is the server clock and
+    "write_deferred" is true.
+    """
     text = request.get("text")
     chat_id = request.get("chat_id")  # 👈 Add this to receive chat_id from frontend
+    defer_write = ANALYSIS_WRITE_BEHIND and request.get("defer_write") is True
     
-    if not text:
+    if not text or not isinstance(text, str):
         raise HTTPException(status_code=400, detail="Text is required")
+    if len(text) > ANALYSIS_MAX_TEXT_CHARS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Text is too long (max {ANALYSIS_MAX_TEXT_CHARS} characters)"
+        )
+
+    # Model work runs on the dedicated inference pool; the event loop stays
+    # free. Topic scoring only reads the corpus; its counts are saved below
+    corpus = SQLTopicCorpus(current_user.id)
+    ai_result = await inference_executor.run(
+        get_response,
+        user_name=current_user.username,
+        text=text,
+        corpus=corpus
+    )
+
+    return await run_in_threadpool(_save_analysis, db, current_user, text, chat_id, ai_result, corpus, defer_write)
+
+
+def _save_analysis(db: Session, current_user: Principal, text: str, chat_id, ai_result: dict,
+                   corpus: SQLTopicCorpus, defer_write: bool = False):
+    is_analysis = ai_result["type"] == "analysis_response"
+
+    if defer_write:
+        # Respond now; the background writer group-commits the rows
+        write_behind.submit(partial(
+            _write_analysis, user_id=current_user.id, text=text, chat_id=chat_id,
+            ai_result=dict(ai_result), corpus=corpus
+        ))
+        if is_analysis:
+            ai_result.update({
+                "id": None,  # not known until the write is committed
+                # Same shape as the created_at column's server default
+                "created_at": datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0).isoformat(),
+                "write_deferred": True
+            })
+        return ai_result
+
+    # One transaction; the flush fetches the history row's generated id and
+    # created_at (INSERT ... RETURNING), so no refresh is needed
+    history = _write_analysis(db, current_user.id, text, chat_id, ai_result, corpus)
+    db.flush()
+    if history is not None:
+        ai_result.update({
+            "id": history.id,
+            "created_at": history.created_at.isoformat()
+        })
+    db.commit()
+
+    return ai_result
 
-    ai_result = get_response(user_name=current_user.username, text=text)
+
+def _write_analysis(db: Session, user_id: int, text: str, chat_id, ai_result: dict,
+                    corpus: SQLTopicCorpus = None):
+    """
+    Add the chat messages, history row, rollup updates and the corpus'
+    pending topic document frequencies for one analysis to db without
+    committing.
+
+    Returns:
+        SentimentHistory | None: The history row, None if not an analysis
+    """
+    is_analysis = ai_result["type"] == "analysis_response"
 
     # Save user message to chat if chat_id is provided
     if chat_id:
         # Verify chat belongs to user
         chat = db.query(Chat).filter(
             Chat.id == chat_id, 
-            Chat.user_id == current_user.id
+            Chat.user_id == user_id
         ).first()
         
         if chat:
             # Save user message
             user_message = Message(
                 chat_id=chat.id,
-                user_id=current_user.id,
+                user_id=user_id,
                 role="user",
                 content=text,
                 risk=0
             )
             db.add(user_message)
+            new_messages = [user_message]
 
             # Save AI response if it's an analysis
-            if ai_result["type"] == "analysis_response":
-                # Create a rich content object with all analysis data
+            if is_analysis:
                 ai_content = {
                     "text": ai_result.get("feedback", ""),
                     "summary": ai_result.get("summary", ""),
                     "sentiment": ai_result.get("sentiment", {}),
                     "topics": ai_result.get("topics", []),
                     "feedback": ai_result.get("feedback", ""),
-                    "risk": ai_result.get("risk", False)
+                    "risk": ai_result.get("risk", False),
+                    "risk_level": ai_result.get("risk_level", "Low"),
+                    "risk_score": ai_result.get("risk_score"),
+                    "risk_matches": ai_result.get("risk_matches", [])
                 }
-                
+                risk = 1 if ai_result.get("risk") else 0
+                risk_level = ai_result.get("risk_level", "Low")
+
+                # Stored in typed analysis columns, not as a JSON string
                 ai_message = Message(
                     chat_id=chat.id,
-                    user_id=current_user.id,
+                    user_id=user_id,
                     role="ai",
-                    content=json.dumps(ai_content),  # Store as JSON string
-                    risk=1 if ai_result.get("risk") else 0
+                    risk=risk,
+                    risk_level=risk_level,
+                    **pack_analysis(ai_content, risk, risk_level)
                 )
                 db.add(ai_message)
-            
+                new_messages.append(ai_message)
+
+            # Dashboard totals move in the same transaction as the rows
+            record_messages(db, user_id, new_messages)
+            index_message_topics(user_id, new_messages)
+
+    if not is_analysis:
+        return None
+
+    if corpus is not None:
+        corpus.save(db)
+
+    # Save to sentiment history
+    sentiment_result = ai_result["sentiment"]
+    history = SentimentHistory(
+        user_id=user_id,
+        text=text,
+        sentiment=sentiment_result["sentiment"],
+        confidence=sentiment_result["confidence"]
+    )
+    db.add(history)
+    record_analyses(db, user_id, [sentiment_result])
+    return history
+
+def _stream_batch(user_id: int, user_name: str, texts: list[str]):
+    """
+    Analyze texts ANALYSIS_BATCH_CHUNK at a time. Each chunk's
+    SentimentHistory rows, rollups and topic document frequencies are saved
+    in one transaction before its NDJSON lines are yielded, so a client that
+    disconnects mid-stream keeps exactly the results it was sent. If the
+    inference queue rejects or times out a chunk, the stream ends with a
+    {"type": "batch_error"} line saying where to resume.
+    """
+    saved = 0
+    corpus = SQLTopicCorpus(user_id)
+    for start in range(0, len(texts), ANALYSIS_BATCH_CHUNK):
+        chunk = texts[start:start + ANALYSIS_BATCH_CHUNK]
+        try:
+            # Wait for a slot rather than failing half way through the stream
+            results = inference_executor.submit(get_responses, user_name, chunk, corpus=corpus, block=True).result()
+        except (QueueFullError, DeadlineExceededError) as exc:
+            # The 200 status is already sent: report it in the body instead
+            yield orjson.dumps({
+                "type": "batch_error",
+                "error": str(exc),
+                "retry_after": getattr(exc, "retry_after", None) or inference_executor.retry_after(),
+                "index": start,
+                "saved": saved,
+            }) + b"\n"
+            return
+        history_rows = [
+            {
+                "user_id": user_id,
+                "text": text,
+                "sentiment": result["sentiment"]["sentiment"],
+                "confidence": result["sentiment"]["confidence"],
+            }
+            for text, result in zip(chunk, results)
+            if result["type"] == "analysis_response"
+        ]
+
+        # The request's session is closed once streaming starts, so use our own
+        with SessionLocal() as db:
+            if history_rows:
+                db.execute(insert(SentimentHistory), history_rows)
+                record_analyses(db, user_id, history_rows)
+            corpus.save(db)
             db.commit()
+        saved += len(history_rows)
 
-    # Save to sentiment history (keeping your existing logic)
-    if ai_result["type"] == "analysis_response":
-        sentiment_result = ai_result["sentiment"]
+        for offset, result in enumerate(results):
+            yield orjson.dumps({"index": start + offset, **result}) + b"\n"
 
-        history = SentimentHistory(
-            user_id=current_user.id,
-            text=text,
-            sentiment=sentiment_result["sentiment"],
-            confidence=sentiment_result["confidence"]
+    yield orjson.dumps({
+        "type": "batch_complete",
+        "count": len(texts),
+        "saved": saved
+    }) + b"\n"
+
+
+@router.post("/batch", summary="Analyze many texts, streaming NDJSON results")
+def analyze_batch(
+    request: dict,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Body: {"texts": ["...", ...]}. Responds with application/x-ndjson: one
+    {"index": i, ...get_response result} line per text in input order, each
+    sent once its history is saved, then a final {"type": "batch_complete"}
+    line, or, if inference is overloaded part way, a final
+    {"type": "batch_error", "error", "retry_after", "index", "saved"} line
+    where index is the first text not analyzed.
+    """
+    texts = request.get("texts")
+
+    if not isinstance(texts, list) or not texts:
+        raise HTTPException(status_code=400, detail="texts must be a non-empty list")
+    if len(texts) > ANALYSIS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many texts (max {ANALYSIS_BATCH_MAX_ITEMS} per request)"
+        )
+    if not all(isinstance(text, str) and text for text in texts):
+        raise HTTPException(status_code=400, detail="Every text must be a non-empty string")
+    if any(len(text) > ANALYSIS_MAX_TEXT_CHARS for text in texts):
+        raise HTTPException(
+            status_code=413,
+            detail=f"Every text must be at most {ANALYSIS_MAX_TEXT_CHARS} characters"
         )
-        db.add(history)
-        db.commit()
-        db.refresh(history)
+    if not inference_executor.has_capacity():
+        raise QueueFullError(inference_executor.retry_after())
 
-        ai_result.update({
-            "id": history.id,
-            "created_at": history.created_at.isoformat()
-        })
+    return StreamingResponse(
+        _stream_batch(current_user.id, current_user.username, texts),
+        media_type="application/x-ndjson"
+    )
+
+
+def _paginate(db: Session, stmt, limit: int, serialize) -> ORJSONResponse:
+    """Run a keyset() statement for one page, setting the next cursor header."""
+    # Mappings: name lookups on them cost a fraction of Row attribute access
+    rows = db.execute(stmt.limit(limit + 1)).mappings().all()
+    cursor = next_cursor(rows, limit)
+    return ORJSONResponse(
+        [serialize(row) for row in rows[:limit]],
+        headers={NEXT_CURSOR_HEADER: cursor} if cursor else None
+    )
+
+
+def _stream_rows(stmt, serialize):
+    """
+    Yield one NDJSON line per row, fetching STREAM_BATCH rows at a time from
+    a server-side cursor so memory stays flat however many rows there are.
+    """
+    # The request's session is closed once streaming starts, so use our own
+    with ReadSessionLocal() as db:
+        for row in db.execute(stmt.execution_options(yield_per=STREAM_BATCH)).mappings():
+            yield orjson.dumps(serialize(row)) + b"\n"
+
+
+HISTORY_COLUMNS = (
+    SentimentHistory.id, SentimentHistory.text, SentimentHistory.sentiment,
+    SentimentHistory.confidence, SentimentHistory.created_at
+)
+
+
+def _history_item(h) -> dict:
+    return {
+        "id": h["id"],
+        "text": h["text"],
+        "sentiment": h["sentiment"],
+        "confidence": h["confidence"],
+        "created_at": h["created_at"].isoformat()
+    }
 
-    return ai_result
 
-@router.get("/history", summary="Get all analysis history for the user")
+@router.get("/history", summary="Get analysis history for the user, newest first")
 def get_history(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    history = (
-        db.query(SentimentHistory)
-        .filter(SentimentHistory.user_id == current_user.id)
-        .order_by(SentimentHistory.created_at.desc())
-        .all()
+    """
+    One page of history (limit rows, default PAGE_SIZE); the X-Next-Cursor
+    response header, when present, is the cursor for the next page. With
+    stream=true every row after the cursor is streamed as NDJSON instead.
+    """
+    stmt = keyset(
+        select(*HISTORY_COLUMNS, sort_key(SentimentHistory))
+        .where(SentimentHistory.user_id == current_user.id),
+        SentimentHistory, cursor, descending=True
     )
-
-    return [
-        {
-            "id": h.id,
-            "text": h.text,
-            "sentiment": h.sentiment,
-            "confidence": h.confidence,
-            "created_at": h.created_at.isoformat()
-        }
-        for h in history
-    ]
+    if stream:
+        return StreamingResponse(_stream_rows(stmt, _history_item), media_type="application/x-ndjson")
+    return _paginate(db, stmt, page_size(limit), _history_item)
 
 
 # --- New Chat & Messages Routes ---
@@ -127,7 +363,7 @@ def get_history(
 def create_chat(
     request: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     title = request.get("title", "New Chat")
     chat = Chat(user_id=current_user.id, title=title)
@@ -137,54 +373,83 @@ def create_chat(
     return {"id": chat.id, "title": chat.title, "created_at": chat.created_at.isoformat()}
 
 
-@router.get("/chats", summary="Get all chats for current user")
+CHAT_COLUMNS = (Chat.id, Chat.title, Chat.is_archived, Chat.created_at)
+
+
+def _chat_item(c) -> dict:
+    return {
+        "id": c["id"],
+        "title": c["title"],
+        "is_archived": c["is_archived"],
+        "created_at": c["created_at"].isoformat()
+    }
+
+
+@router.get("/chats", summary="Get chats for current user, newest first")
 def get_chats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    chats = db.query(Chat).filter(Chat.user_id == current_user.id).order_by(Chat.created_at.desc()).all()
-    return [
-        {"id": c.id, "title": c.title, "is_archived": c.is_archived, "created_at": c.created_at.isoformat()}
-        for c in chats
-    ]
+    """Paginated like /history (limit, cursor, X-Next-Cursor, stream)."""
+    stmt = keyset(
+        select(*CHAT_COLUMNS, sort_key(Chat)).where(Chat.user_id == current_user.id),
+        Chat, cursor, descending=True
+    )
+    if stream:
+        return StreamingResponse(_stream_rows(stmt, _chat_item), media_type="application/x-ndjson")
+    return _paginate(db, stmt, page_size(limit), _chat_item)
+
+
+MESSAGE_COLUMNS = (
+    Message.id, Message.role, Message.content, Message.risk, Message.risk_level,
+    Message.created_at, Message.sentiment, Message.confidence, Message.summary,
+    Message.topics, Message.risk_score, Message.risk_matches, Message.details
+)
+
+
+def _message_item(m) -> dict:
+    # Structured AI analyses come back as the analysis dict, the rest as text
+    return {
+        "id": m["id"],
+        "role": m["role"],
+        "content": unpack_analysis(m) if m["details"] is not None else m["content"],
+        "risk": m["risk"],
+        "risk_level": m["risk_level"],
+        "created_at": m["created_at"].isoformat()
+    }
 
 
-@router.get("/chats/{chat_id}/messages", summary="Get all messages in a chat")
+@router.get("/chats/{chat_id}/messages", summary="Get messages in a chat, oldest first")
 def get_chat_messages(
     chat_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
+    """Paginated like /history (limit, cursor, X-Next-Cursor, stream)."""
     chat = db.query(Chat).filter(Chat.id == chat_id, Chat.user_id == current_user.id).first()
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
 
-    messages = []
-    for m in chat.messages:
-        content = m.content
-        # Try to parse JSON content for AI messages
-        if m.role == "ai":
-            try:
-                content = json.loads(m.content)
-            except:
-                pass
-        
-        messages.append({
-            "id": m.id,
-            "role": m.role,
-            "content": content,
-            "risk": m.risk,
-            "created_at": m.created_at.isoformat()
-        })
-    
-    return messages
+    stmt = keyset(
+        select(*MESSAGE_COLUMNS, sort_key(Message)).where(Message.chat_id == chat.id),
+        Message, cursor
+    )
+    if stream:
+        return StreamingResponse(_stream_rows(stmt, _message_item), media_type="application/x-ndjson")
+    return _paginate(db, stmt, page_size(limit), _message_item)
 
 @router.post("/chats/{chat_id}/messages", summary="Send/save a message in a chat")
 def send_message(
     chat_id: int,
     request: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     chat = db.query(Chat).filter(Chat.id == chat_id, Chat.user_id == current_user.id).first()
     if not chat:
@@ -193,52 +458,66 @@ def send_message(
     role = request.get("role")
     content = request.get("content")
     risk = request.get("risk", 0)
+    risk_level = request.get("risk_level") or ("Medium" if risk else "Low")
 
     if role not in ("user", "ai") or not content:
         raise HTTPException(status_code=400, detail="Invalid role or content")
+    if risk_level not in RISK_LEVELS:
+        raise HTTPException(status_code=400, detail=f"risk_level must be one of {RISK_LEVELS}")
+    risk = 0 if risk_level == "Low" else 1
 
-    # If content is a dict (for AI messages), store as JSON
-    if role == "ai" and isinstance(content, dict):
-        import json
-        content = json.dumps(content)
+    # AI analyses (dicts, or JSON object strings from older clients) are
+    # stored in the typed analysis columns
+    if role == "ai" and isinstance(content, str) and content.lstrip().startswith("{"):
+        try:
+            content = json.loads(content)
+        except ValueError:
+            pass
+    if isinstance(content, dict) and role == "ai":
+        columns = pack_analysis(content, risk, risk_level)
+    elif isinstance(content, str):
+        columns = {"content": content}
+    else:
+        raise HTTPException(status_code=400, detail="Invalid role or content")
 
     message = Message(
         chat_id=chat.id, 
         user_id=current_user.id, 
         role=role, 
-        content=content, 
-        risk=risk
+        risk=risk,
+        risk_level=risk_level,
+        **columns
     )
     db.add(message)
+    record_messages(db, current_user.id, [message])
+    index_message_topics(current_user.id, [message])
     db.commit()
     db.refresh(message)
 
-    # Parse content back to dict if it's JSON
-    response_content = content
-    if role == "ai":
-        try:
-            response_content = json.loads(content)
-        except:
-            pass
-
-    return {
-        "id": message.id,
-        "role": message.role,
-        "content": response_content,
-        "risk": message.risk,
-        "created_at": message.created_at.isoformat()
-    }
+    return _message_item({column.key: getattr(message, column.key) for column in MESSAGE_COLUMNS})
 
 @router.delete("/chats/{chat_id}", summary="Delete / clear a chat")
 def delete_chat(
     chat_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     chat = db.query(Chat).filter(Chat.id == chat_id, Chat.user_id == current_user.id).first()
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
 
+    remove_chat_messages(db, current_user.id, chat.id)
+    # Bulk deletes: the ORM cascade would load each message's topic rows
+    # one message at a time
+    chat_messages = select(Message.id).where(Message.chat_id == chat.id)
+    db.execute(
+        delete(MessageTopic).where(MessageTopic.message_id.in_(chat_messages)),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        delete(Message).where(Message.chat_id == chat.id),
+        execution_options={"synchronize_session": False},
+    )
     db.delete(chat)
     db.commit()
 
@@ -250,7 +529,7 @@ def update_chat_title(
     chat_id: int,
     request: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update the title of a chat"""
     chat = db.query(Chat).filter(
@@ -272,120 +551,98 @@ def update_chat_title(
 
 @router.get("/dashboard/stats", summary="Get dashboard statistics")
 def get_dashboard_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get overall statistics for the dashboard"""
     
-    # Total analyses (sentiment history count)
-    total_analyses = db.query(SentimentHistory).filter(
-        SentimentHistory.user_id == current_user.id
-    ).count()
-    
-    # Average sentiment confidence
-    avg_sentiment = db.query(
-        func.avg(SentimentHistory.confidence)
-    ).filter(
-        SentimentHistory.user_id == current_user.id
-    ).scalar() or 0
-    
-    # Risk alerts (messages with risk=1)
-    risk_alerts = db.query(Message).filter(
-        Message.user_id == current_user.id,
-        Message.risk == 1
-    ).count()
-    
-    # Unique topics (from AI messages where topics exist)
-    # This is a bit complex - we'll approximate by counting messages with topics
-    topics_count = db.query(Message).filter(
-        Message.user_id == current_user.id,
-        Message.role == "ai",
-        Message.content.like('%topics%')  # Simple filter for messages that might have topics
-    ).count()
+    # One primary-key lookup of the user's running totals
+    stats = get_user_stats(db, current_user.id)
+    avg_sentiment = stats.confidence_sum / stats.total_analyses if stats.total_analyses else 0
     
     return {
-        "total_analyses": total_analyses,
+        "total_analyses": stats.total_analyses,
         "avg_sentiment": round(avg_sentiment * 100, 1),  # Convert to percentage
-        "risk_alerts": risk_alerts,
-        "topics_analyzed": topics_count
+        "risk_alerts": stats.risk_alerts,
+        "topics_analyzed": stats.topic_messages
     }
 
 
 @router.get("/dashboard/sentiment-trends", summary="Get sentiment trends over time")
 def get_sentiment_trends(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: str = "month",
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get sentiment data for the last 6 months"""
-    
-    # Get data for last 6 months
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=180)
-    
-    # Query sentiment history grouped by month
-    results = db.query(
-        extract('month', SentimentHistory.created_at).label('month'),
-        extract('year', SentimentHistory.created_at).label('year'),
-        func.avg(SentimentHistory.confidence).label('avg_confidence'),
-        func.count().label('count')
-    ).filter(
-        SentimentHistory.user_id == current_user.id,
-        SentimentHistory.created_at >= start_date
-    ).group_by('year', 'month').order_by('year', 'month').all()
-    
-    # Format for chart
-    months = []
-    sentiment_scores = []
+    """
+    Average sentiment confidence per day, week or month between start and
+    end (ISO dates, inclusive; default the last 180 days by month).
+    """
+    if granularity not in TREND_GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {list(TREND_GRANULARITIES)}")
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=180)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days + 1 > TRENDS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {TRENDS_MAX_DAYS} days")
+
+    buckets = sentiment_trend(db, current_user.id, start, end, granularity)
     
     month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", 
                    "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
     
-    for r in results:
-        month_idx = int(r.month) - 1
-        months.append(month_names[month_idx])
-        sentiment_scores.append(round(float(r.avg_confidence) * 100, 1))
+    if granularity == "month":
+        labels = [month_names[b["start"].month - 1] for b in buckets]
+    else:
+        labels = [b["start"].isoformat() for b in buckets]
     
     return {
-        "labels": months,
-        "data": sentiment_scores
+        "labels": labels,
+        "data": [round(b["confidence_sum"] / b["analyses"] * 100, 1) for b in buckets],
+        "counts": [b["analyses"] for b in buckets],
+        "positive": [b["positive"] for b in buckets],
+        "negative": [b["negative"] for b in buckets]
     }
 
 
 @router.get("/dashboard/risk-distribution", summary="Get risk level distribution")
 def get_risk_distribution(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get distribution of risk levels in messages"""
     
-    # Count messages by risk level (0 = no risk, 1 = risk)
-    no_risk = db.query(Message).filter(
-        Message.user_id == current_user.id,
-        Message.risk == 0
-    ).count()
-    
-    risk = db.query(Message).filter(
-        Message.user_id == current_user.id,
-        Message.risk == 1
-    ).count()
+    stats = get_user_stats(db, current_user.id)
     
-    # You can categorize further if needed
     return {
-        "labels": ["Low", "Medium", "High"],
-        "data": [no_risk, risk, 0]  # Adjust as needed
+        "labels": RISK_LEVELS,
+        "data": [stats.risk_low, stats.risk_medium, stats.risk_high]
     }
 
 
 @router.get("/dashboard/topics-frequency", summary="Get most frequent topics")
 def get_topics_frequency(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = 5,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get most common topics from AI responses"""
-    
-    # This is simplified - you might need to parse JSON content
-    # For now, return sample data structure
+    """
+    Most common topics from AI responses, optionally between start and end
+    (ISO dates, inclusive).
+    """
+    if not 1 <= limit <= TOPICS_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {TOPICS_MAX_LIMIT}")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    topics = top_topics(db, current_user.id, start, end, limit)
+
     return {
-        "labels": ["AI", "Python", "Machine Learning", "Data", "Cloud"],
-        "data": [15, 12, 10, 8, 6]
-    }
\ No newline at end of file
+        "labels": [topic for topic, _ in topics],
+        "data": [count for _, count in topics]
+    }
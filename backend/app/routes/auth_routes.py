@@ -1,7 +1,9 @@
 # app/routes/auth_routes.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.auth import models, schemas, auth
+from app.auth.passwords import password_hasher
 from app.database import get_db
 
 router = APIRouter(
@@ -12,28 +14,35 @@ router = APIRouter(
 # -------------------
 # Sign up route
 # -------------------
+def _user_exists(db: Session, user: schemas.UserCreate) -> bool:
+    return db.query(models.User.id).filter(
+        (models.User.username == user.username) | (models.User.email == user.email)
+    ).first() is not None
+
+
+def _create_user(db: Session, user: schemas.UserCreate, hashed_pw: str):
+    db_user = models.User(username=user.username, email=user.email, hashed_password=hashed_pw)
+    db.add(db_user)
+    db.commit()
+
+
 @router.post("/signup", response_model=schemas.Token)
-def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
     # Check if user exists
-    if db.query(models.User).filter(
-        (models.User.username == user.username) | (models.User.email == user.email)
-    ).first():
+    if await run_in_threadpool(_user_exists, db, user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username or email already registered"
         )
     
-    # Hash password
-    hashed_pw = auth.hash_password(user.password)
+    # Hash password (off the request threads, in the password pool)
+    hashed_pw = await password_hasher.hash(user.password)
     
     # Create new user
-    db_user = models.User(username=user.username, email=user.email, hashed_password=hashed_pw)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await run_in_threadpool(_create_user, db, user, hashed_pw)
 
     # Generate token using email
-    token = auth.create_access_token({"sub": db_user.email})
+    token = auth.create_access_token({"sub": user.email})
     return {
         "access_token": token,
         "token_type": "bearer"
@@ -42,17 +51,33 @@ def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
 # -------------------
 # Login route
 # -------------------
+def _get_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+def _update_password_hash(db: Session, user: models.User, hashed_pw: str):
+    user.hashed_password = hashed_pw
+    db.commit()
+
+
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.email).first()
+async def login(form_data: schemas.UserLogin, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_get_user_by_email, db, form_data.email)
 
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
-    token = auth.create_access_token({"sub": user.email})
+    # Stored hash used a different bcrypt cost than configured: replace it
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user, new_hash)
+
+    token = auth.create_access_token({"sub": form_data.email})
     return {
         "access_token": token,
         "token_type": "bearer"
@@ -61,13 +86,12 @@ def login(form_data: schemas.UserLogin, db: Session = Depends(get_db)):
 # -------------------
 # Current logged-in user
 # -------------------
-@router.get("/me", response_model=schemas.UserCreate)
-def get_me(current_user: models.User = Depends(auth.get_current_user)):
+@router.get("/me", response_model=schemas.UserOut)
+def get_me(current_user: auth.Principal = Depends(auth.get_current_principal)):
     """
     Returns the currently authenticated user info.
     """
     return {
         "username": current_user.username,
         "email": current_user.email,
-        "password": ""  # Do not return password
     }
@@ -0,0 +1,49 @@
+# app/routes/health_routes.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.ai import sentiment
+from app.ai.respond import analysis_cache
+from app.ai.executor import inference_executor
+from app.auth.auth import principal_cache
+from app.auth.passwords import password_hasher
+from app.write_behind import write_behind_stats
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"]
+)
+
+
+@router.get("/live", summary="Liveness probe")
+def liveness():
+    """The process is up and serving requests (model may still be loading)."""
+    return {"status": "ok"}
+
+
+@router.get("/ready", summary="Readiness probe")
+def readiness():
+    """Ready once the sentiment model is loaded and warmed up; 503 until then."""
+    body = {
+        "status": "ready" if sentiment.is_ready() else "loading",
+        "model": sentiment.sentiment_model.info(),
+    }
+    if sentiment.sentiment_model.error:
+        body["status"] = "error"
+    if body["status"] != "ready":
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@router.get("/stats", summary="Inference and cache statistics")
+def stats():
+    """Executor, password pool, batching, cascade, cache, auth cache and write-behind counters for monitoring."""
+    return {
+        "inference_executor": inference_executor.stats(),
+        "password_hasher": password_hasher.stats(),
+        "sentiment_batcher": sentiment.sentiment_batcher.stats(),
+        "sentiment_cascade": sentiment.cascade_stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "write_behind": write_behind_stats(),
+    }
@@ -0,0 +1,113 @@
+# app/write_behind.py
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.ai.batching import MicroBatcher
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: lets POST /analysis/ requests that send "defer_write": true be
+# answered before a background writer persists them (their "id" is null)
+ANALYSIS_WRITE_BEHIND = os.getenv("ANALYSIS_WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "256"))
+WRITE_BEHIND_MAX_WAIT_MS = float(os.getenv("WRITE_BEHIND_MAX_WAIT_MS", "20"))
+
+
+class WriteBehindWriter:
+    """
+    Background writer that group-commits queued database writes.
+
+    A job is a callable that adds rows to the Session it is given and does
+    not commit. One writer thread collects jobs as they arrive (up to
+    `max_batch_size`, waiting at most `max_wait_ms` after the first) and
+    runs the whole batch in a single transaction, so a burst of requests
+    costs one commit and SQLite sees one writer instead of many competing
+    for its lock. If the batch fails it is retried one job per transaction,
+    so a bad job only loses its own write.
+
+    Args:
+        session_factory (callable): Returns a new Session
+        max_batch_size (int): Most jobs per transaction
+        max_wait_ms (float): How long to wait for more jobs after the first
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_batch_size: int = 256,
+        max_wait_ms: float = 20.0,
+    ):
+        self.session_factory = session_factory
+        self._batcher = MicroBatcher(
+            self._commit,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            # One bucket per batch: every job goes in the same transaction
+            length_fn=lambda job: 1,
+        )
+        self._lock = threading.Lock()
+        self.failed = 0
+        self.retried_batches = 0
+
+    def submit(self, job: Callable[[Session], object]) -> Future:
+        """Queue a write; the Future resolves to True once committed, False if dropped."""
+        return self._batcher.submit(job)
+
+    def stop(self, timeout: float = 5.0):
+        """Commit everything already queued, then stop the writer thread."""
+        self._batcher.stop(timeout=timeout)
+
+    def stats(self) -> dict:
+        stats = self._batcher.stats()
+        return {
+            "queued": stats["queued"],
+            "batches_committed": stats["batches_run"],
+            "writes_committed": stats["items_processed"] - self.failed,
+            "avg_batch_size": stats["avg_batch_size"],
+            "retried_batches": self.retried_batches,
+            "failed": self.failed,
+        }
+
+    def _commit(self, jobs: list) -> list[bool]:
+        with self.session_factory() as db:
+            try:
+                for job in jobs:
+                    job(db)
+                db.commit()
+                return [True] * len(jobs)
+            except Exception:
+                db.rollback()
+                logger.exception("Write-behind batch of %d failed, retrying one by one", len(jobs))
+
+        with self._lock:
+            self.retried_batches += 1
+        results = []
+        for job in jobs:
+            with self.session_factory() as db:
+                try:
+                    job(db)
+                    db.commit()
+                    results.append(True)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Dropped a write-behind job")
+                    with self._lock:
+                        self.failed += 1
+                    results.append(False)
+        return results
+
+
+write_behind = WriteBehindWriter(
+    max_batch_size=WRITE_BEHIND_MAX_BATCH,
+    max_wait_ms=WRITE_BEHIND_MAX_WAIT_MS,
+)
+
+
+def write_behind_stats() -> dict:
+    return {"enabled": ANALYSIS_WRITE_BEHIND, **write_behind.stats()}
@@ -0,0 +1,212 @@
+# benchmarks/ai_micro.py
+"""
+Micro-benchmarks of the per-request text processing stages by input size.
+
+Generates documents of each --sizes length (bytes, from short chat lines
+to 100 KB) with a seeded RNG, alternating texts of the labelled corpus
+with sentences of Zipf-distributed synthetic words whose vocabulary
+grows with the size (a fixed vocabulary, like the corpus alone, hides
+O(sentences x vocabulary) costs). Then for extract_topics,
+detect_risk, summarize_text, generate_chat_title and the intent index
+lookup get_response runs first, it reports:
+
+- ns/op: median over --repeats timed loops of at least --min-time each;
+- peak KB/op: peak traced memory of one call (tracemalloc), the closest
+  CPython gets to a per-call allocation figure.
+
+Each stage's scaling exponents (time ~ size^k and peak memory ~ size^k)
+are fitted by least squares on log-log over the sizes from --fit-from up.
+Fails (exit code 1) if any exceeds --max-exponent (every stage is linear
+or better today), or, with --baseline (an earlier run's JSON), grew by
+more than --max-exponent-increase. Memory is checked as well as time
+because large zeroed numpy arrays are cheap to allocate but not to hold.
+No model is loaded; only the text stages run.
+
+Usage (from backend/):
+    python -m benchmarks.ai_micro [--sizes 64 512 4096 32768 102400]
+    python -m benchmarks.ai_micro --baseline old.json
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+from app.ai.respond import intent_index
+from app.ai.risk import detect_risk
+from app.ai.summary import summarize_text
+from app.ai.title import generate_chat_title
+from app.ai.topics import extract_topics
+from benchmarks.common import environment, load_labelled_corpus, write_json
+
+STAGES = {
+    "extract_topics": lambda text: extract_topics(text),
+    "detect_risk": lambda text: detect_risk(text, "NEGATIVE"),
+    "summarize_text": lambda text: summarize_text(text),
+    "generate_chat_title": lambda text: generate_chat_title(text),
+    "intent_match": lambda text: intent_index.match(text),
+}
+
+
+# Share of synthetic tokens that are new words (Simon's model)
+NEW_WORD_RATE = 0.2
+
+
+class ZipfWords:
+    """
+    Synthetic words by Simon's model: each token is a new word with
+    probability new_word_rate, else a repeat of a uniformly chosen earlier
+    token. Frequencies come out Zipf-distributed and the vocabulary grows
+    linearly with the text.
+    """
+
+    def __init__(self, rng: random.Random, new_word_rate: float = NEW_WORD_RATE):
+        self.rng = rng
+        self.new_word_rate = new_word_rate
+        self.tokens = []
+        self.vocabulary = 0
+
+    def word(self) -> str:
+        if not self.tokens or self.rng.random() < self.new_word_rate:
+            self.vocabulary += 1
+            # Letters only, at least 3, so every stage treats it as a word
+            rank, letters = self.vocabulary, []
+            while rank:
+                rank, digit = divmod(rank, 26)
+                letters.append(chr(ord("a") + digit))
+            token = "zy" + "".join(letters)
+        else:
+            token = self.rng.choice(self.tokens)
+        self.tokens.append(token)
+        return token
+
+    def sentence(self) -> str:
+        return " ".join(self.word() for _ in range(self.rng.randint(6, 16))).capitalize() + "."
+
+
+def build_documents(texts: list[str], size: int, count: int, seed: int) -> list[str]:
+    """count different documents of size bytes, alternating corpus texts and Zipf sentences."""
+    rng = random.Random(seed * 1_000_003 + size)
+    documents = []
+    for _ in range(count):
+        words = ZipfWords(rng)
+        parts, length = [], 0
+        while length < size:
+            parts.append(rng.choice(texts) if len(parts) % 2 == 0 else words.sentence())
+            length += len(parts[-1]) + 1
+        documents.append(" ".join(parts)[:size])
+    return documents
+
+
+def ns_per_op(fn, documents: list[str], repeats: int, min_time: float) -> float:
+    """Median over repeats of a loop running fn over documents for at least min_time."""
+    for document in documents:
+        fn(document)  # warm up
+    samples = []
+    for _ in range(repeats):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            for document in documents:
+                fn(document)
+            calls += len(documents)
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        samples.append(elapsed / calls * 1e9)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def peak_bytes(fn, documents: list[str]) -> int:
+    """Largest peak traced memory of one call over documents."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for document in documents:
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            fn(document)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - start)
+    finally:
+        tracemalloc.stop()
+    return max(peaks)
+
+
+def scaling_exponent(points: list[tuple[int, float]]) -> float:
+    """Least-squares slope of log(value) against log(size)."""
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(max(value, 1e-9)) for _, value in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 512, 4_096, 32_768, 102_400])
+    parser.add_argument("--stages", nargs="+", choices=sorted(STAGES), default=list(STAGES))
+    parser.add_argument("--documents", type=int, default=4, help="different documents per size")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds per timed loop")
+    parser.add_argument("--fit-from", type=int, default=4_096, help="smallest size in the exponent fit")
+    parser.add_argument("--max-exponent", type=float, default=1.25)
+    parser.add_argument("--baseline", help="earlier results JSON to compare exponents against")
+    parser.add_argument("--max-exponent-increase", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmarks/results/ai_micro.json")
+    args = parser.parse_args(argv)
+
+    fit_sizes = [size for size in args.sizes if size >= args.fit_from]
+    if len(fit_sizes) < 2:
+        parser.error("need at least two --sizes at or above --fit-from")
+
+    texts = [text for _, text in load_labelled_corpus()]
+    documents = {size: build_documents(texts, size, args.documents, args.seed) for size in args.sizes}
+
+    results = {}
+    print(f"{'stage':<20} {'size':>7} {'ns/op':>13} {'peak KB/op':>11}")
+    for name in args.stages:
+        fn = STAGES[name]
+        by_size = {}
+        for size in args.sizes:
+            by_size[size] = {
+                "ns_per_op": round(ns_per_op(fn, documents[size], args.repeats, args.min_time)),
+                "peak_kb_per_op": round(peak_bytes(fn, documents[size]) / 1024, 1),
+            }
+            print(f"{name:<20} {size:>7} {by_size[size]['ns_per_op']:>13,} {by_size[size]['peak_kb_per_op']:>11.1f}")
+        exponents = {
+            metric: round(scaling_exponent([(size, by_size[size][key]) for size in fit_sizes]), 3)
+            for metric, key in (("time", "ns_per_op"), ("memory", "peak_kb_per_op"))
+        }
+        results[name] = {"sizes": by_size, "exponents": exponents}
+        print(f"{name:<20} scaling exponent time {exponents['time']:.2f}, memory {exponents['memory']:.2f}")
+
+    write_json(args.output, {
+        "environment": environment(),
+        "fit_sizes": fit_sizes,
+        "results": results,
+    })
+
+    failed = False
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    for name, result in results.items():
+        for metric, exponent in result["exponents"].items():
+            if exponent > args.max_exponent:
+                print(f"FAIL: {name} {metric} scales as size^{exponent:.2f} (max {args.max_exponent})")
+                failed = True
+            before = baseline.get(name, {}).get("exponents", {}).get(metric)
+            if before is not None and exponent > before + args.max_exponent_increase:
+                print(f"FAIL: {name} {metric} scaling exponent {before:.2f} -> {exponent:.2f}")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
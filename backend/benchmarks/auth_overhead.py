@@ -0,0 +1,169 @@
+# benchmarks/auth_overhead.py
+"""
+Per-request cost of authentication on a cheap endpoint.
+
+Seeds a scratch SQLite database with --users users and serves a trivial
+endpoint three ways through the real FastAPI stack:
+
+- none: no authentication (the baseline);
+- orm: the old get_current_user (decode the JWT, load the User by email);
+- principal: get_current_principal (decode the JWT, cached Principal).
+
+Requests rotate through every user's token, so the principal cache holds
+each user after its first request, as it would for active users. Auth
+overhead is a mode's p50 minus the baseline's. Also times the dependencies
+called directly, without HTTP. Fails (exit code 1) unless the principal
+overhead is at least --min-reduction lower (as a fraction) than the ORM one.
+
+Usage (from backend/):
+    python -m benchmarks.auth_overhead [--requests 3000] [--users 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.auth import auth
+from app.auth.models import User
+from app.database import JSON_OPTIONS, Base, get_db
+from benchmarks.common import environment, percentile, write_json
+
+
+def get_user_orm(token: str = Depends(auth.oauth2_scheme), db: Session = Depends(get_db)):
+    """What get_current_user did before the principal cache."""
+    email = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM]).get("sub")
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        raise HTTPException(status_code=401)
+    return user
+
+
+def build_app(Session) -> FastAPI:
+    app = FastAPI()
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    @app.get("/none")
+    def no_auth():
+        return {"ok": True}
+
+    @app.get("/orm")
+    def orm(current_user=Depends(get_user_orm)):
+        return {"id": current_user.id, "username": current_user.username}
+
+    @app.get("/principal")
+    def principal(current_user: auth.Principal = Depends(auth.get_current_principal)):
+        return {"id": current_user.id, "username": current_user.username}
+
+    return app
+
+
+def time_requests(client, path: str, headers: list, count: int) -> list[float]:
+    timings = []
+    for i in range(count):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers[i % len(headers)])
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    return timings
+
+
+def time_calls(fn, tokens: list, count: int) -> list[float]:
+    timings = []
+    for i in range(count):
+        started = time.perf_counter()
+        fn(tokens[i % len(tokens)])
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=3_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--min-reduction", type=float, default=0.2)
+    parser.add_argument("--output", default="benchmarks/results/auth_overhead.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(scratch, 'auth.db')}",
+            connect_args={"check_same_thread": False},
+            **JSON_OPTIONS
+        )
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        with Session() as db:
+            db.execute(insert(User), [
+                {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+                for i in range(args.users)
+            ])
+            db.commit()
+
+        tokens = [auth.create_access_token({"sub": f"user{i}@example.com"}) for i in range(args.users)]
+        headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+        auth.principal_cache.clear()
+
+        timings = {}
+        with TestClient(build_app(Session)) as client:
+            for path in ("/none", "/orm", "/principal"):
+                time_requests(client, path, headers, min(args.requests, 200))  # warm up
+                timings[path.strip("/")] = time_requests(client, path, headers, args.requests)
+
+        # The dependencies alone, each with its own session as per request
+        def call(dependency):
+            def run(token):
+                with Session() as db:
+                    dependency(token, db)
+            return run
+
+        direct = {
+            "orm": time_calls(call(get_user_orm), tokens, args.requests),
+            "principal": time_calls(call(auth.get_current_principal), tokens, args.requests),
+        }
+        cache_stats = auth.principal_cache.stats()
+        engine.dispose()
+
+    baseline = percentile(timings["none"], 50)
+    results = {"requests": args.requests, "users": args.users, "principal_cache": cache_stats}
+    print(f"{'mode':<10} {'p50 ms':>8} {'p99 ms':>8} {'auth ms':>8} {'direct ms':>10}")
+    for mode, values in timings.items():
+        p50 = percentile(values, 50)
+        results[mode] = {
+            "p50_ms": round(p50, 4),
+            "p99_ms": round(percentile(values, 99), 4),
+            "auth_overhead_ms": round(p50 - baseline, 4),
+        }
+        if mode in direct:
+            results[mode]["direct_p50_ms"] = round(percentile(direct[mode], 50), 4)
+        print(f"{mode:<10} {p50:>8.3f} {results[mode]['p99_ms']:>8.3f} "
+              f"{results[mode]['auth_overhead_ms']:>8.3f} {results[mode].get('direct_p50_ms', 0):>10.3f}")
+
+    orm, principal = results["orm"]["auth_overhead_ms"], results["principal"]["auth_overhead_ms"]
+    reduction = 1 - principal / orm if orm > 0 else 0.0
+    results["overhead_reduction"] = round(reduction, 3)
+    print(f"auth overhead per request: {orm:.3f} ms -> {principal:.3f} ms ({reduction:.0%} less)")
+    write_json(args.output, {"environment": environment(), "results": results})
+
+    if reduction < args.min_reduction:
+        print(f"FAIL: {reduction:.0%} reduction is under the {args.min_reduction:.0%} minimum")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# benchmarks/chat_render.py
+"""
+Cost of rendering one large chat's messages to a JSON response body.
+
+Seeds a scratch SQLite database with a chat of --messages messages (half
+of them AI analyses), stored both the old way (analysis as a JSON string in
+content) and in the typed analysis columns, then times:
+
+- old: load Message objects, json.loads every AI message, json.dumps;
+- new: project MESSAGE_COLUMNS as mappings, unpack_analysis, orjson.dumps.
+
+Fails (exit code 1) unless new is at least --min-speedup times faster.
+
+Usage (from backend/):
+    python -m benchmarks.chat_render [--messages 5000] [--min-speedup 1.5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import orjson
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import JSON_OPTIONS, Base
+from app.auth.models import Chat, Message, User
+from app.message_content import pack_analysis
+from app.routes.analysis_routes import MESSAGE_COLUMNS, _message_item
+from benchmarks.common import environment, percentile, write_json
+
+USER_ID = 1
+LEGACY_CHAT, STRUCTURED_CHAT = 1, 2
+
+
+def analysis(i: int) -> dict:
+    feedback = f"Hello bench! Here's your analysis results for message {i}. " * 4
+    return {
+        "text": feedback,
+        "summary": f"The export to CSV failed again on report {i}.",
+        "sentiment": {"sentiment": "NEGATIVE", "confidence": 0.93, "tier": "model"},
+        "topics": ["export", "csv", "report", "support", "billing"],
+        "feedback": feedback,
+        "risk": True,
+        "risk_level": "Medium",
+        "risk_score": 2.0,
+        "risk_matches": ["failed"],
+    }
+
+
+def seed(db, count: int):
+    legacy, structured = [], []
+    for i in range(count):
+        base = {"user_id": USER_ID, "risk": 0, "risk_level": "Low"}
+        if i % 2:
+            content = analysis(i)
+            base.update(role="ai", risk=1, risk_level="Medium")
+            legacy.append({**base, "chat_id": LEGACY_CHAT, "content": json.dumps(content)})
+            structured.append({**base, "chat_id": STRUCTURED_CHAT, **pack_analysis(content, 1, "Medium")})
+        else:
+            text = f"The export to CSV keeps failing for report {i}"
+            legacy.append({**base, "chat_id": LEGACY_CHAT, "role": "user", "content": text})
+            structured.append({**base, "chat_id": STRUCTURED_CHAT, "role": "user", "content": text})
+    db.execute(insert(Message), legacy)
+    db.execute(insert(Message), structured)
+
+
+def render_old(db) -> bytes:
+    """What get_chat_messages did before typed columns."""
+    db.expire_all()
+    chat = db.get(Chat, LEGACY_CHAT)
+    messages = []
+    for m in chat.messages:
+        content = m.content
+        if m.role == "ai":
+            try:
+                content = json.loads(m.content)
+            except ValueError:
+                pass
+        messages.append({"id": m.id, "role": m.role, "content": content, "risk": m.risk,
+                         "risk_level": m.risk_level, "created_at": m.created_at.isoformat()})
+    return json.dumps(messages).encode("utf-8")
+
+
+def render_new(db) -> bytes:
+    rows = db.execute(
+        select(*MESSAGE_COLUMNS).where(Message.chat_id == STRUCTURED_CHAT).order_by(Message.created_at, Message.id)
+    ).mappings().all()
+    return orjson.dumps([_message_item(row) for row in rows])
+
+
+def time_ms(fn, rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--min-speedup", type=float, default=1.5)
+    parser.add_argument("--output", default="benchmarks/results/chat_render.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(f"sqlite:///{os.path.join(scratch, 'chat.db')}", **JSON_OPTIONS)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            db.add(User(id=USER_ID, username="bench", email="bench@example.com", hashed_password="x"))
+            db.add_all([Chat(id=LEGACY_CHAT, user_id=USER_ID), Chat(id=STRUCTURED_CHAT, user_id=USER_ID)])
+            db.flush()
+            seed(db, args.messages)
+            db.commit()
+
+        with Session() as db:
+            if json.loads(render_old(db)) != orjson.loads(render_new(db)):
+                # Same response bodies apart from ids
+                old, new = json.loads(render_old(db)), orjson.loads(render_new(db))
+                if [m["content"] for m in old] != [m["content"] for m in new]:
+                    print("FAIL: old and new renderings differ")
+                    return 1
+            old = time_ms(lambda: render_old(db), args.rounds)
+            new = time_ms(lambda: render_new(db), args.rounds)
+        engine.dispose()
+
+    results = {
+        "messages": args.messages,
+        "old_p50_ms": round(percentile(old, 50), 2),
+        "new_p50_ms": round(percentile(new, 50), 2),
+    }
+    speedup = results["old_p50_ms"] / results["new_p50_ms"]
+    results["speedup"] = round(speedup, 2)
+    print(f"{args.messages} messages: old {results['old_p50_ms']:.1f} ms, "
+          f"new {results['new_p50_ms']:.1f} ms ({speedup:.1f}x)")
+    write_json(args.output, {"environment": environment(), "results": results})
+
+    if speedup < args.min_speedup:
+        print(f"FAIL: {speedup:.2f}x is under the {args.min_speedup}x minimum")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
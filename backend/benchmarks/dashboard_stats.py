@@ -0,0 +1,121 @@
+# benchmarks/dashboard_stats.py
+"""
+Dashboard stats latency as one user's history grows.
+
+Seeds a scratch SQLite database with --sizes rows of sentiment_history and
+messages for one user (plus their user_stats rollup), then times the old
+four-aggregate /dashboard/stats queries against the user_stats primary-key
+lookup. Fails (exit code 1) if the rollup read at the largest size is more
+than --max-slowdown times the one at the smallest.
+
+Usage (from backend/):
+    python -m benchmarks.dashboard_stats [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.auth.models import Chat, Message, SentimentHistory, User
+from app.rollups import get_user_stats, rebuild_user_stats
+from benchmarks.common import environment, percentile, write_json
+
+USER_ID = 1
+
+
+def seed(db, start: int, end: int, rng: random.Random):
+    history, messages = [], []
+    for i in range(start, end):
+        history.append({"user_id": USER_ID, "text": f"text {i}", "sentiment": "POSITIVE",
+                        "confidence": rng.random()})
+        risky = rng.random() < 0.2
+        messages.append({"user_id": USER_ID, "chat_id": 1, "role": "ai" if i % 2 else "user",
+                         "content": '{"topics": ["export"]}' if i % 2 else f"text {i}",
+                         "risk": int(risky), "risk_level": "High" if risky else "Low"})
+    db.execute(insert(SentimentHistory), history)
+    db.execute(insert(Message), messages)
+
+
+def old_stats(db):
+    """The queries /dashboard/stats ran before the rollup."""
+    return (
+        db.query(SentimentHistory).filter(SentimentHistory.user_id == USER_ID).count(),
+        db.query(func.avg(SentimentHistory.confidence)).filter(SentimentHistory.user_id == USER_ID).scalar(),
+        db.query(Message).filter(Message.user_id == USER_ID, Message.risk == 1).count(),
+        db.query(Message).filter(Message.user_id == USER_ID, Message.role == "ai",
+                                 Message.content.like("%topics%")).count(),
+    )
+
+
+def time_ms(fn, rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    parser.add_argument("--output", default="benchmarks/results/dashboard_stats.json")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(7)
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(f"sqlite:///{os.path.join(scratch, 'dashboard.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            db.add(User(id=USER_ID, username="bench", email="bench@example.com", hashed_password="x"))
+            db.add(Chat(id=1, user_id=USER_ID))
+            db.commit()
+
+        print(f"{'rows':>8} {'old p50 ms':>11} {'rollup p50 ms':>14}")
+        rows = 0
+        for size in sorted(args.sizes):
+            with Session() as db:
+                seed(db, rows, size, rng)
+                rebuild_user_stats(db, USER_ID)
+                db.commit()
+            rows = size
+
+            with Session() as db:
+                def rollup_stats():
+                    # Drop the identity map so every read goes to the database
+                    db.expire_all()
+                    return get_user_stats(db, USER_ID).total_analyses
+
+                old = time_ms(lambda: old_stats(db), max(5, args.rounds // 10))
+                rollup = time_ms(rollup_stats, args.rounds)
+            result = {
+                "rows": size,
+                "old_p50_ms": round(percentile(old, 50), 3),
+                "rollup_p50_ms": round(percentile(rollup, 50), 3),
+            }
+            results.append(result)
+            print(f"{size:>8} {result['old_p50_ms']:>11.3f} {result['rollup_p50_ms']:>14.3f}")
+        engine.dispose()
+
+    write_json(args.output, {"environment": environment(), "results": results})
+
+    slowdown = results[-1]["rollup_p50_ms"] / results[0]["rollup_p50_ms"]
+    if slowdown > args.max_slowdown:
+        print(f"FAIL: rollup read is {slowdown:.2f}x slower at {results[-1]['rows']} rows "
+              f"(max {args.max_slowdown}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
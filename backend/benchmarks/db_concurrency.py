@@ -0,0 +1,165 @@
+# benchmarks/db_concurrency.py
+"""
+Read and write throughput of the SQLite database under concurrency.
+
+Seeds a scratch database with one user's history, then runs --writers
+threads saving analyses (_write_analysis, one transaction each) alongside
+--readers threads fetching history pages and dashboard stats for
+--seconds, twice:
+
+- default: the old engine (rollback journal, default pragmas);
+- tuned: create_db_engine (WAL, synchronous=NORMAL, busy timeout, cache
+  and mmap), readers on a read-only engine.
+
+Reports writes/s, reads/s, read p99 and "database is locked" errors.
+Fails (exit code 1) if the tuned engine has lower read or write
+throughput than the default, or any locked errors.
+
+Usage (from backend/):
+    python -m benchmarks.db_concurrency [--writers 4] [--readers 4] [--seconds 10]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import JSON_OPTIONS, Base, create_db_engine
+from app.auth.models import Chat, SentimentHistory, User
+from app.pagination import keyset, sort_key
+from app.rollups import get_user_stats
+from app.routes.analysis_routes import HISTORY_COLUMNS, _write_analysis
+from benchmarks.common import environment, percentile, write_json
+from benchmarks.write_path import AI_RESULT, CHAT_ID, USER_ID
+
+
+def engines(mode: str, path: str):
+    """(write engine, read engine) for mode."""
+    url = f"sqlite:///{path}"
+    if mode == "default":
+        engine = create_engine(url, connect_args={"check_same_thread": False}, **JSON_OPTIONS)
+        return engine, engine
+    return create_db_engine(url), create_db_engine(url, read_only=True)
+
+
+def seed(Session, rows: int):
+    with Session() as db:
+        db.add(User(id=USER_ID, username="bench", email="bench@example.com", hashed_password="x"))
+        db.add(Chat(id=CHAT_ID, user_id=USER_ID))
+        db.flush()
+        db.execute(insert(SentimentHistory), [
+            {"user_id": USER_ID, "text": f"Seeded analysis {i}", "sentiment": "POSITIVE", "confidence": 0.9}
+            for i in range(rows)
+        ])
+        db.commit()
+
+
+def run(WriteSession, ReadSession, writers: int, readers: int, seconds: float) -> dict:
+    stop = threading.Event()
+    lock = threading.Lock()
+    writes, reads, read_ms, errors = [0], [0], [], []
+
+    def write_loop(worker: int):
+        i = 0
+        while not stop.is_set():
+            try:
+                with WriteSession() as db:
+                    _write_analysis(db, USER_ID, f"The export keeps failing ({worker}-{i})", CHAT_ID, AI_RESULT)
+                    db.commit()
+                with lock:
+                    writes[0] += 1
+            except OperationalError as exc:
+                with lock:
+                    errors.append(str(exc.orig))
+            i += 1
+
+    def read_loop():
+        stmt = keyset(
+            select(*HISTORY_COLUMNS, sort_key(SentimentHistory)).where(SentimentHistory.user_id == USER_ID),
+            SentimentHistory, None, descending=True
+        ).limit(100)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with ReadSession() as db:
+                    db.execute(stmt).mappings().all()
+                    get_user_stats(db, USER_ID)
+                with lock:
+                    reads[0] += 1
+                    read_ms.append((time.perf_counter() - started) * 1000)
+            except OperationalError as exc:
+                with lock:
+                    errors.append(str(exc.orig))
+
+    threads = [threading.Thread(target=write_loop, args=(w,)) for w in range(writers)]
+    threads += [threading.Thread(target=read_loop) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "writes_per_s": round(writes[0] / elapsed, 1),
+        "reads_per_s": round(reads[0] / elapsed, 1),
+        "read_p50_ms": round(percentile(read_ms, 50), 2),
+        "read_p99_ms": round(percentile(read_ms, 99), 2),
+        "locked_errors": sum(1 for e in errors if "locked" in e),
+        "errors": len(errors),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--history", type=int, default=5_000, help="seeded history rows")
+    parser.add_argument("--output", default="benchmarks/results/db_concurrency.json")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'mode':<8} {'writes/s':>9} {'reads/s':>8} {'read p50':>9} {'read p99':>9} {'locked':>7}")
+    with tempfile.TemporaryDirectory() as scratch:
+        for mode in ("default", "tuned"):
+            write_engine, read_engine = engines(mode, os.path.join(scratch, mode + ".db"))
+            Base.metadata.create_all(write_engine)
+            WriteSession = sessionmaker(bind=write_engine, autoflush=False)
+            ReadSession = sessionmaker(bind=read_engine, autoflush=False)
+            seed(WriteSession, args.history)
+
+            result = run(WriteSession, ReadSession, args.writers, args.readers, args.seconds)
+            write_engine.dispose()
+            read_engine.dispose()
+
+            results[mode] = result
+            print(f"{mode:<8} {result['writes_per_s']:>9.1f} {result['reads_per_s']:>8.1f} "
+                  f"{result['read_p50_ms']:>9.2f} {result['read_p99_ms']:>9.2f} {result['locked_errors']:>7}")
+
+    write_json(args.output, {
+        "environment": environment(),
+        "writers": args.writers,
+        "readers": args.readers,
+        "results": results,
+    })
+
+    default, tuned = results["default"], results["tuned"]
+    if tuned["errors"]:
+        print(f"FAIL: {tuned['errors']} errors with the tuned engine")
+        return 1
+    if tuned["writes_per_s"] < default["writes_per_s"] or tuned["reads_per_s"] < default["reads_per_s"]:
+        print("FAIL: the tuned engine has lower throughput than the default")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+# benchmarks/http_load.py
+"""
+End-to-end HTTP latency and throughput of every auth and analysis route.
+
+Boots the FastAPI app in-process (httpx over ASGI, lifespan included)
+against a scratch SQLite database seeded with --users users' chats,
+messages and history. Sentiment uses the lexicon backend, so runs are
+deterministic, CPU-only and offline; bcrypt runs at BCRYPT_ROUNDS=4
+unless set, so the auth routes measure the request path rather than the
+hash cost.
+
+Each endpoint gets --warmup unmeasured requests, then --requests
+requests from --concurrency concurrent clients, rotating through the
+seeded users; request bodies come from a seeded generator. Reports requests/s and p50/p95/p99 per endpoint and
+writes them to --output. With --baseline (an earlier run's JSON) it fails
+(exit code 1) if any endpoint's p95 grew more than --max-regression
+times; it always fails if any request errored.
+
+Usage (from backend/):
+    python -m benchmarks.http_load [--requests 200] [--concurrency 8]
+    python -m benchmarks.http_load --baseline old.json [--max-regression 1.25]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import environment, percentile, write_json
+
+PASSWORD = "bench-password"
+START = datetime(2026, 1, 1)
+
+SUBJECTS = ["the export", "billing", "the dashboard", "support", "the mobile app", "login", "the report"]
+OPINIONS = ["is great", "keeps failing", "is slow again", "works well", "is broken", "could be better",
+            "saved me hours", "crashed twice today"]
+DETAILS = ["after the update", "for our team", "every morning", "since last week", "on large files", ""]
+
+
+class TextGenerator:
+    """Deterministic, varied feedback texts (distinct, so the analysis cache doesn't hide work)."""
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.count = 0
+
+    def __call__(self) -> str:
+        self.count += 1
+        r = self.random
+        sentences = [
+            f"{r.choice(SUBJECTS).capitalize()} {r.choice(OPINIONS)} {r.choice(DETAILS)}".strip() + "."
+            for _ in range(r.randint(1, 3))
+        ]
+        return " ".join(sentences) + f" (#{self.count})"
+
+
+# -------------------
+# Seeding
+# -------------------
+def seed(users: int, chats_per_user: int, messages_per_chat: int, history_per_user: int, text) -> list[dict]:
+    """Insert users and their data; returns [{id, email, chat_ids}]."""
+    from sqlalchemy import insert
+
+    from app.ai.respond import get_response
+    from app.auth.auth import hash_password
+    from app.auth.models import Chat, Message, SentimentHistory, User
+    from app.database import SessionLocal
+    from app.message_content import pack_analysis
+    from app.rollups import rebuild_message_topics, rebuild_sentiment_daily, rebuild_user_stats
+
+    hashed = hash_password(PASSWORD)
+    # A few real analyses, reused for every seeded AI message
+    analyses = [get_response(user_name="bench", text=text()) for _ in range(8)]
+
+    seeded = []
+    with SessionLocal() as db:
+        for u in range(users):
+            email = f"bench{u}@example.com"
+            user_id = db.scalars(insert(User).returning(User.id), [
+                {"username": f"bench{u}", "email": email, "hashed_password": hashed}
+            ]).one()
+            chat_ids = db.scalars(insert(Chat).returning(Chat.id), [
+                {"user_id": user_id, "title": f"Chat {c}", "created_at": START + timedelta(hours=c)}
+                for c in range(chats_per_user)
+            ]).all()
+            messages = []
+            for chat_id in chat_ids:
+                for i in range(messages_per_chat):
+                    row = {"user_id": user_id, "chat_id": chat_id,
+                           "created_at": START + timedelta(minutes=chat_id * messages_per_chat + i)}
+                    if i % 2:
+                        analysis = analyses[i % len(analyses)]
+                        risk = 1 if analysis["risk"] else 0
+                        row.update(role="ai", risk=risk, risk_level=analysis["risk_level"],
+                                   **pack_analysis(analysis, risk, analysis["risk_level"]))
+                    else:
+                        row.update(role="user", content=text(), risk=0, risk_level="Low")
+                    messages.append(row)
+            if messages:
+                db.execute(insert(Message), messages)
+            db.execute(insert(SentimentHistory), [
+                {"user_id": user_id, "text": text(), "sentiment": "POSITIVE" if i % 3 else "NEGATIVE",
+                 "confidence": 0.9, "created_at": START + timedelta(hours=i)}
+                for i in range(history_per_user)
+            ])
+            seeded.append({"id": user_id, "email": email, "chat_ids": list(chat_ids)})
+        db.commit()
+
+        rebuild_user_stats(db)
+        rebuild_sentiment_daily(db)
+        rebuild_message_topics(db)
+        db.commit()
+    return seeded
+
+
+# -------------------
+# Endpoints
+# -------------------
+def endpoints(text) -> dict:
+    """
+    name -> request factory(i, user) returning (method, url, json body).
+    Signups get fresh accounts and deletes fresh chats on every call,
+    warm-up included.
+    """
+    signups = itertools.count()
+
+    def chat(user, i):
+        return user["chat_ids"][i % len(user["chat_ids"])]
+
+    def signup(i, user):
+        n = next(signups)
+        return "POST", "/auth/signup", {"username": f"signup{n}", "email": f"signup{n}@example.com", "password": PASSWORD}
+
+    return {
+        "POST /auth/signup": signup,
+        "POST /auth/login": lambda i, user: (
+            "POST", "/auth/login", {"email": user["email"], "password": PASSWORD}),
+        "GET /auth/me": lambda i, user: ("GET", "/auth/me", None),
+        "POST /analysis/": lambda i, user: ("POST", "/analysis/", {"text": text()}),
+        "POST /analysis/batch": lambda i, user: (
+            "POST", "/analysis/batch", {"texts": [text() for _ in range(8)]}),
+        "GET /analysis/history": lambda i, user: ("GET", "/analysis/history?limit=50", None),
+        "POST /analysis/chats": lambda i, user: ("POST", "/analysis/chats", {"title": f"Chat {i}"}),
+        "GET /analysis/chats": lambda i, user: ("GET", "/analysis/chats?limit=20", None),
+        "GET /analysis/chats/{id}/messages": lambda i, user: (
+            "GET", f"/analysis/chats/{chat(user, i)}/messages?limit=50", None),
+        "POST /analysis/chats/{id}/messages": lambda i, user: (
+            "POST", f"/analysis/chats/{chat(user, i)}/messages", {"role": "user", "content": text()}),
+        "PATCH /analysis/chats/{id}/title": lambda i, user: (
+            "PATCH", f"/analysis/chats/{chat(user, i)}/title", {"title": f"Renamed {i}"}),
+        "GET /analysis/dashboard/stats": lambda i, user: ("GET", "/analysis/dashboard/stats", None),
+        "GET /analysis/dashboard/sentiment-trends": lambda i, user: (
+            "GET", "/analysis/dashboard/sentiment-trends?start=2026-01-01&end=2026-12-31&granularity=week", None),
+        "GET /analysis/dashboard/risk-distribution": lambda i, user: (
+            "GET", "/analysis/dashboard/risk-distribution", None),
+        "GET /analysis/dashboard/topics-frequency": lambda i, user: (
+            "GET", "/analysis/dashboard/topics-frequency", None),
+        # Last: uses up the seeded chats
+        "DELETE /analysis/chats/{id}": lambda i, user: ("DELETE", f"/analysis/chats/{user['chat_ids'].pop()}", None),
+    }
+
+
+async def drive(client, factory, users: list[dict], tokens: dict, requests: int, concurrency: int) -> dict:
+    timings, errors = [], []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            user = users[i % len(users)]
+            method, url, body = factory(i, user)
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body,
+                                            headers={"Authorization": f"Bearer {tokens[user['id']]}"})
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors.append(f"{response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(timings),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "requests_per_s": round(len(timings) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from app.ai import sentiment
+    from app.auth.auth import create_access_token
+    from app.main import app
+
+    text = TextGenerator(args.seed)
+    results = {}
+    async with app.router.lifespan_context(app):
+        while not sentiment.is_ready():
+            await asyncio.sleep(0.05)
+        # Enough chats that every request of the chat endpoints has its own
+        chats = max(args.chats, -(-(args.requests + args.warmup) // args.users) + 1)
+        users = seed(args.users, chats, args.messages, args.history, text)
+        tokens = {user["id"]: create_access_token({"sub": user["email"]}) for user in users}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            print(f"{'endpoint':<42} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for name, factory in endpoints(text).items():
+                if args.only and args.only not in name:
+                    continue
+                await drive(client, factory, users, tokens, args.warmup, args.concurrency)
+                result = await drive(client, factory, users, tokens, args.requests, args.concurrency)
+                results[name] = result
+                print(f"{name:<42} {result['requests_per_s']:>8.1f} {result['p50_ms']:>8.2f} "
+                      f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}")
+    return results
+
+
+def regressions(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    failures = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and before["p95_ms"] > 0 and result["p95_ms"] > before["p95_ms"] * max_regression:
+            failures.append(f"{name}: p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint first")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--chats", type=int, default=10, help="seeded chats per user")
+    parser.add_argument("--messages", type=int, default=50, help="seeded messages per chat")
+    parser.add_argument("--history", type=int, default=500, help="seeded history rows per user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", help="run only endpoints whose name contains this")
+    parser.add_argument("--baseline", help="earlier results JSON to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=1.25)
+    parser.add_argument("--output", default="benchmarks/results/http_load.json")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+    scratch = tempfile.mkdtemp(prefix="pulseai-http-load-")
+    # Configuration is read when the app is imported, so set it first
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+    os.environ["SENTIMENT_BACKEND"] = "lexicon"
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("INFERENCE_MAX_QUEUE", str(max(64, args.concurrency * 2)))
+
+    results = asyncio.run(run(args))
+    write_json(output, {
+        "environment": environment(),
+        "settings": {key: getattr(args, key) for key in ("requests", "concurrency", "warmup", "users", "chats",
+                                                         "messages", "history", "seed")},
+        "results": results,
+    })
+
+    failed = False
+    errored = {name: result["first_error"] for name, result in results.items() if result["errors"]}
+    for name, error in errored.items():
+        print(f"FAIL: {name} had errors, first: {error}")
+        failed = True
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        for failure in regressions(results, baseline, args.max_regression):
+            print(f"FAIL: regression, {failure}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# benchmarks/intent_matching.py
+"""
+Per-request cost of general-question matching with a large intent registry.
+
+Generates a synthetic registry (default 10k intents, several phrases each,
+built from common function words plus pseudo-word vocabularies standing in
+for several languages), then times
+IntentIndex.match per query against the old approach of running
+process.extractOne(token_sort_ratio) over every phrase, plus match_batch
+throughput, and checks that match and match_batch find the same best
+score as brute-force scoring of every phrase. Fails (exit code 1) if any
+of them disagree, or if the index's p50 per query goes over --budget-us.
+
+Usage (from backend/):
+    python -m benchmarks.intent_matching [--intents 10000] [--budget-us 2000]
+"""
+import argparse
+import random
+import sys
+import time
+
+from rapidfuzz import fuzz, process
+
+from app.ai.intents import IntentIndex, _sorted_form
+from benchmarks.common import environment, percentile, write_json
+
+# Function words shared by many intents, per language
+FUNCTION_WORDS = {
+    "en": "who what how why when where can does is the my",
+    "es": "quien que como por cuando donde puede es el mi",
+    "de": "wer was wie warum wann wo kann ist der mein",
+}
+CONTENT_WORDS_PER_LANGUAGE = 1500
+
+FEEDBACK = (
+    "I have been using the dashboard for a few weeks and the sentiment charts are really helpful, "
+    "but the export to CSV keeps failing when the report is large and support has not replied yet."
+)
+
+
+def build_vocabularies(seed: int) -> dict:
+    """Pseudo-words per language, standing in for real intent vocabularies."""
+    rng = random.Random(seed)
+    consonants, vowels = "bcdfghklmnprstvz", "aeiou"
+    vocabularies = {}
+    for language in FUNCTION_WORDS:
+        words = set()
+        while len(words) < CONTENT_WORDS_PER_LANGUAGE:
+            syllables = rng.randint(2, 4)
+            words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(syllables)))
+        vocabularies[language] = sorted(words)
+    return vocabularies
+
+
+def build_intents(count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    vocabularies = build_vocabularies(seed)
+    languages = sorted(vocabularies)
+    intents = []
+    for i in range(count):
+        language = languages[i % len(languages)]
+        function_words = FUNCTION_WORDS[language].split()
+        phrases = [
+            " ".join([rng.choice(function_words)] + rng.sample(vocabularies[language], rng.randint(2, 5)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        intents.append({
+            "id": f"intent_{i}",
+            "language": language,
+            "phrases": phrases,
+            "response": f"Response {i} for {{user_name}}",
+        })
+    return intents
+
+
+def typo(text: str, rng: random.Random) -> str:
+    chars = list(text)
+    position = rng.randrange(len(chars))
+    chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def build_queries(intents: list[dict], count: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    phrases = [p for intent in intents for p in intent["phrases"]]
+    vocabulary = build_vocabularies(seed)["en"] + FUNCTION_WORDS["en"].split()
+    return {
+        "exact": [rng.choice(phrases) for _ in range(count)],
+        "typo": [typo(rng.choice(phrases), rng) for _ in range(count)],
+        "short_miss": ["what " + " ".join(rng.sample(vocabulary, 2)) for _ in range(count)],
+        "feedback": [FEEDBACK] * count,
+    }
+
+
+def time_per_query(fn, queries: list[str]) -> list[float]:
+    timings = []
+    for query in queries:
+        started = time.perf_counter_ns()
+        fn(query)
+        timings.append((time.perf_counter_ns() - started) / 1000)
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--intents", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--baseline-queries", type=int, default=50)
+    parser.add_argument("--budget-us", type=float, default=2000.0, help="max p50 µs per query")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmarks/results/intent_matching.json")
+    args = parser.parse_args(argv)
+
+    intents = build_intents(args.intents, args.seed)
+    started = time.perf_counter()
+    index = IntentIndex(intents)
+    build_ms = (time.perf_counter() - started) * 1000
+    phrases = [p.lower() for intent in intents for p in intent["phrases"]]
+    queries = build_queries(intents, args.queries, args.seed)
+
+    def baseline(query):
+        return process.extractOne(query.lower().strip(), phrases, scorer=fuzz.token_sort_ratio)
+
+    print(f"{len(intents)} intents / {len(index)} phrases, index built in {build_ms:.1f} ms")
+    print(f"{'query kind':<12} {'index p50 µs':>13} {'index p99 µs':>13} {'extractOne p50 µs':>18}")
+    results = {"build_ms": round(build_ms, 2), "phrases": len(index), "kinds": {}}
+    all_index = []
+    for kind, batch in queries.items():
+        indexed = time_per_query(index.match, batch)
+        base = time_per_query(baseline, batch[:args.baseline_queries])
+        all_index.extend(indexed)
+        results["kinds"][kind] = {
+            "index_p50_us": round(percentile(indexed, 50), 2),
+            "index_p99_us": round(percentile(indexed, 99), 2),
+            "extract_one_p50_us": round(percentile(base, 50), 2),
+        }
+        row = results["kinds"][kind]
+        print(f"{kind:<12} {row['index_p50_us']:>13.1f} {row['index_p99_us']:>13.1f} "
+              f"{row['extract_one_p50_us']:>18.1f}")
+
+    mixed = [q for batch in queries.values() for q in batch]
+    started = time.perf_counter()
+    batched = index.match_batch(mixed)
+    batch_us = (time.perf_counter() - started) * 1e6 / len(mixed)
+    results["match_batch_us_per_query"] = round(batch_us, 2)
+    print(f"match_batch: {batch_us:.1f} µs per query over {len(mixed)} mixed queries")
+
+    # Same best score as scoring every phrase (scores rounded: cdist is float32)
+    def score(match):
+        return None if match is None else round(match["score"], 3)
+
+    forms = index._forms
+    checked = [q for batch in queries.values() for q in batch[:args.baseline_queries]]
+    disagreements = 0
+    for query in checked:
+        brute = process.extractOne(_sorted_form(query), forms, scorer=fuzz.ratio, score_cutoff=index.threshold)
+        expected = None if brute is None else round(brute[1], 3)
+        single = score(index.match(query))
+        disagreements += single != expected or score(batched[mixed.index(query)]) != expected
+    results["disagreements"] = disagreements
+    print(f"match vs brute force: {disagreements} of {len(checked)} queries disagree")
+
+    p50 = percentile(all_index, 50)
+    results["index_p50_us"] = round(p50, 2)
+    write_json(args.output, {"environment": environment(), "results": results})
+
+    failed = False
+    if disagreements:
+        print(f"FAIL: {disagreements} queries matched differently from brute force")
+        failed = True
+    if p50 > args.budget_us:
+        print(f"FAIL: index p50 {p50:.1f} µs is over the {args.budget_us:.0f} µs budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# benchmarks/login_burst.py
+"""
+Effect of a login storm on /analysis/ latency.
+
+Starts the app under uvicorn in a subprocess (scratch database, lexicon
+sentiment backend), then measures POST /analysis/ latency from one client
+while --burst other clients log in back to back, three ways:
+
+- baseline: no logins;
+- inline: the old login handler, bcrypt on the request threadpool
+  (served by this module as /bench/inline-login);
+- pool: /auth/login, bcrypt on the password process pool.
+
+Reports /analysis/ p50/p99, logins/s and rejected (503) logins. Fails (exit
+code 1) unless the pool's /analysis/ p99 under the burst is at least
+--min-improvement times lower than inline's.
+
+Usage (from backend/):
+    python -m benchmarks.login_burst [--burst 8] [--requests 100]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, environment, percentile, write_json
+
+EMAIL, PASSWORD = "bench@example.com", "bench-password"
+TEXT = "The export to CSV keeps failing and support never answers"
+
+
+def create_app():
+    """The real app plus the pre-pool login handler (uvicorn --factory)."""
+    from fastapi import Depends, HTTPException
+    from sqlalchemy.orm import Session
+
+    from app.auth import auth, models, schemas
+    from app.database import get_db
+    from app.main import app
+
+    @app.post("/bench/inline-login")
+    def inline_login(form_data: schemas.UserLogin, db: Session = Depends(get_db)):
+        user = db.query(models.User).filter(models.User.email == form_data.email).first()
+        if not user or not auth.verify_password(form_data.password, user.hashed_password):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        return {"access_token": auth.create_access_token({"sub": user.email}), "token_type": "bearer"}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(scratch: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, SENTIMENT_BACKEND="lexicon")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.login_burst:create_app", "--factory",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=scratch, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health/ready").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("server did not become ready")
+
+
+def run(base: str, token: str, login_path: str, burst: int, requests: int) -> dict:
+    stop = threading.Event()
+    logins, rejected = [], []
+
+    def login_loop():
+        with httpx.Client(base_url=base, timeout=60) as client:
+            while not stop.is_set():
+                response = client.post(login_path, json={"email": EMAIL, "password": PASSWORD})
+                (logins if response.status_code == 200 else rejected).append(response.status_code)
+
+    workers = [threading.Thread(target=login_loop) for _ in range(burst if login_path else 0)]
+    burst_started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(1.0 if workers else 0)  # let the burst build up
+
+    timings = []
+    with httpx.Client(base_url=base, timeout=60, headers={"Authorization": f"Bearer {token}"}) as client:
+        for _ in range(requests):
+            request_started = time.perf_counter()
+            response = client.post("/analysis/", json={"text": TEXT})
+            timings.append((time.perf_counter() - request_started) * 1000)
+            assert response.status_code == 200, response.text
+
+    stop.set()
+    for worker in workers:
+        worker.join()
+    burst_seconds = time.perf_counter() - burst_started
+    return {
+        "analysis_p50_ms": round(percentile(timings, 50), 2),
+        "analysis_p99_ms": round(percentile(timings, 99), 2),
+        "logins_per_s": round(len(logins) / burst_seconds, 1),
+        "rejected_logins": len(rejected),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--burst", type=int, default=8, help="concurrent login clients")
+    parser.add_argument("--requests", type=int, default=100, help="/analysis/ requests per mode")
+    parser.add_argument("--min-improvement", type=float, default=2.0)
+    parser.add_argument("--output", default="benchmarks/results/login_burst.json")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        port = free_port()
+        base = f"http://127.0.0.1:{port}"
+        server = start_server(scratch, port)
+        try:
+            httpx.post(f"{base}/auth/signup", json={"username": "bench", "email": EMAIL, "password": PASSWORD}, timeout=60)
+            token = httpx.post(f"{base}/auth/login", json={"email": EMAIL, "password": PASSWORD}, timeout=60).json()["access_token"]
+
+            print(f"{'mode':<9} {'p50 ms':>8} {'p99 ms':>8} {'logins/s':>9} {'rejected':>9}")
+            for mode, path in (("baseline", None), ("inline", "/bench/inline-login"), ("pool", "/auth/login")):
+                result = run(base, token, path, args.burst, args.requests)
+                results[mode] = result
+                print(f"{mode:<9} {result['analysis_p50_ms']:>8.1f} {result['analysis_p99_ms']:>8.1f} "
+                      f"{result['logins_per_s']:>9.1f} {result['rejected_logins']:>9}")
+            results["password_hasher"] = httpx.get(f"{base}/health/stats").json()["password_hasher"]
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    improvement = results["inline"]["analysis_p99_ms"] / max(results["pool"]["analysis_p99_ms"], 1e-9)
+    results["p99_improvement"] = round(improvement, 2)
+    print(f"/analysis/ p99 during the login burst: {improvement:.1f}x lower with the pool")
+    write_json(args.output, {"environment": environment(), "burst": args.burst, "results": results})
+
+    if improvement < args.min_improvement:
+        print(f"FAIL: {improvement:.2f}x is under the {args.min_improvement}x minimum")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
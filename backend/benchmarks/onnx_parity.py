@@ -0,0 +1,161 @@
+# benchmarks/onnx_parity.py
+"""
+Accuracy parity and latency/RSS comparison of the sentiment backends.
+
+Each backend (torch, onnx fp32, onnx int8) runs in its own interpreter so the
+peak RSS numbers are not polluted by the others. Predictions on the fixed
+corpus in benchmarks/data/sentiment_labelled.tsv are compared with the torch
+backend; the run fails (exit code 1) if an ONNX variant's label agreement
+drops below --min-agreement.
+
+The ONNX artifacts are exported into the cache first, in a separate
+interpreter, so the one-off export (needs torch + transformers + onnx) does
+not count towards the ONNX variants' load time or RSS.
+
+Usage (from backend/):
+    python -m benchmarks.onnx_parity [--output benchmarks/results/onnx_parity.json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks.common import (
+    BACKEND_DIR,
+    environment,
+    load_labelled_corpus,
+    peak_rss_mb,
+    percentile,
+    write_json,
+)
+
+VARIANTS = {
+    "torch": {"backend": "torch"},
+    "onnx-fp32": {"backend": "onnx", "quantize": False},
+    "onnx-int8": {"backend": "onnx", "quantize": True},
+}
+
+
+def run_worker(variant: str, repeats: int, batch_size: int) -> dict:
+    """Load one backend, time it and return its predictions (runs in a child)."""
+    from app.ai.model import create_model
+    from app.ai.sentiment import SENTIMENT_MODEL_NAME, SENTIMENT_ONNX_DIR
+
+    options = dict(VARIANTS[variant])
+    backend = options.pop("backend")
+    if backend == "onnx":
+        options["cache_dir"] = SENTIMENT_ONNX_DIR
+    model = create_model(backend, SENTIMENT_MODEL_NAME, **options)
+
+    started = time.perf_counter()
+    model.load()
+    model.warmup()
+    load_seconds = time.perf_counter() - started
+
+    texts = [text for _, text in load_labelled_corpus()]
+
+    single = []
+    for _ in range(repeats):
+        for text in texts:
+            t0 = time.perf_counter()
+            model.predict([text])
+            single.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for i in range(0, len(texts), batch_size):
+            model.predict(texts[i:i + batch_size])
+    batched_seconds = time.perf_counter() - t0
+
+    predictions = model.predict(texts)
+    return {
+        "variant": variant,
+        "load_seconds": round(load_seconds, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "single_ms": {
+            "p50": round(percentile(single, 50), 3),
+            "p95": round(percentile(single, 95), 3),
+            "p99": round(percentile(single, 99), 3),
+        },
+        "batched_texts_per_second": round(repeats * len(texts) / batched_seconds, 1),
+        "predictions": predictions,
+    }
+
+
+def export_artifacts():
+    """Export fp32 + int8 ONNX models into the cache (runs in a child)."""
+    from app.ai.onnx_model import export_onnx
+    from app.ai.sentiment import SENTIMENT_MODEL_NAME, SENTIMENT_ONNX_DIR
+
+    export_onnx(SENTIMENT_MODEL_NAME, SENTIMENT_ONNX_DIR, quantize=True)
+
+
+def spawn(*args: str) -> str:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.onnx_parity", *args],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if output.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{output.stderr}")
+    return output.stdout
+
+
+def compare(reference: list[dict], candidate: list[dict], labels: list[str]) -> dict:
+    agree = sum(r["label"] == c["label"] for r, c in zip(reference, candidate))
+    correct = sum(c["label"] == label for c, label in zip(candidate, labels))
+    deltas = [abs(r["score"] - c["score"]) for r, c in zip(reference, candidate)]
+    return {
+        "agreement_with_torch": round(agree / len(reference), 4),
+        "accuracy": round(correct / len(labels), 4),
+        "max_score_delta": round(max(deltas), 6),
+        "mean_score_delta": round(sum(deltas) / len(deltas), 6),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--worker", choices=sorted(VARIANTS), help=argparse.SUPPRESS)
+    parser.add_argument("--export", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--min-agreement", type=float, default=0.97)
+    parser.add_argument("--output", default="benchmarks/results/onnx_parity.json")
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.repeats, args.batch_size)))
+        return 0
+    if args.export:
+        export_artifacts()
+        return 0
+
+    spawn("--export")
+    labels = [label for label, _ in load_labelled_corpus()]
+    results = {}
+    for name in VARIANTS:
+        output = spawn("--worker", name, "--repeats", str(args.repeats),
+                       "--batch-size", str(args.batch_size))
+        results[name] = json.loads(output.strip().splitlines()[-1])
+    reference = results["torch"]["predictions"]
+
+    print(f"{'variant':<10} {'agree':>7} {'acc':>7} {'max Δ':>9} {'load s':>7} "
+          f"{'RSS MB':>8} {'p50 ms':>8} {'p95 ms':>8} {'batch/s':>9}")
+    failed = False
+    for name, result in results.items():
+        result.update(compare(reference, result["predictions"], labels))
+        print(f"{name:<10} {result['agreement_with_torch']:>7.2%} {result['accuracy']:>7.2%} "
+              f"{result['max_score_delta']:>9.5f} {result['load_seconds']:>7.2f} "
+              f"{result['peak_rss_mb']:>8.1f} {result['single_ms']['p50']:>8.2f} "
+              f"{result['single_ms']['p95']:>8.2f} {result['batched_texts_per_second']:>9.1f}")
+        if name != "torch" and result["agreement_with_torch"] < args.min_agreement:
+            print(f"FAIL: {name} agrees with torch on {result['agreement_with_torch']:.2%} "
+                  f"of the corpus (minimum {args.min_agreement:.2%})")
+            failed = True
+
+    write_json(args.output, {"environment": environment(), "results": results})
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
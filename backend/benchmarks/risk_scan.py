@@ -0,0 +1,86 @@
+# benchmarks/risk_scan.py
+"""
+Risk lexicon scan time versus lexicon size.
+
+Compiles the shipped lexicon padded with synthetic terms and phrases into
+RiskLexicon automata of growing size, then times scan() over the labelled
+corpus. Also times the old one-substring-check-per-word approach for
+comparison. Fails (exit code 1) if the largest lexicon's scan is more than
+--max-slowdown times the smallest one's.
+
+Usage (from backend/):
+    python -m benchmarks.risk_scan [--sizes 10 1000 10000 100000]
+"""
+import argparse
+import random
+import sys
+import time
+
+from app.ai.risk import RISK_LEXICON_PATH, RiskLexicon
+from benchmarks.common import environment, load_labelled_corpus, write_json
+
+
+def build_terms(size: int, seed: int) -> dict[str, float]:
+    rng = random.Random(seed)
+    terms = dict(RiskLexicon.from_file(RISK_LEXICON_PATH).terms)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    while len(terms) < size:
+        words = ["".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(rng.randint(1, 3))]
+        terms[" ".join(words)] = rng.choice([0.5, 1.0, 2.0, 3.0])
+    return terms
+
+
+def time_us(fn, texts: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) * 1e6 / (rounds * len(texts))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 10_000, 100_000])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmarks/results/risk_scan.json")
+    args = parser.parse_args(argv)
+
+    texts = [text for _, text in load_labelled_corpus()]
+    print(f"{'terms':>8} {'build ms':>9} {'scan µs':>9} {'substring µs':>13}")
+    results = []
+    for size in args.sizes:
+        terms = build_terms(size, args.seed)
+        started = time.perf_counter()
+        lexicon = RiskLexicon(terms)
+        build_ms = (time.perf_counter() - started) * 1000
+        words = list(terms)
+
+        def substring(text):
+            text_lower = text.lower()
+            return any(word in text_lower for word in words)
+
+        result = {
+            "terms": len(lexicon),
+            "build_ms": round(build_ms, 1),
+            "scan_us": round(time_us(lexicon.scan, texts, args.rounds), 2),
+            # The old approach is only slower as it grows; a few rounds are enough
+            "substring_us": round(time_us(substring, texts, max(1, args.rounds // 10)), 2),
+        }
+        results.append(result)
+        print(f"{result['terms']:>8} {result['build_ms']:>9.1f} {result['scan_us']:>9.2f} "
+              f"{result['substring_us']:>13.2f}")
+
+    write_json(args.output, {"environment": environment(), "results": results})
+
+    slowdown = results[-1]["scan_us"] / results[0]["scan_us"]
+    if slowdown > args.max_slowdown:
+        print(f"FAIL: scan is {slowdown:.2f}x slower at {results[-1]['terms']} terms "
+              f"than at {results[0]['terms']} (max {args.max_slowdown}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
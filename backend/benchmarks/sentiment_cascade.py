@@ -0,0 +1,120 @@
+# benchmarks/sentiment_cascade.py
+"""
+Evaluation of the lexicon -> model sentiment cascade.
+
+Scores a labelled corpus (default benchmarks/data/sentiment_labelled.tsv)
+with the lexicon tier and with the configured model backend
+(SENTIMENT_BACKEND), then for each threshold in --thresholds reports:
+
+- model_calls_avoided: share of texts the lexicon answers on its own
+- agreement: cascade labels that match the model-only labels
+- accuracy: cascade labels that match the gold labels
+
+With --no-model (or when the model can't be loaded) the gold labels stand
+in for the model's, so agreement equals accuracy. Fails (exit code 1) if at
+--threshold (default SENTIMENT_LEXICON_THRESHOLD) fewer than
+--min-avoided of the calls are avoided or agreement is under
+--min-agreement.
+
+Usage (from backend/):
+    python -m benchmarks.sentiment_cascade [--corpus FILE] [--no-model]
+"""
+import argparse
+import sys
+import time
+
+from app.ai.lexicon_model import LexiconSentimentModel
+from app.ai.sentiment import SENTIMENT_LEXICON_PATH, SENTIMENT_LEXICON_THRESHOLD
+from benchmarks.common import DATA_DIR, environment, load_labelled_corpus, write_json
+
+
+def model_labels(texts: list[str], batch_size: int = 16):
+    """Model-only labels for texts, or None if no model backend can be loaded."""
+    from app.ai.model import create_model
+    from app.ai.sentiment import SENTIMENT_BACKEND, SENTIMENT_MODEL_NAME
+
+    try:
+        model = create_model(SENTIMENT_BACKEND, SENTIMENT_MODEL_NAME)
+        model.load()
+    except Exception as exc:
+        print(f"Model backend unavailable ({type(exc).__name__}: {exc}); comparing with gold labels")
+        return None
+    labels = []
+    for start in range(0, len(texts), batch_size):
+        labels.extend(r["label"] for r in model.predict(texts[start:start + batch_size]))
+    return labels
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=f"{DATA_DIR}/sentiment_labelled.tsv")
+    parser.add_argument("--thresholds", type=float, nargs="+",
+                        default=[0.2, 0.3, 0.4, 0.45, 0.5, 0.6, 0.7])
+    parser.add_argument("--threshold", type=float, default=SENTIMENT_LEXICON_THRESHOLD)
+    parser.add_argument("--min-avoided", type=float, default=0.5)
+    parser.add_argument("--min-agreement", type=float, default=0.97)
+    parser.add_argument("--no-model", action="store_true", help="compare with gold labels only")
+    parser.add_argument("--output", default="benchmarks/results/sentiment_cascade.json")
+    args = parser.parse_args(argv)
+
+    corpus = load_labelled_corpus(args.corpus)
+    gold = [label for label, _ in corpus]
+    texts = [text for _, text in corpus]
+
+    lexicon = LexiconSentimentModel(SENTIMENT_LEXICON_PATH)
+    lexicon.load()
+    started = time.perf_counter()
+    polarities = [lexicon.polarity(text) for text in texts]
+    lexicon_us = (time.perf_counter() - started) * 1e6 / len(texts)
+
+    model = None if args.no_model else model_labels(texts)
+    reference = model or gold
+    model_accuracy = sum(m == g for m, g in zip(model, gold)) / len(gold) if model else None
+
+    thresholds = sorted(set(args.thresholds) | {args.threshold})
+    print(f"{len(texts)} texts, lexicon {lexicon_us:.1f} µs/text, reference: {'model' if model else 'gold'}")
+    if model_accuracy is not None:
+        print(f"model-only accuracy: {model_accuracy:.3f}")
+    print(f"{'threshold':>9} {'avoided':>8} {'agreement':>10} {'accuracy':>9}")
+    results = []
+    for threshold in thresholds:
+        labels = []
+        answered = 0
+        for polarity, fallback in zip(polarities, reference):
+            if abs(polarity) >= threshold:
+                answered += 1
+                labels.append("POSITIVE" if polarity > 0 else "NEGATIVE")
+            else:
+                labels.append(fallback)
+        result = {
+            "threshold": threshold,
+            "model_calls_avoided": round(answered / len(texts), 4),
+            "agreement": round(sum(a == b for a, b in zip(labels, reference)) / len(texts), 4),
+            "accuracy": round(sum(a == b for a, b in zip(labels, gold)) / len(texts), 4),
+        }
+        results.append(result)
+        marker = " <" if threshold == args.threshold else ""
+        print(f"{threshold:>9.2f} {result['model_calls_avoided']:>8.3f} {result['agreement']:>10.3f} "
+              f"{result['accuracy']:>9.3f}{marker}")
+
+    write_json(args.output, {
+        "environment": environment(),
+        "reference": "model" if model else "gold",
+        "lexicon_us_per_text": round(lexicon_us, 2),
+        "model_accuracy": model_accuracy,
+        "results": results,
+    })
+
+    chosen = next(r for r in results if r["threshold"] == args.threshold)
+    failures = []
+    if chosen["model_calls_avoided"] < args.min_avoided:
+        failures.append(f"only {chosen['model_calls_avoided']:.1%} of model calls avoided")
+    if chosen["agreement"] < args.min_agreement:
+        failures.append(f"agreement {chosen['agreement']:.1%} is under {args.min_agreement:.0%}")
+    for failure in failures:
+        print(f"FAIL at threshold {args.threshold}: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
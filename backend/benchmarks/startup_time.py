@@ -0,0 +1,83 @@
+# benchmarks/startup_time.py
+"""
+Guard the cost of importing the FastAPI app.
+
+Imports `app.main` in fresh interpreters, timing the web framework and ORM
+(fastapi, pydantic, sqlalchemy: a fixed cost, about 0.8 s on a slow single
+core) apart from the app's own modules. Fails (exit code 1) if the median of
+the app's own import time goes over --budget, the total over --total-budget
+(if given), or if torch/transformers got imported along the way. The model
+is only meant to load in the lifespan hook.
+
+Usage (from backend/):
+    python -m benchmarks.startup_time [--runs 5] [--budget 0.35] [--total-budget 1.0]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import email_validator, fastapi, fastapi.responses, fastapi.security, pydantic, sqlalchemy.orm
+framework = time.perf_counter() - started
+import app.main
+elapsed = time.perf_counter() - started
+heavy = sorted(m for m in ("torch", "transformers", "onnxruntime") if m in sys.modules)
+print(json.dumps({"seconds": elapsed, "app_seconds": elapsed - framework, "heavy_modules": heavy}))
+"""
+
+
+def measure(runs: int) -> list[dict]:
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=0.35, help="max median seconds for the app's own modules")
+    parser.add_argument("--total-budget", type=float, help="max median seconds in total")
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs)
+    seconds = [r["seconds"] for r in results]
+    app_seconds = [r["app_seconds"] for r in results]
+    heavy = sorted({m for r in results for m in r["heavy_modules"]})
+    median, app_median = statistics.median(seconds), statistics.median(app_seconds)
+
+    print(f"import app.main: median {median * 1000:.1f} ms, "
+          f"min {min(seconds) * 1000:.1f} ms, max {max(seconds) * 1000:.1f} ms "
+          f"over {args.runs} runs")
+    print(f"  app modules: median {app_median * 1000:.1f} ms (budget {args.budget * 1000:.0f} ms), "
+          f"framework and ORM: median {(median - app_median) * 1000:.1f} ms")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if app_median > args.budget:
+        print("FAIL: app import time over budget")
+        failed = True
+    if args.total_budget is not None and median > args.total_budget:
+        print("FAIL: total import time over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
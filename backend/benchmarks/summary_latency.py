@@ -0,0 +1,78 @@
+# benchmarks/summary_latency.py
+"""
+Latency of the extractive summarizer on the request path.
+
+Builds documents of each --sizes length (in bytes) from the labelled corpus
+and times summarize_text on each, plus summarize_batch per document. Fails
+(exit code 1) if the p50 for a 5 KB document goes over --budget-ms.
+
+Usage (from backend/):
+    python -m benchmarks.summary_latency [--sizes 500 5000 50000] [--budget-ms 5]
+"""
+import argparse
+import sys
+import time
+
+from app.ai.summary import split_sentences, summarize_batch, summarize_text
+from benchmarks.common import environment, load_labelled_corpus, percentile, write_json
+
+BUDGET_SIZE = 5000
+
+
+def build_document(texts: list[str], size: int) -> str:
+    parts, length, i = [], 0, 0
+    while length < size:
+        parts.append(texts[i % len(texts)])
+        length += len(parts[-1]) + 1
+        i += 1
+    return " ".join(parts)[:size]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, BUDGET_SIZE, 50_000])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--budget-ms", type=float, default=5.0)
+    parser.add_argument("--output", default="benchmarks/results/summary_latency.json")
+    args = parser.parse_args(argv)
+
+    texts = [text for _, text in load_labelled_corpus()]
+    summarize_text(texts[0] + " " + texts[1])  # numpy import and first-call costs
+
+    print(f"{'bytes':>7} {'sentences':>10} {'p50 ms':>8} {'p99 ms':>8} {'batch ms/doc':>13}")
+    results = []
+    for size in args.sizes:
+        document = build_document(texts, size)
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            summarize_text(document)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        summarize_batch([document] * args.batch)
+        batch_ms = (time.perf_counter() - started) * 1000 / args.batch
+
+        result = {
+            "bytes": size,
+            "sentences": len(split_sentences(document)),
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "batch_ms_per_doc": round(batch_ms, 3),
+        }
+        results.append(result)
+        print(f"{size:>7} {result['sentences']:>10} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+              f"{result['batch_ms_per_doc']:>13.3f}")
+
+    write_json(args.output, {"environment": environment(), "results": results})
+
+    over = [r for r in results if r["bytes"] == BUDGET_SIZE and r["p50_ms"] > args.budget_ms]
+    if over:
+        print(f"FAIL: 5 KB p50 {over[0]['p50_ms']:.2f} ms is over the {args.budget_ms} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
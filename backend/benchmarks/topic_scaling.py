@@ -0,0 +1,113 @@
+# benchmarks/topic_scaling.py
+"""
+Per-request topic extraction cost as a user's corpus grows.
+
+Grows one user's SQLTopicCorpus in a scratch SQLite database to each
+--sizes document count (synthetic feedback built from the labelled corpus
+plus a long tail of rare words), and at each size times extract_topics on
+the labelled texts plus saving their document frequencies: the lookup
+while scoring and the upsert and commit a request's write transaction
+adds. Fails (exit code 1) if the p50 at the largest size is more than
+--max-slowdown times the p50 at the smallest.
+
+Usage (from backend/):
+    python -m benchmarks.topic_scaling [--sizes 1000 10000 100000 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.ai.topics import candidate_terms, extract_topics
+from app.rollups import SQLTopicCorpus
+from benchmarks.common import environment, load_labelled_corpus, percentile, write_json
+
+
+def synthetic_documents(texts: list[str], count: int, rng: random.Random):
+    """Term sets shaped like real ones: corpus words plus a rare-word tail."""
+    pool = [set(candidate_terms(text)) for text in texts]
+    for _ in range(count):
+        terms = set(rng.choice(pool))
+        terms.update(f"w{rng.randint(0, 200_000)}" for _ in range(rng.randint(2, 8)))
+        yield terms
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmarks/results/topic_scaling.json")
+    args = parser.parse_args(argv)
+
+    texts = [text for _, text in load_labelled_corpus()]
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(f"sqlite:///{os.path.join(scratch, 'topics.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        corpus = SQLTopicCorpus(user_id=1, session_factory=Session)
+
+        def observe(batch):
+            corpus.observe(batch)
+            with Session() as db:
+                corpus.save(db)
+                db.commit()
+
+        print(f"{'documents':>10} {'p50 µs':>9} {'p99 µs':>9} {'distinct terms':>15}")
+        results = []
+        documents = 0
+        for size in sorted(args.sizes):
+            batch = []
+            for terms in synthetic_documents(texts, size - documents, rng):
+                batch.append(terms)
+                if len(batch) == 5000:
+                    observe(batch)
+                    batch = []
+            if batch:
+                observe(batch)
+            documents = size
+
+            timings = []
+            for _ in range(args.rounds):
+                for text in texts:
+                    started = time.perf_counter_ns()
+                    extract_topics(text, corpus=corpus)
+                    with Session() as db:
+                        corpus.save(db)
+                        db.commit()
+                    timings.append((time.perf_counter_ns() - started) / 1000)
+            documents += args.rounds * len(texts)
+
+            with engine.connect() as conn:
+                terms = conn.exec_driver_sql("SELECT COUNT(*) FROM term_document_frequency").scalar()
+            result = {
+                "documents": size,
+                "p50_us": round(percentile(timings, 50), 1),
+                "p99_us": round(percentile(timings, 99), 1),
+                "distinct_terms": terms,
+            }
+            results.append(result)
+            print(f"{size:>10} {result['p50_us']:>9.1f} {result['p99_us']:>9.1f} {terms:>15}")
+        engine.dispose()
+
+    write_json(args.output, {"environment": environment(), "results": results})
+
+    slowdown = results[-1]["p50_us"] / results[0]["p50_us"]
+    if slowdown > args.max_slowdown:
+        print(f"FAIL: p50 is {slowdown:.2f}x slower at {results[-1]['documents']} documents "
+              f"than at {results[0]['documents']} (max {args.max_slowdown}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# benchmarks/worker_pool_scaling.py
+"""
+Throughput and memory of the inference worker pool across worker counts.
+
+For each worker count the configured backend (SENTIMENT_BACKEND) is loaded
+once, wrapped in ProcessPoolSentimentModel (0 = in-process), driven through
+a MicroBatcher from many client threads, and measured for texts/second and
+total proportional set size (PSS) of the parent plus its workers. PSS splits
+shared copy-on-write pages between processes, so a flat total means the
+weights really are shared.
+
+Usage (from backend/):
+    python -m benchmarks.worker_pool_scaling [--workers 0 1 2 4 8] [--threads 1]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import environment, load_labelled_corpus, write_json
+
+
+def pss_mb(pid: int) -> float:
+    """Proportional set size of one process in MB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def run(workers: int, threads: int, requests: int, clients: int) -> dict:
+    from app.ai.batching import MicroBatcher
+    from app.ai.model import create_model
+    from app.ai.sentiment import SENTIMENT_BACKEND, SENTIMENT_MODEL_NAME
+    from app.ai.worker_pool import ProcessPoolSentimentModel
+
+    model = create_model(SENTIMENT_BACKEND, SENTIMENT_MODEL_NAME)
+    if workers:
+        model = ProcessPoolSentimentModel(model, workers=workers, threads_per_worker=threads)
+    model.load()
+    if not workers:
+        model.set_threads(threads)
+    model.warmup()
+
+    batcher = MicroBatcher(model.predict, max_batch_size=16, max_wait_ms=5, concurrency=max(workers, 1))
+    corpus = [text for _, text in load_labelled_corpus()]
+    texts = [corpus[i % len(corpus)] for i in range(requests)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(batcher, texts))
+    elapsed = time.perf_counter() - started
+
+    pids = [os.getpid()]
+    if workers:
+        pids += [p.pid for p in model._pool._pool]
+    memory = sum(pss_mb(pid) for pid in pids)
+
+    batcher.stop()
+    model.close()
+    return {
+        "workers": workers,
+        "threads_per_worker": threads,
+        "texts_per_second": round(requests / elapsed, 1),
+        "total_pss_mb": round(memory, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--threads", type=int, default=1, help="intra-op threads per worker")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--output", default="benchmarks/results/worker_pool_scaling.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'workers':>8} {'texts/s':>10} {'speedup':>8} {'PSS MB':>9}")
+    for workers in args.workers:
+        result = run(workers, args.threads, args.requests, args.clients)
+        baseline = results[0]["texts_per_second"] if results else result["texts_per_second"]
+        result["speedup"] = round(result["texts_per_second"] / baseline, 2)
+        results.append(result)
+        print(f"{workers:>8} {result['texts_per_second']:>10.1f} {result['speedup']:>8.2f} "
+              f"{result['total_pss_mb']:>9.1f}")
+
+    write_json(args.output, {"environment": environment(), "results": results})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+# benchmarks/write_path.py
+"""
+Database cost of persisting analyses under concurrent requests.
+
+Seeds a scratch SQLite database with one user and chat, then has --threads
+request threads save --writes analyses each (chat messages, history row,
+rollups) three ways:
+
+- two_commits: the old path (messages commit, history commit, refresh);
+- single: _write_analysis in one transaction, no refresh;
+- write_behind: requests enqueue to a WriteBehindWriter, which group-commits.
+
+Reports per-request p50/p99 time spent on the database, end-to-end
+throughput (until every write is committed) and "database is locked"
+errors. Fails (exit code 1) if the single transaction is slower than the
+old path at p50, or if write-behind loses or fails any write.
+
+Usage (from backend/):
+    python -m benchmarks.write_path [--threads 8] [--writes 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import JSON_OPTIONS, Base
+from app.auth.models import Chat, SentimentHistory, User
+from app.routes.analysis_routes import _write_analysis
+from app.write_behind import WriteBehindWriter
+from benchmarks.common import environment, percentile, write_json
+
+USER_ID, CHAT_ID = 1, 1
+
+AI_RESULT = {
+    "type": "analysis_response",
+    "sentiment": {"sentiment": "NEGATIVE", "confidence": 0.91, "tier": "model"},
+    "summary": "The export to CSV keeps failing.",
+    "topics": ["export", "csv", "report"],
+    "feedback": "Hello bench! Here's your analysis results...",
+    "risk": True,
+    "risk_level": "Medium",
+    "risk_score": 2.0,
+    "risk_matches": ["failing"],
+}
+
+
+def write_two_commits(db, text: str):
+    """The pre-single-transaction shape: two commits and a refresh."""
+    history = _write_analysis(db, USER_ID, text, CHAT_ID, AI_RESULT)
+    db.expunge(history)  # held back for the second transaction
+    db.commit()
+    db.add(history)
+    db.commit()
+    db.refresh(history)
+    return history.id
+
+
+def write_single(db, text: str):
+    history = _write_analysis(db, USER_ID, text, CHAT_ID, AI_RESULT)
+    db.flush()
+    history_id = history.id
+    db.commit()
+    return history_id
+
+
+def run(mode: str, Session, threads: int, writes: int) -> dict:
+    timings, errors = [], []
+    lock = threading.Lock()
+    writer = WriteBehindWriter(Session) if mode == "write_behind" else None
+    futures = []
+
+    def request_thread(worker: int):
+        for i in range(writes):
+            text = f"The export to CSV keeps failing ({worker}-{i})"
+            started = time.perf_counter()
+            try:
+                if writer is not None:
+                    future = writer.submit(
+                        lambda db, text=text: _write_analysis(db, USER_ID, text, CHAT_ID, AI_RESULT)
+                    )
+                    with lock:
+                        futures.append(future)
+                else:
+                    with Session() as db:
+                        (write_two_commits if mode == "two_commits" else write_single)(db, text)
+            except OperationalError as exc:
+                with lock:
+                    errors.append(str(exc.orig))
+                continue
+            with lock:
+                timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=request_thread, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if writer is not None:
+        writer.stop(timeout=60)
+        failed = sum(1 for future in futures if not future.result())
+    else:
+        failed = 0
+    elapsed = time.perf_counter() - started
+
+    return {
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "writes_per_s": round(len(timings) / elapsed, 1),
+        "locked_errors": sum(1 for e in errors if "locked" in e),
+        "failed": failed + len(errors),
+        "commits": (
+            writer.stats()["batches_committed"] if writer is not None
+            else len(timings) * (2 if mode == "two_commits" else 1)
+        ),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=50, help="writes per thread")
+    parser.add_argument("--output", default="benchmarks/results/write_path.json")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'mode':<13} {'p50 ms':>8} {'p99 ms':>8} {'writes/s':>9} {'commits':>8} {'locked':>7}")
+    with tempfile.TemporaryDirectory() as scratch:
+        for mode in ("two_commits", "single", "write_behind"):
+            engine = create_engine(
+                f"sqlite:///{os.path.join(scratch, mode + '.db')}",
+                connect_args={"check_same_thread": False},
+                **JSON_OPTIONS
+            )
+            Base.metadata.create_all(engine)
+            Session = sessionmaker(bind=engine, autoflush=False)
+            with Session() as db:
+                db.add(User(id=USER_ID, username="bench", email="bench@example.com", hashed_password="x"))
+                db.add(Chat(id=CHAT_ID, user_id=USER_ID))
+                db.commit()
+
+            result = run(mode, Session, args.threads, args.writes)
+            with Session() as db:
+                result["rows"] = db.scalar(select(func.count()).select_from(SentimentHistory))
+            engine.dispose()
+
+            results[mode] = result
+            print(f"{mode:<13} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['writes_per_s']:>9.1f} "
+                  f"{result['commits']:>8} {result['locked_errors']:>7}")
+
+    write_json(args.output, {"environment": environment(), "threads": args.threads, "results": results})
+
+    expected = args.threads * args.writes
+    behind = results["write_behind"]
+    if behind["failed"] or behind["rows"] != expected:
+        print(f"FAIL: write-behind committed {behind['rows']} of {expected} writes")
+        return 1
+    if results["single"]["p50_ms"] > results["two_commits"]["p50_ms"]:
+        print("FAIL: the single-transaction write is slower than the two-commit path")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
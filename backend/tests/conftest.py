@@ -0,0 +1,13 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+# The app reads its configuration at import: point it at a scratch
+# database and a model-free sentiment backend before anything imports it
+_scratch = tempfile.mkdtemp(prefix="pulseai-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch, 'test.db')}")
+os.environ.setdefault("SENTIMENT_BACKEND", "lexicon")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,98 @@
+# tests/test_analysis_cache.py
+"""
+Analysis cache: a repeated text (after normalization) skips inference, and
+bumping ANALYSIS_VERSION, the model version or the risk lexicon version
+misses every old entry, also in the persistent tier after a restart.
+"""
+import pytest
+
+from app.ai import respond, sentiment
+from app.ai.batching import MicroBatcher
+from app.ai.cache import AnalysisCache
+from app.ai.model import SentimentModel
+
+
+class StubModel(SentimentModel):
+    """Says POSITIVE to everything and remembers what it was asked."""
+
+    backend = "stub"
+
+    def __init__(self):
+        super().__init__("stub")
+        self.seen = []
+
+    def _build(self):
+        pass
+
+    def _predict(self, texts):
+        self.seen.extend(texts)
+        return [{"label": "POSITIVE", "score": 0.9} for _ in texts]
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = StubModel()
+    batcher = MicroBatcher(model.predict, max_wait_ms=0)
+    monkeypatch.setattr(sentiment, "SENTIMENT_CASCADE", False)
+    monkeypatch.setattr(sentiment, "sentiment_model", model)
+    monkeypatch.setattr(sentiment, "sentiment_batcher", batcher)
+    monkeypatch.setattr(respond, "analysis_cache", AnalysisCache(respond.cache_version()))
+    yield model
+    batcher.stop()
+
+
+def restart(monkeypatch, sqlite_path):
+    """A fresh cache as the app would build it at startup."""
+    cache = AnalysisCache(respond.cache_version(), sqlite_path=str(sqlite_path))
+    monkeypatch.setattr(respond, "analysis_cache", cache)
+    return cache
+
+
+def test_repeated_text_skips_inference(model):
+    first = respond.analyze_text("The export keeps failing")
+    assert model.seen == ["The export keeps failing"]
+
+    assert respond.analyze_text("The export keeps failing") == first
+    assert respond.analyze_text("  The export\n keeps   failing ") == first
+    assert model.seen == ["The export keeps failing"]
+
+
+def test_batch_analyzes_repeated_texts_once(model):
+    texts = ["Refund please", "refund please", "Refund  please", "Refund please"]
+    results = respond.analyze_texts(texts)
+    assert sorted(model.seen) == ["Refund please", "refund please"]
+    assert results[0] == results[2] == results[3]
+
+    respond.analyze_texts(texts)
+    respond.analyze_text("refund please")
+    assert len(model.seen) == 2
+
+
+def test_cached_results_are_copies(model):
+    respond.analyze_text("Support was slow")["sentiment"]["sentiment"] = "NEGATIVE"
+    assert respond.analyze_text("Support was slow")["sentiment"]["sentiment"] == "POSITIVE"
+    assert len(model.seen) == 1
+
+
+@pytest.mark.parametrize("name,value", [
+    ("ANALYSIS_VERSION", respond.ANALYSIS_VERSION + 1),
+    ("model_version", lambda: "stub:retrained"),
+    ("RISK_LEXICON_VERSION", "bumped"),
+])
+def test_version_bump_misses_the_cache(model, monkeypatch, tmp_path, name, value):
+    sqlite_path = tmp_path / "cache.db"
+    restart(monkeypatch, sqlite_path)
+    respond.analyze_text("The export keeps failing")
+    assert len(model.seen) == 1
+
+    # Same versions: a restart finds the entry in the persistent tier
+    old = restart(monkeypatch, sqlite_path)
+    respond.analyze_text("The export keeps failing")
+    assert len(model.seen) == 1 and old.persistent_hits == 1
+    old.persistent.close()
+
+    monkeypatch.setattr(respond, name, value)
+    cache = restart(monkeypatch, sqlite_path)
+    assert cache.version != old.version
+    respond.analyze_text("The export keeps failing")
+    assert len(model.seen) == 2 and cache.persistent_hits == 0
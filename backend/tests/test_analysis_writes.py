@@ -0,0 +1,146 @@
+# tests/test_analysis_writes.py
+"""
+Analysis persistence. POST /analysis/: one transaction for the messages,
+history row, rollups and topic document frequencies, an id in every
+response unless the client explicitly asked for a deferred write.
+POST /analysis/batch: every chunk streamed has been saved, DF counts
+included, even if the client goes away mid-stream, and an overloaded
+queue mid-stream ends it with an error line.
+"""
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app.auth.models import SentimentHistory, TermDocumentFrequency, User
+from app.database import SessionLocal, engine
+from app.ai.executor import QueueFullError
+from app.main import app
+from app.routes import analysis_routes
+
+EMAIL, PASSWORD = "writes@example.com", "writes-password"
+TEXT = "The refund process is broken and support was slow"
+
+
+@pytest.fixture(scope="module")
+def api():
+    with TestClient(app) as client:
+        client.post("/auth/signup", json={"username": "writes", "email": EMAIL, "password": PASSWORD})
+        token = client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD}).json()["access_token"]
+        chat_id = client.post(
+            "/analysis/chats", json={"title": "Writes"}, headers={"Authorization": f"Bearer {token}"}
+        ).json()["id"]
+        yield client, {"Authorization": f"Bearer {token}"}, chat_id
+
+
+def counts() -> tuple[int, int]:
+    """(history rows, analyzed documents in the corpus) of the test user."""
+    with SessionLocal() as db:
+        user_id = db.scalars(select(User.id).where(User.email == EMAIL)).one()
+        history = db.scalar(select(func.count()).where(SentimentHistory.user_id == user_id))
+        documents = db.scalar(select(TermDocumentFrequency.documents).where(
+            TermDocumentFrequency.user_id == user_id, TermDocumentFrequency.term == ""
+        ))
+    return history, documents or 0
+
+
+def test_analysis_is_saved_in_one_commit(api):
+    client, headers, chat_id = api
+    before = counts()
+    commits = []
+    listener = lambda conn: commits.append(conn)
+    event.listen(engine, "commit", listener)
+    try:
+        response = client.post("/analysis/", json={"text": TEXT, "chat_id": chat_id}, headers=headers)
+    finally:
+        event.remove(engine, "commit", listener)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["type"] == "analysis_response"
+    assert isinstance(body["id"], int)
+    assert len(commits) == 1
+    assert counts() == (before[0] + 1, before[1] + 1)
+
+
+def test_write_behind_needs_an_explicit_opt_in(api, monkeypatch):
+    client, headers, _ = api
+    monkeypatch.setattr(analysis_routes, "ANALYSIS_WRITE_BEHIND", True)
+
+    body = client.post("/analysis/", json={"text": TEXT}, headers=headers).json()
+    assert isinstance(body["id"], int)
+    assert "write_deferred" not in body
+
+    before = counts()
+    body = client.post("/analysis/", json={"text": TEXT, "defer_write": True}, headers=headers).json()
+    assert body["id"] is None and body["write_deferred"] is True
+
+    # The background writer saves the history row and its DF counts together
+    deadline = time.monotonic() + 5
+    while counts() == before and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert counts() == (before[0] + 1, before[1] + 1)
+
+
+def test_defer_write_is_ignored_when_write_behind_is_off(api):
+    client, headers, _ = api
+    body = client.post("/analysis/", json={"text": TEXT, "defer_write": True}, headers=headers).json()
+    assert isinstance(body["id"], int)
+
+
+def test_batch_saves_each_chunk_before_streaming_it(api, monkeypatch):
+    client, headers, _ = api
+    monkeypatch.setattr(analysis_routes, "ANALYSIS_BATCH_CHUNK", 2)
+    with SessionLocal() as db:
+        user_id = db.scalars(select(User.id).where(User.email == EMAIL)).one()
+    texts = [f"The export failed again on report {i}" for i in range(5)]
+
+    # A client that reads the first chunk, then disconnects
+    before = counts()
+    stream = analysis_routes._stream_batch(user_id, "writes", texts)
+    lines = [json.loads(next(stream)) for _ in range(2)]
+    stream.close()
+    assert [line["index"] for line in lines] == [0, 1]
+    assert counts() == (before[0] + 2, before[1] + 2)
+
+    before = counts()
+    response = client.post("/analysis/batch", json={"texts": texts}, headers=headers)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1] == {"type": "batch_complete", "count": 5, "saved": 5}
+    assert counts() == (before[0] + 5, before[1] + 5)
+
+
+def test_batch_reports_overload_after_the_stream_started(api, monkeypatch):
+    client, headers, _ = api
+    monkeypatch.setattr(analysis_routes, "ANALYSIS_BATCH_CHUNK", 2)
+    executor = analysis_routes.inference_executor
+    submit, calls = executor.submit, []
+
+    def overloaded_after_first_chunk(*args, **kwargs):
+        calls.append(args)
+        if len(calls) > 1:
+            raise QueueFullError(7)
+        return submit(*args, **kwargs)
+
+    monkeypatch.setattr(executor, "submit", overloaded_after_first_chunk)
+    before = counts()
+    response = client.post("/analysis/batch", json={"texts": [TEXT] * 5}, headers=headers)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == 200
+    assert [line.get("index") for line in lines[:2]] == [0, 1]
+    assert lines[-1] == {
+        "type": "batch_error", "error": "Inference queue is full, retry after 7s",
+        "retry_after": 7, "index": 2, "saved": 2,
+    }
+    assert len(lines) == 3
+    assert counts() == (before[0] + 2, before[1] + 2)
+
+
+def test_overlong_texts_are_rejected(api):
+    client, headers, _ = api
+    text = "x" * (analysis_routes.ANALYSIS_MAX_TEXT_CHARS + 1)
+    assert client.post("/analysis/", json={"text": text}, headers=headers).status_code == 413
+    assert client.post("/analysis/batch", json={"texts": ["ok", text]}, headers=headers).status_code == 413
@@ -0,0 +1,103 @@
+# tests/test_batching.py
+"""
+MicroBatcher: results go back to the right callers, concurrent calls share
+batches, and a failing infer_fn fails exactly the callers in that batch
+without stopping the workers.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.ai.batching import MicroBatcher
+
+
+@pytest.fixture
+def make_batcher():
+    batchers = []
+
+    def make(infer_fn, **options):
+        batcher = MicroBatcher(infer_fn, **options)
+        batchers.append(batcher)
+        return batcher
+
+    yield make
+    for batcher in batchers:
+        batcher.stop()
+
+
+def test_results_go_back_to_their_callers(make_batcher):
+    batcher = make_batcher(lambda items: [item.upper() for item in items], max_wait_ms=20)
+    items = [f"item {i}" * (i % 5 + 1) for i in range(40)]
+    with ThreadPoolExecutor(8) as pool:
+        assert list(pool.map(batcher, items)) == [item.upper() for item in items]
+    assert batcher.items_processed == len(items)
+    # Concurrent callers shared forward passes
+    assert batcher.batches_run < len(items)
+
+
+def test_batches_respect_max_batch_size(make_batcher):
+    sizes = []
+    batcher = make_batcher(lambda items: sizes.append(len(items)) or items, max_batch_size=4, max_wait_ms=50)
+    futures = batcher.submit_many("abcdefghij")
+    assert [future.result(timeout=5) for future in futures] == list("abcdefghij")
+    assert max(sizes) <= 4 and sum(sizes) == 10
+
+
+def test_errors_reach_every_caller_in_the_batch(make_batcher):
+    def infer(items):
+        if "boom" in items:
+            raise ValueError("bad batch")
+        return items
+
+    batcher = make_batcher(infer, max_wait_ms=50)
+    # Same length, so one bucket
+    futures = batcher.submit_many(["boom", "fine"])
+    for future in futures:
+        with pytest.raises(ValueError, match="bad batch"):
+            future.result(timeout=5)
+
+    # The worker survives and serves the next batch
+    assert batcher("next", timeout=5) == "next"
+
+
+def test_wrong_result_count_is_an_error(make_batcher):
+    batcher = make_batcher(lambda items: items[:-1], max_wait_ms=50)
+    futures = batcher.submit_many(["a", "b"])
+    for future in futures:
+        with pytest.raises(RuntimeError, match="returned 1 results for 2 items"):
+            future.result(timeout=5)
+
+
+def test_cancelled_items_are_skipped(make_batcher):
+    release = threading.Event()
+    seen = []
+
+    def infer(items):
+        release.wait(5)
+        seen.extend(items)
+        return items
+
+    batcher = make_batcher(infer, max_batch_size=1, max_wait_ms=0)
+    first = batcher.submit("first")
+    queued = batcher.submit("queued")
+    assert queued.cancel()
+    release.set()
+
+    assert first.result(timeout=5) == "first"
+    assert batcher("after", timeout=5) == "after"
+    assert seen == ["first", "after"]
+
+
+def test_submit_after_stop_starts_new_workers(make_batcher):
+    batcher = make_batcher(lambda items: items, concurrency=2)
+    assert batcher("a", timeout=5) == "a"
+    batcher.stop()
+    assert batcher("b", timeout=5) == "b"
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, max_batch_size=0)
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, concurrency=0)
@@ -0,0 +1,64 @@
+# tests/test_database.py
+"""
+create_db_engine's SQLite settings: every connection gets the WAL journal,
+busy timeout and the other pragmas, read_only engines refuse writes, and
+the shared engine / read_engine are configured that way.
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.database import (
+    SQLITE_BUSY_TIMEOUT_MS,
+    ReadSessionLocal,
+    create_db_engine,
+    engine,
+    read_engine,
+)
+
+
+def pragma(connection, name: str):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+@pytest.fixture
+def url(tmp_path):
+    return f"sqlite:///{tmp_path / 'pragmas.db'}"
+
+
+def test_connections_use_wal(url):
+    scratch = create_db_engine(url)
+    with scratch.connect() as connection:
+        assert pragma(connection, "journal_mode") == "wal"
+        assert pragma(connection, "synchronous") == 1  # NORMAL
+        assert pragma(connection, "busy_timeout") == SQLITE_BUSY_TIMEOUT_MS
+        assert pragma(connection, "query_only") == 0
+    scratch.dispose()
+
+
+def test_read_only_engine_rejects_writes(url):
+    writer = create_db_engine(url)
+    with writer.begin() as connection:
+        connection.execute(text("CREATE TABLE notes (body TEXT)"))
+        connection.execute(text("INSERT INTO notes VALUES ('kept')"))
+
+    reader = create_db_engine(url, read_only=True)
+    with reader.connect() as connection:
+        assert pragma(connection, "query_only") == 1
+        assert connection.execute(text("SELECT body FROM notes")).scalar() == "kept"
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(text("INSERT INTO notes VALUES ('lost')"))
+    reader.dispose()
+    writer.dispose()
+
+
+def test_app_engines():
+    with engine.connect() as connection:
+        assert pragma(connection, "journal_mode") == "wal"
+        assert pragma(connection, "query_only") == 0
+    with read_engine.connect() as connection:
+        assert pragma(connection, "journal_mode") == "wal"
+        assert pragma(connection, "query_only") == 1
+
+    with ReadSessionLocal() as db, pytest.raises(OperationalError, match="readonly"):
+        db.execute(text("CREATE TABLE read_session_write (id INTEGER)"))
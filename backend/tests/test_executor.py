@@ -0,0 +1,97 @@
+# tests/test_executor.py
+"""
+InferenceExecutor admission control: slots are returned however a task
+ends (completed, failed, timed out while queued, cancelled on shutdown),
+so capacity recovers instead of leaking into permanent 503s.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.ai.executor import DeadlineExceededError, InferenceExecutor, QueueFullError
+
+
+def free_slots(executor: InferenceExecutor) -> int:
+    return executor._slots._value
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=5)
+    yield executor
+    executor.shutdown()
+
+
+def test_completed_and_failed_tasks_release_their_slot(executor):
+    assert executor.submit(lambda: 1).result() == 1
+    with pytest.raises(ZeroDivisionError):
+        executor.submit(lambda: 1 / 0).result()
+
+    assert free_slots(executor) == 2
+    assert executor.stats()["completed"] == 1
+
+
+def test_full_queue_is_rejected(executor):
+    gate = threading.Event()
+    executor.submit(gate.wait)
+    executor.submit(gate.wait)
+    try:
+        assert not executor.has_capacity()
+        with pytest.raises(QueueFullError) as error:
+            executor.submit(lambda: None)
+        assert error.value.retry_after >= 1
+        assert executor.stats()["rejected"] == 1
+    finally:
+        gate.set()
+
+
+def test_capacity_recovers_after_a_queued_task_times_out(executor):
+    gate = threading.Event()
+    running = executor.submit(gate.wait)
+
+    async def queued():
+        # Waits behind the blocked task and times out while still queued
+        with pytest.raises(DeadlineExceededError):
+            await executor.run(lambda: "late", timeout=0.05)
+
+    asyncio.run(queued())
+    assert executor.stats()["timed_out"] == 1
+    assert free_slots(executor) == 1 and executor.has_capacity()
+
+    gate.set()
+    running.result(timeout=5)
+    assert free_slots(executor) == 2
+
+    # Both slots are usable again
+    gate.clear()
+    blocked = [executor.submit(gate.wait), executor.submit(gate.wait)]
+    assert not executor.has_capacity()
+    gate.set()
+    for future in blocked:
+        future.result(timeout=5)
+    assert free_slots(executor) == 2 and executor._admitted == 0
+
+
+def test_shutdown_releases_cancelled_tasks(executor):
+    gate = threading.Event()
+    running = executor.submit(gate.wait)
+    queued = executor.submit(lambda: None)
+
+    threading.Timer(0.05, gate.set).start()
+    executor.shutdown(wait=True)
+
+    assert running.result() is True
+    assert queued.cancelled()
+    assert free_slots(executor) == 2 and executor._admitted == 0
+    assert executor.submit(lambda: "fresh pool").result(timeout=5) == "fresh pool"
+
+
+def test_default_workers_fill_a_batch():
+    # Callers wait inside the batcher, so fewer threads than a full batch
+    # per batcher thread would cap every batch below max_batch_size
+    from app.ai import sentiment
+    from app.ai.executor import inference_executor
+
+    batcher = sentiment.sentiment_batcher
+    assert inference_executor.max_workers >= batcher.max_batch_size * batcher.concurrency
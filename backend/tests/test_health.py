@@ -0,0 +1,58 @@
+# tests/test_health.py
+"""
+Health probes: live answers straight away, ready is 503 until the model is
+loaded and warmed up (or while it failed to load), then 200.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.ai import sentiment
+from app.ai.lexicon_model import LexiconSentimentModel
+from app.ai.model import SentimentModel
+from app.main import app
+
+
+class BrokenModel(SentimentModel):
+    backend = "broken"
+
+    def _build(self):
+        raise OSError("weights not found")
+
+
+@pytest.fixture
+def client():
+    # No lifespan: the test decides when the model loads
+    return TestClient(app)
+
+
+def test_ready_once_the_model_is_loaded(client, monkeypatch):
+    monkeypatch.setattr(sentiment, "sentiment_model", LexiconSentimentModel())
+
+    assert client.get("/health/live").json() == {"status": "ok"}
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "loading"
+    assert response.json()["model"]["loaded"] is False
+
+    sentiment.start()
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["model"]["warmed_up"] is True
+
+
+def test_not_ready_when_the_model_fails_to_load(client, monkeypatch):
+    monkeypatch.setattr(sentiment, "sentiment_model", BrokenModel("broken"))
+
+    with pytest.raises(OSError):
+        sentiment.start()
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "error"
+    assert response.json()["model"]["error"] == "OSError: weights not found"
+    assert client.get("/health/live").status_code == 200
+
+
+def test_stats(client):
+    body = client.get("/health/stats").json()
+    assert {"inference_executor", "password_hasher", "sentiment_batcher", "analysis_cache"} <= set(body)
@@ -0,0 +1,60 @@
+# tests/test_intents.py
+"""
+IntentIndex: typo'd general questions still match, match and match_batch
+agree, and both find what scoring every phrase would.
+"""
+import random
+
+import pytest
+from rapidfuzz import fuzz, process
+
+from app.ai.intents import IntentIndex, _sorted_form
+from app.ai.respond import FUZZY_THRESHOLD, intent_index
+
+TYPOS = [
+    ("wo bilt pulsai", "who_built"),
+    ("who bilt pulseai", "who_built"),
+    ("waht is pulseia", "what_is"),
+    ("who devloped pulse ai", "who_developed"),
+    ("tell me abut pulsai", "tell_me_about"),
+]
+
+
+def brute_force_score(index: IntentIndex, text: str):
+    best = process.extractOne(_sorted_form(text), index._forms, scorer=fuzz.ratio, score_cutoff=index.threshold)
+    return None if best is None else round(best[1], 3)
+
+
+def score(match):
+    # match_batch scores are float32
+    return None if match is None else round(match["score"], 3)
+
+
+@pytest.mark.parametrize("text,intent_id", TYPOS)
+def test_typos_match(text, intent_id):
+    match = intent_index.match(text)
+    assert match is not None and match["intent"]["id"] == intent_id
+    assert match["score"] >= FUZZY_THRESHOLD
+
+
+def test_feedback_does_not_match():
+    assert intent_index.match("The export to CSV keeps failing on large reports") is None
+    assert intent_index.match("") is None
+
+
+def test_match_agrees_with_match_batch_and_brute_force():
+    rng = random.Random(7)
+    phrases = [phrase for intent in intent_index.intents for phrase in intent["phrases"]]
+    queries = [text for text, _ in TYPOS] + ["hello there", "what is the weather", "pulseai"]
+    for _ in range(300):
+        chars = list(rng.choice(phrases))
+        for _ in range(rng.randint(1, 4)):
+            position = rng.randrange(len(chars))
+            chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+        queries.append("".join(chars))
+
+    batched = intent_index.match_batch(queries)
+    for query, batch_match in zip(queries, batched):
+        expected = brute_force_score(intent_index, query)
+        assert score(intent_index.match(query)) == expected, query
+        assert score(batch_match) == expected, query
@@ -0,0 +1,128 @@
+# tests/test_long_text.py
+"""
+Long documents: token spans read block by block match a single pass, the
+windows overlap by exactly `overlap` tokens and count every token once,
+and analyze_sentiment_long weights each window by its new tokens.
+"""
+import random
+import re
+
+import pytest
+
+from app.ai import sentiment
+from app.ai.batching import MicroBatcher
+from app.ai.long_text import iter_token_spans, iter_token_windows
+from app.ai.model import SentimentModel
+
+
+def word_spans(text):
+    return [match.span() for match in re.finditer(r"\S+", text)]
+
+
+class StubModel(SentimentModel):
+    """POSITIVE (0.9) for windows mentioning "good", else NEGATIVE (0.9)."""
+
+    backend = "stub"
+
+    def __init__(self, max_length):
+        super().__init__("stub")
+        self.max_length = max_length
+        self.seen = []
+
+    def _build(self):
+        pass
+
+    def _predict(self, texts):
+        self.seen.extend(texts)
+        return [{"label": "POSITIVE" if "good" in text else "NEGATIVE", "score": 0.9} for text in texts]
+
+    def token_spans(self, text):
+        return word_spans(text)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    # Windows of 8 tokens: max_length leaves room for [CLS] and [SEP]
+    model = StubModel(max_length=10)
+    batcher = MicroBatcher(model.predict, max_wait_ms=0)
+    monkeypatch.setattr(sentiment, "SENTIMENT_BACKEND", "torch")
+    monkeypatch.setattr(sentiment, "SENTIMENT_CASCADE", False)
+    monkeypatch.setattr(sentiment, "sentiment_model", model)
+    monkeypatch.setattr(sentiment, "sentiment_batcher", batcher)
+    yield model
+    batcher.stop()
+
+
+def test_spans_read_in_blocks_match_one_pass():
+    rng = random.Random(5)
+    text = " ".join("x" * rng.randint(1, 12) for _ in range(500))
+    assert list(iter_token_spans(text, word_spans, block_chars=16)) == word_spans(text)
+
+
+@pytest.mark.parametrize("tokens", [0, 1, 7, 8, 9, 20, 33])
+@pytest.mark.parametrize("window,overlap", [(8, 0), (8, 3), (8, 7), (1, 0)])
+def test_windows_overlap_and_cover(tokens, window, overlap):
+    spans = [(i * 2, i * 2 + 1) for i in range(tokens)]
+    windows = list(iter_token_windows(iter(spans), window=window, overlap=overlap))
+    if not tokens:
+        assert windows == []
+        return
+
+    covered = [[i for i, (start, end) in enumerate(spans) if start >= w[0] and end <= w[1]] for w in windows]
+    assert all(len(indexes) <= window for indexes in covered)
+    # Every token once: the new tokens add up and the windows reach both ends
+    assert sum(w[2] for w in windows) == tokens
+    assert covered[0][0] == 0 and covered[-1][-1] == tokens - 1
+    for previous, current, (_, _, new) in zip(covered, covered[1:], windows[1:]):
+        shared = len(set(previous) & set(current))
+        assert shared == overlap or (shared > overlap and current[-1] == tokens - 1)
+        assert new == len(current) - shared
+
+
+def test_window_arguments_are_checked():
+    with pytest.raises(ValueError):
+        list(iter_token_windows(iter([]), window=0, overlap=0))
+    with pytest.raises(ValueError):
+        list(iter_token_windows(iter([]), window=4, overlap=4))
+
+
+def test_long_text_is_weighted_by_new_tokens(model, monkeypatch):
+    monkeypatch.setattr(sentiment, "SENTIMENT_WINDOW_OVERLAP", 0)
+    text = "good " * 16 + "bad " * 8
+    result = sentiment.analyze_sentiment(text)
+
+    # (8 * 0.9 + 8 * 0.9 + 8 * 0.1) / 24 positive
+    assert result["sentiment"] == "POSITIVE"
+    assert result["confidence"] == pytest.approx(15.2 / 24)
+    assert [(s["tokens"], s["sentiment"]) for s in result["segments"]] == [
+        (8, "POSITIVE"), (8, "POSITIVE"), (8, "NEGATIVE"),
+    ]
+    assert result["segments"][0]["start"] == 0 and result["segments"][-1]["end"] == len(text.rstrip())
+
+
+def test_overlapping_windows_count_each_token_once(model, monkeypatch):
+    monkeypatch.setattr(sentiment, "SENTIMENT_WINDOW_OVERLAP", 4)
+    text = "bad " * 12 + "good " * 4
+    result = sentiment.analyze_sentiment_long(text)
+
+    segments = result["segments"]
+    assert sum(s["tokens"] for s in segments) == 16
+    assert [text[s["start"]:s["end"]].split() for s in segments][1][:4] == text.split()[4:8]
+    positive = sum(s["tokens"] * (0.9 if s["sentiment"] == "POSITIVE" else 0.1) for s in segments) / 16
+    assert result["sentiment"] == ("POSITIVE" if positive >= 0.5 else "NEGATIVE")
+    assert result["confidence"] == pytest.approx(max(positive, 1 - positive))
+
+
+def test_group_size_does_not_change_the_result(model, monkeypatch):
+    text = " ".join(random.Random(2).choice(["good", "bad", "slow", "fine"]) for _ in range(100))
+    monkeypatch.setattr(sentiment, "SENTIMENT_LONG_BATCH", 1)
+    one_at_a_time = sentiment.analyze_sentiment_long(text)
+    monkeypatch.setattr(sentiment, "SENTIMENT_LONG_BATCH", 8)
+    assert sentiment.analyze_sentiment_long(text) == one_at_a_time
+
+
+def test_short_and_empty_texts_have_no_segments(model):
+    assert sentiment.analyze_sentiment_long("good service") == {
+        "sentiment": "POSITIVE", "confidence": 0.9, "tier": "model",
+    }
+    assert "segments" not in sentiment.analyze_sentiment_long("   ")
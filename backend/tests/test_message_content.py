@@ -0,0 +1,91 @@
+# tests/test_message_content.py
+"""
+pack_analysis / unpack_analysis round-trips: whatever a client or
+get_response stored comes back unchanged, through the typed columns where
+they fit and Message.details where they don't, also after a trip through
+the database.
+"""
+import pytest
+from sqlalchemy import insert, select
+
+from app.auth.models import Base, Chat, Message, User
+from app.database import SessionLocal, engine
+from app.message_content import pack_analysis, unpack_analysis
+
+FULL = {
+    "text": "The export keeps failing",
+    "summary": "Export fails.",
+    "sentiment": {"sentiment": "NEGATIVE", "confidence": 0.93},
+    "topics": ["export", "csv"],
+    "feedback": "The export keeps failing",
+    "risk": True,
+    "risk_level": "Medium",
+    "risk_score": 2.0,
+    "risk_matches": ["failing"],
+}
+
+CONTENTS = [
+    FULL,
+    {**FULL, "sentiment": {**FULL["sentiment"], "tier": "lexicon", "segments": [{"start": 0, "end": 3}]}},
+    {**FULL, "feedback": "Different from the text"},
+    {**FULL, "topics": ["export", 3], "risk_matches": "failing"},
+    {**FULL, "risk_score": True, "summary": None, "extra": {"nested": [1, 2]}},
+    {**FULL, "sentiment": "NEGATIVE"},
+    {**FULL, "sentiment": {"confidence": 0.5}},
+    {**FULL, "risk": False},
+    {"text": "Only some fields", "risk": True, "risk_level": "Medium"},
+    {},
+]
+
+
+def columns(content: dict) -> tuple[int, str]:
+    """risk / risk_level columns as the routes set them."""
+    level = content.get("risk_level") or "Low"
+    return int(level != "Low"), level
+
+
+def round_trip(content: dict) -> dict:
+    risk, level = columns(content)
+    return unpack_analysis({**pack_analysis(content, risk, level), "risk": risk, "risk_level": level})
+
+
+def test_complete_analysis_needs_no_details():
+    packed = pack_analysis(FULL, 1, "Medium")
+    assert packed["details"] == {}
+    assert packed["sentiment"] == "NEGATIVE" and packed["topics"] == ["export", "csv"]
+
+
+@pytest.mark.parametrize("content", CONTENTS)
+def test_round_trip(content):
+    unpacked = round_trip(content)
+    for key, value in content.items():
+        assert unpacked[key] == value, key
+
+
+def test_untyped_values_stay_out_of_the_columns():
+    packed = pack_analysis({**FULL, "topics": ["export", 3], "risk_score": True}, 1, "Medium")
+    assert packed["topics"] is None and packed["risk_score"] is None
+    assert packed["details"] == {"topics": ["export", 3], "risk_score": True}
+
+
+def test_round_trip_through_the_database():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user_id = db.scalars(insert(User).returning(User.id), [
+            {"username": "content", "email": "content@example.com", "hashed_password": "x"}
+        ]).one()
+        chat_id = db.scalars(insert(Chat).returning(Chat.id), [{"user_id": user_id, "title": "Content"}]).one()
+        ids = []
+        for content in CONTENTS:
+            risk, level = columns(content)
+            ids.append(db.scalars(insert(Message).returning(Message.id), [{
+                "user_id": user_id, "chat_id": chat_id, "role": "ai",
+                "risk": risk, "risk_level": level, **pack_analysis(content, risk, level),
+            }]).one())
+        db.commit()
+
+        rows = db.execute(select(Message.__table__).where(Message.id.in_(ids)).order_by(Message.id)).mappings().all()
+        for content, row in zip(CONTENTS, rows):
+            unpacked = unpack_analysis(row)
+            for key, value in content.items():
+                assert unpacked[key] == value, key
@@ -0,0 +1,95 @@
+# tests/test_pagination.py
+"""
+Keyset cursors: pages walked with next_cursor visit every row exactly once
+and in order, in both directions, including rows that share a created_at;
+bad cursors and page sizes are rejected with 400.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, create_engine, insert, select
+from sqlalchemy.orm import declarative_base
+
+from app.pagination import PAGE_SIZE, PAGE_SIZE_MAX, decode_cursor, encode_cursor, keyset, next_cursor, page_size, sort_key
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+START = datetime(2026, 1, 1, 12, 0, 0, 500)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Runs of equal timestamps, inserted out of order
+        conn.execute(insert(Row), [
+            {"id": i, "created_at": START + timedelta(seconds=(i * 7) % 10)} for i in range(1, 38)
+        ])
+    yield engine
+    engine.dispose()
+
+
+def walk(engine, limit: int, descending: bool) -> list[int]:
+    ids, cursor, pages = [], None, 0
+    with engine.connect() as conn:
+        while True:
+            stmt = keyset(select(Row.id, sort_key(Row)), Row, cursor, descending=descending).limit(limit + 1)
+            rows = conn.execute(stmt).mappings().all()
+            ids += [row["id"] for row in rows[:limit]]
+            pages += 1
+            cursor = next_cursor(rows, limit)
+            if cursor is None:
+                return ids
+            assert pages < 100
+
+
+@pytest.mark.parametrize("limit", [1, 4, 10, 37, 50])
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_visit_every_row_once_in_order(engine, limit, descending):
+    with engine.connect() as conn:
+        expected = conn.scalars(select(Row.id).order_by(
+            *((Row.created_at.desc(), Row.id.desc()) if descending else (Row.created_at, Row.id))
+        )).all()
+    assert walk(engine, limit, descending) == expected
+
+
+def test_next_cursor_only_when_there_is_more():
+    rows = [{"id": i, "sort_key": f"2026-01-0{i}"} for i in range(1, 4)]
+    assert next_cursor(rows, 3) is None
+    assert decode_cursor(next_cursor(rows, 2)) == ("2026-01-02", 2)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2026-01-01 12:00:00.000500", 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2026-01-01 12:00:00.000500", 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor("2026-01-01", 1)[:-3],
+    "WzEsIDJd",  # [1, 2]
+    "eyJhIjogMX0",  # {"a": 1}
+])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_page_size():
+    assert page_size() == PAGE_SIZE
+    assert page_size(PAGE_SIZE_MAX) == PAGE_SIZE_MAX
+    for limit in (0, -1, PAGE_SIZE_MAX + 1):
+        with pytest.raises(HTTPException) as exc:
+            page_size(limit)
+        assert exc.value.status_code == 400
@@ -0,0 +1,71 @@
+# tests/test_passwords.py
+"""
+PasswordHasher.verify_and_update: right and wrong passwords, and hashes
+made with another bcrypt cost are replaced on login. conftest sets
+BCRYPT_ROUNDS=4, which the spawned workers inherit.
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from sqlalchemy import select
+
+from app.auth.models import User
+from app.auth.passwords import BCRYPT_ROUNDS, PasswordHasher
+from app.database import SessionLocal
+from app.main import app
+
+EMAIL, PASSWORD = "passwords@example.com", "passwords-password"
+LEGACY_ROUNDS = BCRYPT_ROUNDS + 1
+
+
+def cost(hashed: str) -> int:
+    return int(hashed.split("$")[2])
+
+
+@pytest.fixture(scope="module")
+def hasher():
+    hasher = PasswordHasher(workers=1, max_queue=4, timeout=30)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_verify_current_cost(hasher):
+    hashed = asyncio.run(hasher.hash(PASSWORD))
+    assert cost(hashed) == BCRYPT_ROUNDS
+    assert asyncio.run(hasher.verify_and_update(PASSWORD, hashed)) == (True, None)
+    assert asyncio.run(hasher.verify_and_update("wrong", hashed)) == (False, None)
+
+
+def test_legacy_cost_is_rehashed(hasher):
+    legacy = bcrypt.using(rounds=LEGACY_ROUNDS).hash(PASSWORD)
+
+    verified, new_hash = asyncio.run(hasher.verify_and_update(PASSWORD, legacy))
+    assert verified and cost(new_hash) == BCRYPT_ROUNDS
+    assert asyncio.run(hasher.verify_and_update(PASSWORD, new_hash)) == (True, None)
+    # A wrong password never produces a replacement hash
+    assert asyncio.run(hasher.verify_and_update("wrong", legacy)) == (False, None)
+
+
+def test_login_replaces_a_legacy_hash():
+    with TestClient(app) as client:
+        client.post("/auth/signup", json={"username": "passwords", "email": EMAIL, "password": PASSWORD})
+        with SessionLocal() as db:
+            user = db.scalars(select(User).where(User.email == EMAIL)).one()
+            user.hashed_password = bcrypt.using(rounds=LEGACY_ROUNDS).hash(PASSWORD)
+            db.commit()
+
+        assert client.post("/auth/login", json={"email": EMAIL, "password": "wrong-password"}).status_code == 401
+        with SessionLocal() as db:
+            assert cost(db.scalars(select(User.hashed_password).where(User.email == EMAIL)).one()) == LEGACY_ROUNDS
+
+        assert client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD}).status_code == 200
+        with SessionLocal() as db:
+            stored = db.scalars(select(User.hashed_password).where(User.email == EMAIL)).one()
+        assert cost(stored) == BCRYPT_ROUNDS
+
+        # The new hash is used from then on
+        assert client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD}).status_code == 200
+        with SessionLocal() as db:
+            assert db.scalars(select(User.hashed_password).where(User.email == EMAIL)).one() == stored
@@ -0,0 +1,74 @@
+# tests/test_principal_cache.py
+"""
+principal_cache eviction: updating or deleting a User through the ORM drops
+its cached principal (mapper events), so the next request with an old token
+sees the change instead of the cached identity.
+"""
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.auth import create_access_token, principal_cache
+from app.auth.models import Base, User
+from app.database import SessionLocal, engine
+from app.main import app
+
+_users = itertools.count()
+
+
+@pytest.fixture
+def client():
+    Base.metadata.create_all(bind=engine)
+    return TestClient(app)
+
+
+@pytest.fixture
+def user():
+    n = next(_users)
+    with SessionLocal() as db:
+        user = User(username=f"cached{n}", email=f"cached{n}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        return user.id, user.email
+
+
+def authenticate(client, email: str) -> dict:
+    """A token for email, used once so its principal is cached."""
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert principal_cache.get(email) is not None
+    return headers
+
+
+def test_update_evicts_the_principal(client, user):
+    user_id, email = user
+    headers = authenticate(client, email)
+
+    with SessionLocal() as db:
+        db.get(User, user_id).username = "renamed"
+        db.commit()
+    assert principal_cache.get(email) is None
+    assert client.get("/auth/me", headers=headers).json()["username"] == "renamed"
+
+
+def test_email_change_rejects_the_old_token(client, user):
+    user_id, email = user
+    headers = authenticate(client, email)
+
+    with SessionLocal() as db:
+        db.get(User, user_id).email = f"moved-{email}"
+        db.commit()
+    assert principal_cache.get(email) is None
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_delete_rejects_the_token(client, user):
+    user_id, email = user
+    headers = authenticate(client, email)
+
+    with SessionLocal() as db:
+        db.delete(db.get(User, user_id))
+        db.commit()
+    assert principal_cache.get(email) is None
+    assert client.get("/auth/me", headers=headers).status_code == 401
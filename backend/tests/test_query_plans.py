@@ -0,0 +1,228 @@
+# tests/test_query_plans.py
+"""
+Query-plan regression tests.
+
+Seeds a scratch SQLite database with several users' chats, messages,
+topics, topic document frequencies and history, then calls each route,
+captures the SQL it runs and asserts from EXPLAIN QUERY PLAN that no
+statement scans a whole table (or a whole index), and that ordered reads
+(keyset pages) come in index order rather than being sorted. A query change that loses its index fails here.
+
+Run from backend/:
+    python -m pytest tests/test_query_plans.py
+"""
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, insert, select, text
+
+from app.ai import sentiment
+from app.auth.auth import principal_cache
+from app.auth.models import Chat, Message, MessageTopic, SentimentHistory, TermDocumentFrequency, User
+from app.database import SessionLocal, engine, read_engine
+from app.main import app
+from app.message_content import pack_analysis
+from app.pagination import NEXT_CURSOR_HEADER
+from app.rollups import rebuild_message_topics, rebuild_sentiment_daily, rebuild_user_stats
+
+OTHER_USERS = 4
+CHATS_PER_USER = 20
+MESSAGES_PER_CHAT = 100
+HISTORY_PER_USER = 2_000
+TERMS_PER_USER = 2_000
+START = datetime(2026, 1, 1)
+
+EMAIL, PASSWORD = "plans@example.com", "plans-password"
+
+# "SCAN t", "SCAN t USING INDEX i" and "SCAN t USING COVERING INDEX i" all
+# read every row of t; "SEARCH t USING ..." is an index lookup
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)")
+SORTED = "USE TEMP B-TREE FOR ORDER BY"
+
+
+def _analysis(i: int) -> dict:
+    return {
+        "text": f"Feedback for message {i}",
+        "summary": f"Export {i} failed.",
+        "sentiment": {"sentiment": "NEGATIVE", "confidence": 0.9},
+        "topics": ["export", "billing", f"report-{i % 7}"],
+        "feedback": f"Feedback for message {i}",
+        "risk": i % 5 == 0,
+        "risk_level": "Medium" if i % 5 == 0 else "Low",
+        "risk_score": 2.0 if i % 5 == 0 else 0.0,
+        "risk_matches": ["failed"] if i % 5 == 0 else [],
+    }
+
+
+def _seed(user_ids: list[int]):
+    with SessionLocal() as db:
+        for user_id in user_ids:
+            chats = db.scalars(
+                insert(Chat).returning(Chat.id),
+                [{"user_id": user_id, "title": f"Chat {c}", "created_at": START + timedelta(hours=c)}
+                 for c in range(CHATS_PER_USER)]
+            ).all()
+            messages = []
+            for chat_id in chats:
+                for i in range(MESSAGES_PER_CHAT):
+                    row = {"user_id": user_id, "chat_id": chat_id,
+                           "created_at": START + timedelta(minutes=chat_id * MESSAGES_PER_CHAT + i)}
+                    if i % 2:
+                        level = "Medium" if i % 5 == 0 else "Low"
+                        risk = 1 if level != "Low" else 0
+                        row.update(role="ai", risk=risk, risk_level=level, **pack_analysis(_analysis(i), risk, level))
+                    else:
+                        row.update(role="user", content=f"Message {i}", risk=0, risk_level="Low")
+                    messages.append(row)
+            db.execute(insert(Message), messages)
+            db.execute(insert(SentimentHistory), [
+                {"user_id": user_id, "text": f"Analysis {i}", "sentiment": "POSITIVE" if i % 3 else "NEGATIVE",
+                 "confidence": 0.9, "created_at": START + timedelta(hours=i)}
+                for i in range(HISTORY_PER_USER)
+            ])
+            db.execute(insert(TermDocumentFrequency), [
+                {"user_id": user_id, "term": f"term {i}", "documents": 1 + i % 50}
+                for i in range(TERMS_PER_USER)
+            ])
+        db.commit()
+
+        rebuild_user_stats(db)
+        rebuild_sentiment_daily(db)
+        rebuild_message_topics(db)
+        db.commit()
+        db.execute(text("ANALYZE"))
+        db.commit()
+
+
+@pytest.fixture(scope="module")
+def api():
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 30
+        while not sentiment.is_ready() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        client.post("/auth/signup", json={"username": "plans", "email": EMAIL, "password": PASSWORD})
+        token = client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        with SessionLocal() as db:
+            db.execute(insert(User), [
+                {"username": f"other{i}", "email": f"other{i}@example.com", "hashed_password": "x"}
+                for i in range(OTHER_USERS)
+            ])
+            db.commit()
+            user_ids = db.scalars(select(User.id).order_by(User.id)).all()
+        _seed(user_ids)
+
+        with SessionLocal() as db:
+            own = db.scalars(select(User.id).where(User.email == EMAIL)).one()
+            chat_ids = db.scalars(select(Chat.id).where(Chat.user_id == own).order_by(Chat.id)).all()
+
+        yield {"client": client, "headers": headers, "chat_id": chat_ids[0], "spare_chat_id": chat_ids[-1]}
+
+
+@contextmanager
+def captured_sql():
+    """Collect (statement, parameters) of every single-row statement run."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            statements.append((statement, parameters))
+
+    for target in (engine, read_engine):
+        event.listen(target, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        for target in (engine, read_engine):
+            event.remove(target, "before_cursor_execute", capture)
+
+
+def query_plan(statement: str, parameters) -> list[str]:
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        connection.close()
+
+
+def call(api, method: str, path: str, body=None):
+    principal_cache.clear()  # so the auth lookup is captured too
+    with captured_sql() as statements:
+        response = api["client"].request(method, path.format(**api), json=body, headers=api["headers"])
+    assert response.status_code == 200, response.text
+    assert statements, f"{method} {path} ran no queries"
+    return response, statements
+
+
+def assert_no_full_scans(statements, ordered: bool = False):
+    for statement, parameters in statements:
+        plan = query_plan(statement, parameters)
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+        assert not scans, f"full scan {scans} in:\n{statement}\nplan: {plan}"
+        # Ordering by an aggregate (GROUP BY) always needs a sort
+        if ordered and "ORDER BY" in statement and "GROUP BY" not in statement:
+            assert SORTED not in plan, f"sorted instead of index order:\n{statement}\nplan: {plan}"
+
+
+ROUTES = [
+    ("GET", "/auth/me", None),
+    ("GET", "/analysis/history", None),
+    ("GET", "/analysis/chats", None),
+    ("GET", "/analysis/chats/{chat_id}/messages", None),
+    ("GET", "/analysis/dashboard/stats", None),
+    ("GET", "/analysis/dashboard/sentiment-trends?start=2026-01-01&end=2026-03-31&granularity=week", None),
+    ("GET", "/analysis/dashboard/risk-distribution", None),
+    ("GET", "/analysis/dashboard/topics-frequency", None),
+    ("GET", "/analysis/dashboard/topics-frequency?start=2026-01-01&end=2026-01-07", None),
+    ("POST", "/analysis/", {"text": "The export to CSV keeps failing"}),
+    ("POST", "/analysis/chats", {"title": "Plans"}),
+    ("POST", "/analysis/chats/{chat_id}/messages", {"role": "user", "content": "Hello"}),
+    ("POST", "/analysis/chats/{chat_id}/messages", {"role": "ai", "content": _analysis(1)}),
+    ("PATCH", "/analysis/chats/{chat_id}/title", {"title": "Renamed"}),
+]
+
+
+@pytest.mark.parametrize("method,path,body", ROUTES, ids=[f"{m} {p}" for m, p, _ in ROUTES])
+def test_route_uses_indexes(api, method, path, body):
+    _, statements = call(api, method, path, body)
+    assert_no_full_scans(statements, ordered=method == "GET")
+
+
+@pytest.mark.parametrize("path", [
+    "/analysis/history?limit=50",
+    "/analysis/chats?limit=5",
+    "/analysis/chats/{chat_id}/messages?limit=20",
+])
+def test_next_page_uses_indexes(api, path):
+    first = api["client"].get(path.format(**api), headers=api["headers"])
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    _, statements = call(api, "GET", f"{path}&cursor={cursor}")
+    assert_no_full_scans(statements, ordered=True)
+
+
+def test_delete_chat_uses_indexes(api):
+    _, statements = call(api, "DELETE", "/analysis/chats/{spare_chat_id}")
+    assert_no_full_scans(statements)
+    # A fixed number of statements, not one topic lookup per message
+    assert len(statements) < 15, [statement for statement, _ in statements]
+    with SessionLocal() as db:
+        chat_id = api["spare_chat_id"]
+        assert db.scalar(select(func.count()).where(Message.chat_id == chat_id)) == 0
+        orphans = select(func.count()).where(MessageTopic.message_id.not_in(select(Message.id)))
+        assert db.scalar(orphans) == 0
+
+
+def test_login_uses_indexes(api):
+    principal_cache.clear()
+    with captured_sql() as statements:
+        response = api["client"].post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    assert response.status_code == 200
+    assert_no_full_scans(statements)
@@ -0,0 +1,101 @@
+# tests/test_risk.py
+"""
+RiskLexicon: whole-word and phrase matching, overlapping phrases found
+through the failure links, and the same matches as a naive scan; plus
+assess_risk's scoring and levels.
+"""
+import random
+import re
+
+import pytest
+
+from app.ai.risk import (
+    NEGATIVE_SENTIMENT_WEIGHT,
+    RISK_HIGH_SCORE,
+    RISK_MEDIUM_SCORE,
+    RiskLexicon,
+    assess_risk,
+    risk_level,
+    risk_lexicon,
+)
+
+TERMS = {
+    "bad": 1.0,
+    "very bad": 2.0,
+    "bad service": 1.5,
+    "service was": 0.5,
+    "not refund": 1.0,
+    "won't": 0.5,
+    "   ": 9.0,
+}
+
+
+@pytest.fixture(scope="module")
+def lexicon():
+    return RiskLexicon(TERMS)
+
+
+def naive_scan(terms, text: str) -> dict:
+    tokens = re.findall(r"\w+(?:'\w+)*", text.lower())
+    found = {}
+    for term in terms:
+        words = term.split()
+        for i in range(len(tokens) - len(words) + 1):
+            if tokens[i:i + len(words)] == words:
+                found[term] = found.get(term, 0) + 1
+    return found
+
+
+def test_whole_words_only(lexicon):
+    assert lexicon.scan("Badge badly BAD, bad.") == {"bad": 2}
+
+
+def test_overlapping_phrases(lexicon):
+    assert lexicon.scan("Very bad service was slow") == {
+        "very bad": 1, "bad": 1, "bad service": 1, "service was": 1,
+    }
+    assert lexicon.scan("they won't, not refund") == {"won't": 1, "not refund": 1}
+
+
+def test_blank_terms_are_dropped(lexicon):
+    assert len(lexicon) == 6
+    assert "" not in lexicon.terms
+
+
+def test_matches_a_naive_scan(lexicon):
+    rng = random.Random(3)
+    words = ["very", "bad", "service", "was", "not", "refund", "won't", "the", "good"]
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 20)))
+        assert lexicon.scan(text) == naive_scan(lexicon.terms, text), text
+
+
+def test_version_follows_the_weights():
+    assert RiskLexicon(TERMS).version == RiskLexicon(dict(reversed(TERMS.items()))).version
+    assert RiskLexicon(TERMS).version != RiskLexicon({**TERMS, "bad": 1.5}).version
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / "risk.tsv"
+    path.write_text("# comment\n\nvery bad\t2.0  # inline\nlawsuit\t3\n", encoding="utf-8")
+    assert RiskLexicon.from_file(str(path)).terms == {"very bad": 2.0, "lawsuit": 3.0}
+
+
+def test_repeated_terms_count_once():
+    once = assess_risk("This is a scam")
+    assert assess_risk("scam scam scam, a scam") == once
+    assert once["matches"] == ["scam"] and once["score"] == risk_lexicon.terms["scam"]
+
+
+def test_negative_sentiment_adds_weight():
+    text = "The delivery was delayed"
+    assert assess_risk(text, "NEGATIVE")["score"] == assess_risk(text)["score"] + NEGATIVE_SENTIMENT_WEIGHT
+
+
+def test_levels():
+    assert risk_level(0) == "Low"
+    assert risk_level(RISK_MEDIUM_SCORE) == "Medium"
+    assert risk_level(RISK_HIGH_SCORE) == "High"
+    assert assess_risk("Thanks, all good") == {"risk": False, "level": "Low", "score": 0.0, "matches": []}
+    high = assess_risk("This scam is a lawsuit waiting to happen", "NEGATIVE")
+    assert high["risk"] and high["level"] == "High"
@@ -0,0 +1,217 @@
+# tests/test_rollups.py
+"""
+Dashboard rollups: user_stats kept by record_analyses / record_messages /
+remove_chat_messages on every write equals what rebuild_user_stats
+recomputes from the base tables, also after a chat is deleted; the same
+for sentiment_daily, and sentiment_trend's day / week / month buckets.
+"""
+import itertools
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, insert, select
+
+from app.auth.models import Base, Chat, Message, MessageTopic, SentimentDaily, SentimentHistory, User
+from app.database import SessionLocal, engine
+from app.rollups import (
+    SENTIMENT_DAILY_COUNTERS,
+    USER_STATS_COUNTERS,
+    get_user_stats,
+    index_message_topics,
+    rebuild_sentiment_daily,
+    rebuild_user_stats,
+    record_analyses,
+    record_messages,
+    remove_chat_messages,
+    sentiment_trend,
+)
+
+START = datetime(2026, 3, 1, 9, 30)
+
+_users = itertools.count()
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        yield db
+
+
+@pytest.fixture
+def user_id(db):
+    n = next(_users)
+    user_id = db.scalars(insert(User).returning(User.id), [
+        {"username": f"rollups{n}", "email": f"rollups{n}@example.com", "hashed_password": "x"}
+    ]).one()
+    db.commit()
+    return user_id
+
+
+def write_analyses(db, user_id: int, rng: random.Random, count: int):
+    """SentimentHistory rows spread over three weeks, recorded as the routes do."""
+    for _ in range(count):
+        created_at = START + timedelta(days=rng.randint(0, 20), minutes=rng.randint(0, 600))
+        analysis = {"sentiment": rng.choice(["POSITIVE", "NEGATIVE"]), "confidence": rng.uniform(0.5, 1)}
+        db.add(SentimentHistory(user_id=user_id, text="t", created_at=created_at, **analysis))
+        record_analyses(db, user_id, [analysis], day=created_at.date())
+    db.commit()
+
+
+def write_chat(db, user_id: int, rng: random.Random, count: int) -> int:
+    """A chat of user and AI messages with mixed risk levels and topics."""
+    chat = Chat(user_id=user_id, title="Rollups")
+    db.add(chat)
+    db.flush()
+    messages = []
+    for _ in range(count):
+        role = rng.choice(["user", "ai"])
+        level = rng.choice(["Low", "Medium", "High"])
+        topics = rng.choice([None, [], ["Export", "export ", "billing"]]) if role == "ai" else None
+        messages.append(Message(
+            chat_id=chat.id, user_id=user_id, role=role, content="m",
+            risk=int(level != "Low"), risk_level=level, topics=topics,
+        ))
+    db.add_all(messages)
+    record_messages(db, user_id, messages)
+    index_message_topics(user_id, messages)
+    db.commit()
+    return chat.id
+
+
+def delete_chat(db, user_id: int, chat_id: int):
+    """What the delete-chat route does."""
+    remove_chat_messages(db, user_id, chat_id)
+    messages = select(Message.id).where(Message.chat_id == chat_id)
+    db.execute(delete(MessageTopic).where(MessageTopic.message_id.in_(messages)))
+    db.execute(delete(Message).where(Message.chat_id == chat_id))
+    db.execute(delete(Chat).where(Chat.id == chat_id))
+    db.commit()
+
+
+def user_stats(db, user_id: int) -> dict:
+    stats = get_user_stats(db, user_id)
+    return {counter: getattr(stats, counter) for counter in USER_STATS_COUNTERS}
+
+
+def assert_stats_match_rebuild(db, user_id: int):
+    incremental = user_stats(db, user_id)
+    rebuild_user_stats(db, user_id)
+    rebuilt = user_stats(db, user_id)
+    # Put the incremental row back for the next writes
+    db.rollback()
+
+    assert incremental.pop("confidence_sum") == pytest.approx(rebuilt.pop("confidence_sum"))
+    assert incremental == rebuilt
+
+
+def sentiment_daily(db, user_id: int) -> list[dict]:
+    rows = db.scalars(
+        select(SentimentDaily).where(SentimentDaily.user_id == user_id).order_by(SentimentDaily.day)
+    )
+    return [{"day": row.day, **{c: getattr(row, c) for c in SENTIMENT_DAILY_COUNTERS}} for row in rows]
+
+
+def assert_daily_matches_rebuild(db, user_id: int):
+    incremental = sentiment_daily(db, user_id)
+    rebuild_sentiment_daily(db, user_id)
+    rebuilt = sentiment_daily(db, user_id)
+    db.rollback()
+
+    assert len(incremental) == len(rebuilt)
+    for mine, theirs in zip(incremental, rebuilt):
+        assert mine.pop("confidence_sum") == pytest.approx(theirs.pop("confidence_sum"))
+        assert mine == theirs
+
+
+def test_user_stats_match_a_rebuild(db, user_id):
+    rng = random.Random(1)
+    write_analyses(db, user_id, rng, 40)
+    assert_stats_match_rebuild(db, user_id)
+
+    chats = [write_chat(db, user_id, rng, 30) for _ in range(3)]
+    assert user_stats(db, user_id)["risk_low"] > 0
+    assert_stats_match_rebuild(db, user_id)
+
+    delete_chat(db, user_id, chats[1])
+    assert_stats_match_rebuild(db, user_id)
+
+
+def test_removed_messages_leave_the_totals(db, user_id):
+    rng = random.Random(2)
+    write_analyses(db, user_id, rng, 5)
+    chat_id = write_chat(db, user_id, rng, 20)
+
+    message = db.scalars(select(Message).where(Message.chat_id == chat_id).limit(1)).one()
+    record_messages(db, user_id, [message], sign=-1)
+    db.execute(delete(MessageTopic).where(MessageTopic.message_id == message.id))
+    db.delete(message)
+    db.commit()
+    assert_stats_match_rebuild(db, user_id)
+
+    delete_chat(db, user_id, chat_id)
+    stats = user_stats(db, user_id)
+    assert stats["total_analyses"] == 5
+    assert [stats[c] for c in USER_STATS_COUNTERS if c not in ("total_analyses", "confidence_sum")] == [0] * 5
+    assert_stats_match_rebuild(db, user_id)
+
+
+def test_new_user_has_zero_stats(db, user_id):
+    assert user_stats(db, user_id) == {counter: 0 for counter in USER_STATS_COUNTERS}
+    assert_stats_match_rebuild(db, user_id)
+
+
+def test_sentiment_daily_matches_a_rebuild(db, user_id):
+    rng = random.Random(3)
+    write_analyses(db, user_id, rng, 60)
+    assert len(sentiment_daily(db, user_id)) > 1
+    assert_daily_matches_rebuild(db, user_id)
+
+    # Analyses outlive the chats they came from
+    delete_chat(db, user_id, write_chat(db, user_id, rng, 10))
+    write_analyses(db, user_id, rng, 10)
+    assert_daily_matches_rebuild(db, user_id)
+
+
+def test_trend_buckets(db, user_id):
+    # 2026-03-01 is a Sunday, 03-02 and 03-09 Mondays
+    days = {
+        date(2026, 2, 28): [("POSITIVE", 0.5)],
+        date(2026, 3, 1): [("POSITIVE", 0.75), ("NEGATIVE", 1.0)],
+        date(2026, 3, 2): [("NEGATIVE", 0.5)],
+        date(2026, 3, 8): [("POSITIVE", 1.0)],
+        date(2026, 3, 9): [("POSITIVE", 0.5), ("POSITIVE", 0.5)],
+    }
+    for day, analyses in days.items():
+        record_analyses(db, user_id, [{"sentiment": s, "confidence": c} for s, c in analyses], day=day)
+    db.commit()
+
+    def trend(granularity, start=date(2026, 2, 1), end=date(2026, 3, 31)):
+        return [
+            (b["start"], b["analyses"], b["positive"], b["negative"], b["confidence_sum"])
+            for b in sentiment_trend(db, user_id, start, end, granularity)
+        ]
+
+    assert trend("day") == [
+        (date(2026, 2, 28), 1, 1, 0, 0.5),
+        (date(2026, 3, 1), 2, 1, 1, 1.75),
+        (date(2026, 3, 2), 1, 0, 1, 0.5),
+        (date(2026, 3, 8), 1, 1, 0, 1.0),
+        (date(2026, 3, 9), 2, 2, 0, 1.0),
+    ]
+    assert trend("week") == [
+        (date(2026, 2, 23), 3, 2, 1, 2.25),
+        (date(2026, 3, 2), 2, 1, 1, 1.5),
+        (date(2026, 3, 9), 2, 2, 0, 1.0),
+    ]
+    assert trend("month") == [
+        (date(2026, 2, 1), 1, 1, 0, 0.5),
+        (date(2026, 3, 1), 6, 4, 2, 4.25),
+    ]
+    # start and end are inclusive; a bucket only sums the days inside them
+    assert trend("week", date(2026, 3, 1), date(2026, 3, 8)) == [
+        (date(2026, 2, 23), 2, 1, 1, 1.75),
+        (date(2026, 3, 2), 2, 1, 1, 1.5),
+    ]
+    assert trend("day", date(2026, 3, 3), date(2026, 3, 7)) == []
@@ -0,0 +1,142 @@
+# tests/test_sentiment_cascade.py
+"""
+Lexicon tier and cascade escalation. The lexicon's rules move the compound
+score the right way; with the cascade on, only clear-cut short texts are
+answered without the model, and it is off unless SENTIMENT_CASCADE=1.
+"""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from app.ai import sentiment
+from app.ai.batching import MicroBatcher
+from app.ai.lexicon_model import LexiconSentimentModel
+from app.ai.model import SentimentModel
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLEAR_CUT = ["This is terrible and broken", "Support was great and the fix was quick", "I love it"]
+UNCERTAIN = ["good but slow", "The refund was fine I guess", "the export ran"]
+
+
+class FakeModel(SentimentModel):
+    """Says NEGATIVE to everything and remembers what it was asked."""
+
+    backend = "fake"
+
+    def __init__(self):
+        super().__init__("fake")
+        self.max_length = 64
+        self.seen = []
+
+    def _build(self):
+        pass
+
+    def _predict(self, texts):
+        self.seen.extend(texts)
+        return [{"label": "NEGATIVE", "score": 0.99} for _ in texts]
+
+    def token_spans(self, text):
+        return [match.span() for match in re.finditer(r"\S+", text)]
+
+
+@pytest.fixture(scope="module")
+def lexicon():
+    return LexiconSentimentModel()
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+    batcher = MicroBatcher(model.predict, max_wait_ms=0)
+    monkeypatch.setattr(sentiment, "SENTIMENT_BACKEND", "torch")
+    monkeypatch.setattr(sentiment, "SENTIMENT_CASCADE", True)
+    monkeypatch.setattr(sentiment, "sentiment_model", model)
+    monkeypatch.setattr(sentiment, "sentiment_batcher", batcher)
+    monkeypatch.setattr(sentiment, "_tier_counts", {"lexicon": 0, "model": 0})
+    yield model
+    batcher.stop()
+
+
+@pytest.mark.parametrize("stronger,weaker", [
+    ("very good", "good"),
+    ("good!!", "good"),
+    ("GOOD product", "good product"),
+    ("slow but good", "good"),
+])
+def test_lexicon_modifiers_strengthen(lexicon, stronger, weaker):
+    assert lexicon.polarity(stronger) > lexicon.polarity(weaker) > 0
+
+
+def test_lexicon_negation_and_contrast(lexicon):
+    assert lexicon.polarity("not good") < 0 < lexicon.polarity("good")
+    # The clause after "but" outweighs the one before it
+    assert lexicon.polarity("good but slow") < 0 < lexicon.polarity("slow but good")
+
+
+def test_lexicon_scores_are_bounded(lexicon):
+    assert lexicon.polarity("the export ran") == 0
+    assert -1 < lexicon.polarity("terrible " * 200) < -0.99
+    for result in lexicon.predict(["I love it", "This is terrible"]):
+        assert 0.5 <= result["score"] <= 1
+    assert [r["label"] for r in lexicon.predict(["I love it", "This is terrible"])] == ["POSITIVE", "NEGATIVE"]
+
+
+def test_clear_cut_short_texts_skip_the_model(model):
+    for text in CLEAR_CUT:
+        result = sentiment.analyze_sentiment(text)
+        assert result["tier"] == "lexicon"
+        expected = "NEGATIVE" if "terrible" in text else "POSITIVE"
+        assert result["sentiment"] == expected
+        assert 0.5 < result["confidence"] <= 1
+    assert model.seen == []
+
+
+def test_uncertain_texts_escalate_to_the_model(model):
+    for text in UNCERTAIN:
+        assert sentiment.analyze_sentiment(text) == {"sentiment": "NEGATIVE", "confidence": 0.99, "tier": "model"}
+    assert model.seen == UNCERTAIN
+
+
+def test_long_texts_escalate_even_when_clear_cut(model):
+    text = "I love it. " * 40
+    assert sentiment._lexicon_tier(text) is None
+    result = sentiment.analyze_sentiment(text)
+    assert result["tier"] == "model" and result["sentiment"] == "NEGATIVE"
+    assert model.seen
+
+
+def test_batch_escalates_the_same_texts(model):
+    texts = [CLEAR_CUT[0], UNCERTAIN[0], CLEAR_CUT[1], UNCERTAIN[1]]
+    results = sentiment.analyze_sentiment_batch(texts)
+    assert [r["tier"] for r in results] == ["lexicon", "model", "lexicon", "model"]
+    # The batcher buckets by length, so the model may see them in any order
+    assert sorted(model.seen) == sorted(UNCERTAIN[:2])
+    assert results == [sentiment.analyze_sentiment(text) for text in texts]
+
+    stats = sentiment.cascade_stats()
+    assert (stats["lexicon"], stats["model"]) == (4, 4)
+    assert stats["model_calls_avoided"] == 0.5
+
+
+def test_cascade_off_sends_everything_to_the_model(model, monkeypatch):
+    monkeypatch.setattr(sentiment, "SENTIMENT_CASCADE", False)
+    results = sentiment.analyze_sentiment_batch(CLEAR_CUT)
+    assert {r["tier"] for r in results} == {"model"}
+    assert sorted(model.seen) == sorted(CLEAR_CUT)
+
+
+@pytest.mark.parametrize("setting,enabled", [(None, False), ("1", True)])
+def test_cascade_is_opt_in(setting, enabled):
+    env = {k: v for k, v in os.environ.items() if k != "SENTIMENT_CASCADE"}
+    env["SENTIMENT_BACKEND"] = "torch"  # not loaded, only configured
+    if setting is not None:
+        env["SENTIMENT_CASCADE"] = setting
+    output = subprocess.run(
+        [sys.executable, "-c", "from app.ai import sentiment; print(sentiment.SENTIMENT_CASCADE)"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    assert output.strip() == str(enabled)
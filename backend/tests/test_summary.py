@@ -0,0 +1,60 @@
+# tests/test_summary.py
+"""
+Extractive summaries: sentence splitting, budgets, and memory that grows
+with the text rather than with sentences x vocabulary.
+"""
+import random
+import tracemalloc
+
+from app.ai import summary
+from app.ai.summary import split_sentences, summarize_batch, summarize_text
+
+DOCUMENT = (
+    "The export to CSV keeps failing. Support told me to retry the export later. "
+    "Dr. Smith from support was friendly. The CSV export failed again this morning. "
+    "Lunch was good."
+)
+
+
+def random_document(sentences: int, seed: int = 1) -> str:
+    """Sentences of words that rarely repeat: the vocabulary grows with the text."""
+    rng = random.Random(seed)
+    return " ".join(
+        " ".join(f"w{rng.randrange(10 ** 7)}" for _ in range(12)).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def test_split_keeps_abbreviations():
+    assert split_sentences("Ask Dr. Smith. He knows e.g. the fix! Done?") == [
+        "Ask Dr. Smith.", "He knows e.g. the fix!", "Done?"
+    ]
+
+
+def test_summary_picks_central_sentences_in_order():
+    result = summarize_text(DOCUMENT, max_length=200, max_sentences=2)
+    assert result == "The export to CSV keeps failing. The CSV export failed again this morning."
+
+
+def test_short_text_and_budgets():
+    assert summarize_text("Great app.") == "Great app."
+    assert summarize_text("") == ""
+    assert len(summarize_text(DOCUMENT, max_length=40)) <= 43  # budget + "..."
+    assert summarize_batch([DOCUMENT, "Great app."]) == [summarize_text(DOCUMENT), "Great app."]
+
+
+def test_centroid_path_keeps_the_repeated_topic():
+    # More sentences than the TextRank graph takes
+    repeated = " ".join([DOCUMENT] * (summary.MAX_GRAPH_SENTENCES // 5 + 1))
+    assert "export" in summarize_text(repeated).lower()
+
+
+def test_memory_does_not_grow_with_vocabulary():
+    tracemalloc.start()
+    try:
+        summarize_text(random_document(summary.MAX_SCORED_SENTENCES * 2))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # A dense sentences x vocabulary matrix here would be about 400 MB
+    assert peak < 50 * 1024 * 1024
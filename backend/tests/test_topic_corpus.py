@@ -0,0 +1,121 @@
+# tests/test_topic_corpus.py
+"""
+SQLTopicCorpus: scoring only reads, and document frequencies are written
+by save() inside the caller's transaction, so they commit or roll back
+with the analysis they belong to. extract_topics_batch agrees with
+extract_topics and its memory grows with the candidates, not with
+texts x vocabulary.
+"""
+import random
+import tracemalloc
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.ai.topics import CORPUS_SIZE_TERM, TopicCorpus, candidate_terms, extract_topics, extract_topics_batch
+from app.auth.models import Base, TermDocumentFrequency
+from app.rollups import SQLTopicCorpus
+
+TEXTS = [
+    "The export to CSV keeps failing on large reports",
+    "Refund policy is unclear and the refund took weeks",
+    "CSV export works again, thanks for the quick fix",
+    "Billing page shows the wrong plan after the upgrade",
+]
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'topics.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def stored(Session) -> dict:
+    with Session() as db:
+        return dict(db.execute(select(TermDocumentFrequency.term, TermDocumentFrequency.documents)).all())
+
+
+def test_observe_counts_the_documents_without_writing(Session):
+    corpus = SQLTopicCorpus(user_id=1, session_factory=Session)
+
+    documents, frequencies = corpus.observe([{"csv", "export"}, {"csv"}])
+
+    assert documents == 2
+    assert frequencies == {"csv": 2, "export": 1}
+    assert stored(Session) == {}
+
+
+def test_save_commits_with_the_callers_transaction(Session):
+    corpus = SQLTopicCorpus(user_id=1, session_factory=Session)
+    corpus.observe([{"csv", "export"}])
+
+    with Session() as db:
+        corpus.save(db)
+        db.rollback()
+    assert stored(Session) == {}
+    assert not corpus.pending
+
+    corpus.observe([{"csv"}])
+    with Session() as db:
+        corpus.save(db)
+        db.commit()
+    assert stored(Session) == {CORPUS_SIZE_TERM: 1, "csv": 1}
+
+    # Saved counts and pending ones add up
+    documents, frequencies = corpus.observe([{"csv", "refund"}])
+    assert documents == 2
+    assert frequencies == {"csv": 2, "refund": 1}
+
+
+def test_scores_match_the_in_memory_corpus(Session):
+    sql_corpus = SQLTopicCorpus(user_id=1, session_factory=Session)
+    memory_corpus = TopicCorpus()
+
+    for text in TEXTS * 2:
+        assert extract_topics(text, corpus=sql_corpus) == extract_topics(text, corpus=memory_corpus)
+        with Session() as db:
+            sql_corpus.save(db)
+            db.commit()
+
+    with Session() as db:
+        users = db.scalar(select(func.count(func.distinct(TermDocumentFrequency.user_id))))
+    assert users == 1
+    assert stored(Session)[CORPUS_SIZE_TERM] == memory_corpus.documents == len(TEXTS) * 2
+
+
+def documents(count: int, seed: int = 3) -> list[str]:
+    """Long documents whose shared vocabulary keeps growing."""
+    rng = random.Random(seed)
+    words = ["word" + "".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(count * 400)]
+    return [
+        ". ".join(" ".join(rng.choice(words[:(i + 1) * 400]) for _ in range(8)) for _ in range(100))
+        for i in range(count)
+    ]
+
+
+def test_batch_matches_single_texts():
+    texts = TEXTS * 3 + documents(4)
+    assert extract_topics_batch(texts) == [extract_topics(text) for text in texts]
+
+    # With a corpus, the whole batch is observed before scoring
+    batch_corpus, single_corpus = TopicCorpus(), TopicCorpus()
+    single_corpus.observe([set(candidate_terms(text)) for text in texts[1:]])
+    assert extract_topics_batch(texts, corpus=batch_corpus)[0] == extract_topics(texts[0], corpus=single_corpus)
+    assert batch_corpus.documents == len(texts)
+    assert extract_topics_batch([]) == [] and extract_topics_batch(["", "a b"]) == [[], []]
+
+
+def test_batch_memory_grows_with_the_texts():
+    def peak(texts):
+        tracemalloc.start()
+        try:
+            extract_topics_batch(texts)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # A texts x vocabulary matrix would grow about 16x here
+    assert peak(documents(32)) < 6 * peak(documents(8))
@@ -0,0 +1,83 @@
+# tests/test_worker_pool.py
+"""
+ProcessPoolSentimentModel: predictions come back from the forked workers,
+a worker that dies mid-batch fails that batch after the timeout instead of
+blocking forever, and the pool refuses to fork next to running threads.
+
+Each case runs in a fresh interpreter: the test process already has other
+threads (batchers, clients), which is exactly what the pool refuses.
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="workers are forked"
+)
+
+PRELUDE = """
+import os, threading, time
+from app.ai.executor import DeadlineExceededError
+from app.ai.lexicon_model import LexiconSentimentModel
+from app.ai.worker_pool import ProcessPoolSentimentModel
+
+class Dying(LexiconSentimentModel):
+    def _predict(self, texts):
+        if texts == ["die"]:
+            os._exit(1)
+        return super()._predict(texts)
+
+model = ProcessPoolSentimentModel(Dying(), workers=1, timeout=1.0)
+"""
+
+
+def run(script: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", PRELUDE + textwrap.dedent(script)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_predictions_come_from_the_workers():
+    output = run("""
+        model.load()
+        worker = model._pool._pool[0].pid
+        print(worker != os.getpid(), [r["label"] for r in model.predict(["I love it", "This is terrible"])])
+        model.close()
+    """)
+    assert output == "True ['POSITIVE', 'NEGATIVE']"
+
+
+def test_dead_worker_fails_the_batch_and_the_pool_recovers():
+    output = run("""
+        model.load()
+        started = time.monotonic()
+        try:
+            model.predict(["die"])
+        except DeadlineExceededError:
+            print("timed out", round(time.monotonic() - started) <= 2)
+        print(model.predict(["I love it"])[0]["label"])
+        model.close()
+    """)
+    assert output.splitlines() == ["timed out True", "POSITIVE"]
+
+
+def test_refuses_to_fork_with_other_threads_running():
+    output = run("""
+        stop = threading.Event()
+        threading.Thread(target=stop.wait, name="busy").start()
+        try:
+            model.load()
+        except RuntimeError as exc:
+            print("busy" in str(exc), model.is_loaded)
+        stop.set()
+    """)
+    assert output == "True False"
@@ -1,5 +1,17 @@
 import api from "./auth";
 
+/** GET every page of a cursor-paginated list endpoint */
+const getAllPages = async (url) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await api.get(url, { params: cursor ? { cursor } : {} });
+    items.push(...response.data);
+    cursor = response.headers["x-next-cursor"];
+  } while (cursor);
+  return items;
+};
+
 /** Send text to AI for analysis */
 export const analyzeText = async (text, chatId = null) => {
   const response = await api.post("/analysis/", { text, chat_id: chatId });
@@ -8,14 +20,12 @@ export const analyzeText = async (text, chatId = null) => {
 
 /** Fetch user's analysis history */
 export const getAnalysisHistory = async () => {
-  const response = await api.get("/analysis/history");
-  return response.data;
+  return getAllPages("/analysis/history");
 };
 
 /** Get all chats for the user */
 export const getChats = async () => {
-  const response = await api.get("/analysis/chats");
-  return response.data;
+  return getAllPages("/analysis/chats");
 };
 
 /** Create a new chat */
@@ -26,8 +36,8 @@ export const createChat = async (data) => {
 
 /** Get messages for a specific chat */
 export const getChatMessages = async (chatId) => {
-  const response = await api.get(`/analysis/chats/${chatId}/messages`);
-  return response.data.map((msg) => {
+  const messages = await getAllPages(`/analysis/chats/${chatId}/messages`);
+  return messages.map((msg) => {
     // If content is already an object (backend already parsed it)
     if (typeof msg.content === 'object' && msg.content !== null) {
       return {